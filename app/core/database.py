@@ -1,15 +1,161 @@
-from sqlalchemy import create_engine
+import time
+import uuid
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
-from app.core.config import POSTGRES_URL
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, QueuePool
+from app.core import metrics
+from app.core.logger import get_logger
+from app.core.config import (
+    ASYNC_DB_MAX_OVERFLOW, ASYNC_DB_POOL_SIZE, ASYNC_POSTGRES_URL, DB_MAX_OVERFLOW, DB_PGBOUNCER,
+    DB_POOL_PRE_PING, DB_POOL_RECYCLE, DB_POOL_SIZE, DB_POOL_TIMEOUT, POSTGRES_URL,
+)
+
+logger = get_logger(__name__)
+
+# -------------------------------
+# Pool metrics (exported at /metrics)
+# -------------------------------
+
+POOL_WAIT = metrics.Histogram(
+    "db_pool_wait_seconds", "Time spent waiting for a pooled connection (or a new one without a pool)", ["engine"]
+)
+POOL_TIMEOUTS = metrics.Counter("db_pool_timeouts_total", "Checkouts that gave up after DB_POOL_TIMEOUT", ["engine"])
+CONNECTION_HOLD = metrics.Histogram(
+    "db_connection_hold_seconds", "Time a connection stays checked out, by route template", ["engine", "route"]
+)
+POOL_CONNECTIONS = metrics.Gauge(
+    "db_pool_connections", "Pool connections by state (checked_out, checked_in, overflow, size)", ["engine", "state"]
+)
+
+
+class _WaitTimingPool:
+    """Pool mixin timing each checkout; the engine label is the pool's logging name."""
+
+    def _do_get(self):
+        engine = getattr(self, "logging_name", None) or "default"
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            POOL_TIMEOUTS.inc(engine=engine)
+            raise
+        finally:
+            POOL_WAIT.observe(time.perf_counter() - started, engine=engine)
+
+
+class InstrumentedQueuePool(_WaitTimingPool, QueuePool):
+    pass
+
+
+class InstrumentedAsyncQueuePool(_WaitTimingPool, AsyncAdaptedQueuePool):
+    pass
+
+
+class InstrumentedNullPool(_WaitTimingPool, NullPool):
+    pass
+
+
+def _pool_options(pool_class, size: int, overflow: int) -> dict:
+    if DB_PGBOUNCER:
+        # PgBouncer owns pooling; pre-ping/recycle would only add round trips
+        return {"poolclass": InstrumentedNullPool}
+    return {
+        "poolclass": pool_class,
+        "pool_size": size,
+        "max_overflow": overflow,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+    }
+
 
-engine = create_engine(POSTGRES_URL)
+def _async_connect_args() -> dict:
+    if not DB_PGBOUNCER:
+        return {}
+    # Transaction pooling hands each transaction a different server connection, so
+    # prepared statements must not be cached and their names must not collide
+    return {
+        "statement_cache_size": 0,
+        "prepared_statement_cache_size": 0,
+        "prepared_statement_name_func": lambda: f"__asyncpg_{uuid.uuid4()}__",
+    }
+
+
+def instrument_engine(sync_engine, label: str) -> None:
+    """Record per-route connection hold time for an engine (its pool must log as `label`)."""
+
+    @event.listens_for(sync_engine, "checkout")
+    def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+        connection_record.info["checked_out_at"] = time.perf_counter()
+        connection_record.info["route"] = metrics.current_route()
+
+    @event.listens_for(sync_engine, "checkin")
+    def _on_checkin(dbapi_connection, connection_record):
+        started = connection_record.info.pop("checked_out_at", None)
+        if started is not None:
+            CONNECTION_HOLD.observe(
+                time.perf_counter() - started, engine=label, route=connection_record.info.pop("route", "-")
+            )
+
+
+engine = create_engine(POSTGRES_URL, pool_logging_name="sync", **_pool_options(
+    InstrumentedQueuePool, DB_POOL_SIZE, DB_MAX_OVERFLOW
+))
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
+# asyncpg engine for request handlers that await the database instead of holding a threadpool slot
+async_engine = create_async_engine(
+    ASYNC_POSTGRES_URL, pool_logging_name="async", connect_args=_async_connect_args(),
+    **_pool_options(InstrumentedAsyncQueuePool, ASYNC_DB_POOL_SIZE, ASYNC_DB_MAX_OVERFLOW)
+)
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+instrument_engine(engine, "sync")
+instrument_engine(async_engine.sync_engine, "async")
+
+
+def pool_status() -> dict:
+    """Live pool counters per engine (empty for NullPool in PgBouncer mode)."""
+    status = {}
+    for label, pool in (("sync", engine.pool), ("async", async_engine.sync_engine.pool)):
+        if isinstance(pool, QueuePool):
+            status[label] = {
+                "size": pool.size(),
+                "checked_out": pool.checkedout(),
+                "checked_in": pool.checkedin(),
+                "overflow": max(pool.overflow(), 0),
+            }
+    return status
+
+
+POOL_CONNECTIONS.set_function(lambda: [
+    ({"engine": label, "state": state}, value)
+    for label, counts in pool_status().items()
+    for state, value in counts.items()
+])
+
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+def ensure_indexes():
+    """create_all() skips existing tables, so add any model indexes declared since."""
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            try:
+                index.create(bind=engine, checkfirst=True)
+            except Exception as e:
+                # e.g. a unique index over rows that still violate it; never keep the app from booting
+                logger.warning("Could not create index %s: %s", index.name, e)
@@ -1,16 +1,20 @@
-from fastapi import Depends, HTTPException, status, Request, Header
+from fastapi import Depends, HTTPException, status, Request, Response, Header
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError
 from datetime import datetime, timezone
 from app.utils.security import decode_access_token
-from app.core.redis import r  # your redis client
+from app.core.metrics import route_template
+from app.core.rate_limit import rate_limiter
+from app.core.revocation import revocations, token_cache
+from app.core.logger import get_logger
 from time import time
 from collections import defaultdict
 from typing import Optional, Dict
 
+logger = get_logger(__name__)
+
 # --- CONFIGURATION (from your original file) ---
-DAILY_LIMIT = 3
-DAY_SECONDS = 86400
+# Guest limits are policies in app/core/rate_limit.py (RATE_LIMIT_DEFAULT, RATE_LIMIT_ROUTES)
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
 
@@ -23,16 +27,17 @@ async def _get_payload_from_token(token: str) -> Optional[Dict]:
     Tries to decode a token AND check for revocation.
     Returns payload (dict) on success, None on ANY failure.
     """
-    try:
-        payload = decode_access_token(token)
-    except JWTError:
-        # Invalid format or expired
-        return None
-
-    # ✅ Revocation check (from your original get_current_user)
-    token_key = f"revoked:{payload['sub']}:{payload['iat']}"
-    is_revoked = await r.get(token_key)
-    if is_revoked:
+    payload = token_cache.get(token)
+    if payload is None:
+        try:
+            payload = decode_access_token(token)
+        except (JWTError, HTTPException):
+            # Invalid format or expired
+            return None
+        token_cache.put(token, payload)
+
+    # ✅ Revocation check: in-process filter, Redis only for possible revocations
+    if await revocations.is_revoked(payload['sub'], payload['iat']):
         # Token is valid but has been revoked (e.g., by logout)
         return None
 
@@ -93,22 +98,22 @@ async def get_optional_user(
 
 async def get_rate_limiter(
     request: Request,
+    response: Response,
     user: Optional[Dict] = Depends(get_optional_user) # <-- THE KEY CHANGE
 ):
     """
-    Applies a daily rate limit ONLY to guest users.
+    Applies the guest rate-limit policy of this route ONLY to guest users.
     Logged-in users are not limited.
-    
-    (This is your original daily_rate_limit, now refactored)
+
+    One atomic Redis script per request (see app/core/rate_limit.py).
     """
     # If 'user' is not None, the user is logged in.
     if user:
         # We can even log their user ID
-        logger.info(f"Rate limiter skipped for logged-in user: {user['sub']}")
+        logger.info("Rate limiter skipped for logged-in user: %s", user['sub'])
         return  # <-- Skip all limits for authenticated users
 
     # --- If we get here, the user is a GUEST ---
-    # (This is your original logic)
     anon_id = request.headers.get("X-Anonymous-Id", "").strip()
     fingerprint = request.headers.get("X-Fingerprint", "").strip()
 
@@ -116,19 +121,18 @@ async def get_rate_limiter(
         raise HTTPException(status_code=400, detail="Missing anonymous identification headers.")
 
     identifier = f"{anon_id}:{fingerprint}" if fingerprint else anon_id
-    key = f"quota:{identifier}"
 
-    count = await r.get(key)
-    if count and int(count) >= DAILY_LIMIT:
-        ttl = await r.ttl(key)
+    decision = await rate_limiter.hit(route_template(request.scope), identifier)
+    if decision is None:
+        return
+    if not decision.allowed:
+        policy = decision.policy
         raise HTTPException(
-            status_code=4E+029, # Too Many Requests
-            detail=f"Daily limit of {DAILY_LIMIT} requests reached. Try again in {ttl} seconds.",
-            headers={"Retry-After": str(ttl)}
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=(
+                f"Limit of {policy.limit} requests per {policy.window_seconds:g} seconds reached. "
+                f"Try again in {decision.retry_after} seconds."
+            ),
+            headers=decision.headers(),
         )
-
-    # Note: A pipeline is more efficient for multiple commands
-    pipe = r.pipeline()
-    pipe.incr(key, 1)
-    pipe.expire(key, DAY_SECONDS, nx=True) # nx=True: only set
-    await pipe.execute()
\ No newline at end of file
+    response.headers.update(decision.headers())
@@ -1,7 +1,28 @@
 # /app/core/logger.py
-import os
+"""
+Application logging.
+
+Loggers only enqueue records (QueueHandler); a background QueueListener thread formats them
+and writes to the console and the rotating log file, so no log I/O runs on the request path.
+Records are enqueued unformatted: pass %-style arguments (logger.info("id=%s", occupation_id))
+so disabled levels cost nothing, and pass values that will not be mutated afterwards.
+
+Modules log through get_logger(__name__), a child of the application logger, which allows:
+    LOG_LEVEL    level of the application logger (default INFO)
+    LOG_LEVELS   per-module levels, e.g. "app.scoring.repository=WARNING,app.core.pubsub=DEBUG"
+    LOG_SAMPLE   keep 1 in N DEBUG/INFO records of hot modules, e.g. "app.scoring.router=100"
+                 (warnings and errors are never sampled)
+
+route_to_queue() moves other loggers' handlers (e.g. uvicorn's, configured from
+logging_config.yaml) behind the same queue.
+"""
+import atexit
+import itertools
 import logging
-from logging.handlers import RotatingFileHandler
+import os
+import queue
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Dict, List, Optional
 
 # ---------------------------
 # Determine project root
@@ -15,30 +36,176 @@ os.makedirs(logs_dir, exist_ok=True)  # Ensure directory exists
 # Log file path
 log_file_path = os.path.join(logs_dir, "api.log")
 
+APP_LOGGER_NAME = "yt_transcript_api"
+
+
+def _parse_spec(spec: str) -> Dict[str, str]:
+    """"a.b=X,c=Y" -> {"a.b": "X", "c": "Y"} (blank entries ignored)."""
+    pairs = (item.split("=", 1) for item in spec.split(",") if "=" in item)
+    return {name.strip(): value.strip() for name, value in pairs if name.strip()}
+
+
+def _qualify(name: str) -> str:
+    if name == APP_LOGGER_NAME or name.startswith(APP_LOGGER_NAME + "."):
+        return name
+    return f"{APP_LOGGER_NAME}.{name}"
+
+
+def get_logger(name: str) -> logging.Logger:
+    """Module logger under the application logger (per-module levels and sampling apply)."""
+    return logging.getLogger(_qualify(name))
+
+
+# ---------------------------
+# Queue pipeline
+# ---------------------------
+
+class _DeferredQueueHandler(QueueHandler):
+    """Enqueue records as they are; formatting happens on the listener thread."""
+
+    def __init__(self, log_queue: queue.SimpleQueue, targets: List[logging.Handler]):
+        super().__init__(log_queue)
+        self.targets = targets
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record.log_targets = self.targets
+        return record
+
+
+class _TargetDispatcher(logging.Handler):
+    """Listener-side handler: passes each record to the handlers of the logger it came from."""
+
+    def handle(self, record: logging.LogRecord) -> bool:
+        for handler in record.log_targets:
+            if record.levelno >= handler.level:
+                handler.handle(record)
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """Keep 1 in N DEBUG/INFO records per logger, N from the closest configured ancestor."""
+
+    def __init__(self, every: Dict[str, int]):
+        super().__init__()
+        self.every = {_qualify(name): n for name, n in every.items() if n > 1}
+        self._resolved: Dict[str, int] = {}
+        self._counters: Dict[str, itertools.count] = {}
+
+    def _every_for(self, name: str) -> int:
+        every = self._resolved.get(name)
+        if every is None:
+            every, probe = 1, name
+            while probe:
+                if probe in self.every:
+                    every = self.every[probe]
+                    break
+                probe = probe.rpartition(".")[0]
+            self._resolved[name] = every
+        return every
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > logging.INFO or not self.every:
+            return True
+        every = self._every_for(record.name)
+        if every == 1:
+            return True
+        counter = self._counters.get(record.name)
+        if counter is None:
+            counter = self._counters.setdefault(record.name, itertools.count())
+        return next(counter) % every == 0
+
+
+_queue: queue.SimpleQueue = queue.SimpleQueue()
+_listener = QueueListener(_queue, _TargetDispatcher())
+_routed: List[logging.Logger] = []
+
+
+def route_to_queue(target: logging.Logger, log_filter: Optional[logging.Filter] = None) -> None:
+    """Replace a logger's handlers with one queue handler that feeds them from the listener thread."""
+    if any(isinstance(h, _DeferredQueueHandler) for h in target.handlers):
+        return
+    targets = list(target.handlers)
+    if not targets:
+        return
+    for handler in targets:
+        target.removeHandler(handler)
+    queue_handler = _DeferredQueueHandler(_queue, targets)
+    if log_filter is not None:
+        queue_handler.addFilter(log_filter)
+    target.addHandler(queue_handler)
+    _routed.append(target)
+
+
+# Loggers configured outside this module (logging_config.yaml); "" is the root logger
+EXTERNAL_LOGGERS = ("", "uvicorn", "uvicorn.error", "uvicorn.access", "fastapi", "sqlalchemy.engine")
+
+
+def route_external_loggers() -> None:
+    """Move the server's own handlers behind the queue once logging config has been applied."""
+    for name in EXTERNAL_LOGGERS:
+        route_to_queue(logging.getLogger(name))
+
+
+_listener_running = False
+
+
+def start_logging() -> None:
+    global _listener_running
+    if not _listener_running:
+        _listener.start()
+        _listener_running = True
+
+
+def stop_logging() -> None:
+    """
+    Flush queued records and stop the listener thread (idempotent). Routed loggers get their
+    handlers back, so records logged later in shutdown are written directly instead of lost.
+    """
+    global _listener_running
+    if _listener_running:
+        _listener.stop()
+        _listener_running = False
+    while _routed:
+        target = _routed.pop()
+        for handler in list(target.handlers):
+            if isinstance(handler, _DeferredQueueHandler):
+                target.removeHandler(handler)
+                for original in handler.targets:
+                    target.addHandler(original)
+
+
 # ---------------------------
 # Create logger
 # ---------------------------
-logger = logging.getLogger("yt_transcript_api")
-logger.setLevel(logging.DEBUG)
+logger = logging.getLogger(APP_LOGGER_NAME)
+logger.setLevel(os.getenv("LOG_LEVEL", "INFO").upper())
+# Our handlers below are the only output; propagating would duplicate lines via root/uvicorn
+logger.propagate = False
+
+for module, level in _parse_spec(os.getenv("LOG_LEVELS", "")).items():
+    get_logger(module).setLevel(level.upper())
 
 # Formatter
 formatter = logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
 
-# Console handler
-console_handler = logging.StreamHandler()
-console_handler.setLevel(logging.INFO)
-console_handler.setFormatter(formatter)
-
-# File handler with rotation
-file_handler = RotatingFileHandler(
-    log_file_path, maxBytes=5*1024*1024, backupCount=5, encoding="utf-8"
-)
-file_handler.setLevel(logging.INFO)
-file_handler.setFormatter(formatter)
-
 # Attach handlers only once
 if not logger.hasHandlers():
+    # Console handler
+    console_handler = logging.StreamHandler()
+    console_handler.setFormatter(formatter)
+
+    # File handler with rotation
+    file_handler = RotatingFileHandler(
+        log_file_path, maxBytes=5*1024*1024, backupCount=5, encoding="utf-8"
+    )
+    file_handler.setFormatter(formatter)
+
     logger.addHandler(console_handler)
     logger.addHandler(file_handler)
+    sample_every = {name: int(n) for name, n in _parse_spec(os.getenv("LOG_SAMPLE", "")).items()}
+    route_to_queue(logger, SamplingFilter(sample_every))
+
+start_logging()
+atexit.register(stop_logging)
 
-logger.info(f"Logger initialized. Log file: {log_file_path}")
+logger.info("Logger initialized. Log file: %s", log_file_path)
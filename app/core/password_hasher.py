@@ -0,0 +1,101 @@
+# app/core/password_hasher.py
+"""
+Bounded pool for bcrypt hashing and verification.
+
+bcrypt is deliberately slow (~250 ms per call at 12 rounds) and releases the GIL, so it runs
+on PASSWORD_HASH_WORKERS dedicated threads instead of on the event loop or FastAPI's shared
+request threadpool. At most PASSWORD_HASH_QUEUE_LIMIT calls wait for a worker; beyond that a
+request is refused with 429 right away instead of queueing behind a login burst and holding
+up every other route.
+
+Sync routes call hash() / verify() (the request thread waits for the result); async code
+awaits hash_async() / verify_async().
+"""
+import asyncio
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable
+
+from fastapi import HTTPException, status
+
+from app.core.config import PASSWORD_HASH_QUEUE_LIMIT, PASSWORD_HASH_WORKERS
+from app.core.logger import get_logger
+from app.core.metrics import Counter, Gauge, Histogram
+from app.utils.security import hash_password, verify_password
+
+logger = get_logger(__name__)
+
+PASSWORD_HASH_SECONDS = Histogram("password_hash_duration_seconds", "bcrypt work per call", ["operation"])
+PASSWORD_HASH_WAIT = Histogram("password_hash_queue_wait_seconds", "Time a hashing call waited for a worker")
+PASSWORD_HASH_REJECTED = Counter(
+    "password_hash_rejected_total", "Hashing calls refused with 429 because the queue was full", ["operation"]
+)
+PASSWORD_HASH_QUEUE = Gauge("password_hash_queue", "Hashing calls waiting for / running on a worker", ["state"])
+
+RETRY_AFTER_SECONDS = 1
+
+
+class PasswordHasher:
+    def __init__(self, workers: int, queue_limit: int):
+        self.workers = max(1, workers)
+        self.queue_limit = max(0, queue_limit)
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="password-hash")
+        self._lock = threading.Lock()
+        self._pending = 0   # admitted and not finished (queued + running)
+        self._running = 0
+
+    def _observe(self, operation: str, fn: Callable, args: tuple, submitted: float):
+        started = time.perf_counter()
+        PASSWORD_HASH_WAIT.observe(started - submitted)
+        with self._lock:
+            self._running += 1
+        try:
+            return fn(*args)
+        finally:
+            PASSWORD_HASH_SECONDS.observe(time.perf_counter() - started, operation=operation)
+            with self._lock:
+                self._running -= 1
+                self._pending -= 1
+
+    def _submit(self, operation: str, fn: Callable, *args) -> Future:
+        with self._lock:
+            if self._pending >= self.workers + self.queue_limit:
+                PASSWORD_HASH_REJECTED.inc(operation=operation)
+                logger.warning("Password hashing queue full (%s pending); refusing %s", self._pending, operation)
+                raise HTTPException(
+                    status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                    detail="Too many authentication requests in progress. Please retry shortly.",
+                    headers={"Retry-After": str(RETRY_AFTER_SECONDS)},
+                )
+            self._pending += 1
+        try:
+            return self._executor.submit(self._observe, operation, fn, args, time.perf_counter())
+        except Exception:
+            with self._lock:
+                self._pending -= 1
+            raise
+
+    def hash(self, password: str) -> str:
+        return self._submit("hash", hash_password, password).result()
+
+    def verify(self, password: str, hashed: str) -> bool:
+        return self._submit("verify", verify_password, password, hashed).result()
+
+    async def hash_async(self, password: str) -> str:
+        return await asyncio.wrap_future(self._submit("hash", hash_password, password))
+
+    async def verify_async(self, password: str, hashed: str) -> bool:
+        return await asyncio.wrap_future(self._submit("verify", verify_password, password, hashed))
+
+    def queue_state(self):
+        with self._lock:
+            pending, running = self._pending, self._running
+        return [({"state": "queued"}, pending - running), ({"state": "running"}, running)]
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+password_hasher = PasswordHasher(PASSWORD_HASH_WORKERS, PASSWORD_HASH_QUEUE_LIMIT)
+PASSWORD_HASH_QUEUE.set_function(password_hasher.queue_state)
@@ -0,0 +1,108 @@
+# app/core/pubsub.py
+"""
+Cross-worker notifications over Redis pub/sub.
+
+Handlers are registered per channel with `subscribe()`; the listener task started at
+application startup dispatches every message to them. Messages published by this process
+are skipped (it has already applied the change locally). Publishing is best-effort: callers
+must not depend on delivery, e.g. caches also run a periodic version check.
+"""
+import asyncio
+import json
+import os
+import socket
+from typing import Callable, Dict, List, Optional
+
+from redis.exceptions import RedisError
+
+from app.core.logger import get_logger
+from app.core.redis import r, sync_r
+
+logger = get_logger(__name__)
+
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}"
+RECONNECT_MAX_SECONDS = 30
+
+_handlers: Dict[str, List[Callable[[dict], None]]] = {}
+_listener_task: Optional[asyncio.Task] = None
+
+
+def subscribe(channel: str, handler: Callable[[dict], None]) -> None:
+    """Register a handler for messages on a channel (call before the listener starts)."""
+    _handlers.setdefault(channel, []).append(handler)
+
+
+def publish(channel: str, message: dict) -> bool:
+    """Publish a JSON message from sync code. Returns False if Redis is unreachable."""
+    payload = json.dumps({**message, "origin": WORKER_ID})
+    try:
+        sync_r.publish(channel, payload)
+        return True
+    except RedisError as e:
+        logger.warning("Could not publish to '%s': %s", channel, e)
+        return False
+
+
+async def publish_async(channel: str, message: dict) -> bool:
+    """publish() for code running on the event loop."""
+    payload = json.dumps({**message, "origin": WORKER_ID})
+    try:
+        await r.publish(channel, payload)
+        return True
+    except RedisError as e:
+        logger.warning("Could not publish to '%s': %s", channel, e)
+        return False
+
+
+def _dispatch(channel: str, data: str) -> None:
+    try:
+        message = json.loads(data)
+    except ValueError:
+        logger.warning("Ignoring malformed message on '%s': %r", channel, data)
+        return
+    if message.get("origin") == WORKER_ID:
+        return
+    for handler in _handlers.get(channel, []):
+        try:
+            handler(message)
+        except Exception as e:
+            logger.error("Pub/sub handler for '%s' failed: %s", channel, e, exc_info=True)
+
+
+async def _listen() -> None:
+    backoff = 1
+    while True:
+        pubsub = r.pubsub()
+        try:
+            await pubsub.subscribe(*_handlers)
+            logger.info("Listening for pub/sub messages on: %s", ', '.join(_handlers))
+            backoff = 1
+            async for msg in pubsub.listen():
+                if msg["type"] == "message":
+                    _dispatch(msg["channel"], msg["data"])
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning("Pub/sub listener disconnected: %s; retrying in %ss", e, backoff)
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, RECONNECT_MAX_SECONDS)
+        finally:
+            await pubsub.aclose()
+
+
+def start_listener() -> None:
+    """Start the background listener on the running event loop (no-op without handlers)."""
+    global _listener_task
+    if _handlers and _listener_task is None:
+        _listener_task = asyncio.get_running_loop().create_task(_listen())
+
+
+async def stop_listener() -> None:
+    global _listener_task
+    if _listener_task is not None:
+        _listener_task.cancel()
+        try:
+            await _listener_task
+        except asyncio.CancelledError:
+            pass
+        _listener_task = None
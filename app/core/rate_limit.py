@@ -0,0 +1,205 @@
+# app/core/rate_limit.py
+"""
+Guest rate limiting: one atomic Lua script (one Redis round trip) per check.
+
+Policies are written "<algorithm>:<limit>/<window seconds>":
+    fixed_window:3/86400    at most 3 requests per key per day (the window starts at the first hit)
+    sliding_window:20/60    at most 20 requests in any 60 s; keeps one sorted-set entry per request
+    token_bucket:10/60      bursts of up to 10, refilled continuously at 10 per 60 s
+    none                    no limit
+
+RATE_LIMIT_DEFAULT applies to every limited route and is one quota shared across them;
+RATE_LIMIT_ROUTES overrides it per route template with a quota of that route's own, e.g.
+    RATE_LIMIT_ROUTES="/scoring/occupations/batch=token_bucket:5/3600,/scoring/occupation/{occupation_id}=none"
+
+Check, increment and expiry happen inside the script, so concurrent requests cannot all pass
+a read before any of them writes. Scripts take the time from Redis, so app clocks do not matter.
+"""
+import math
+import os
+import uuid
+from typing import Dict, NamedTuple, Optional
+
+from redis.exceptions import RedisError
+
+from app.core.logger import get_logger
+from app.core.metrics import REDIS_COMMAND_SECONDS, Counter
+from app.core.redis import r
+
+logger = get_logger(__name__)
+
+FIXED_WINDOW = "fixed_window"
+SLIDING_WINDOW = "sliding_window"
+TOKEN_BUCKET = "token_bucket"
+NO_LIMIT = "none"
+
+RATE_LIMIT_DEFAULT = os.getenv("RATE_LIMIT_DEFAULT", f"{FIXED_WINDOW}:3/86400")
+RATE_LIMIT_ROUTES = os.getenv("RATE_LIMIT_ROUTES", "")
+
+RATE_LIMIT_DECISIONS = Counter(
+    "rate_limit_decisions_total", "Guest rate-limit checks by policy and result (allowed, limited, error)",
+    ["policy", "result"],
+)
+
+# Every script returns {allowed (0/1), remaining, retry/reset in ms}
+
+# KEYS[1] counter; ARGV limit, window_ms. A refused request does not count.
+_FIXED_WINDOW = """
+local limit = tonumber(ARGV[1])
+local count = tonumber(redis.call('get', KEYS[1]) or '0')
+if count >= limit then
+    return {0, 0, redis.call('pttl', KEYS[1])}
+end
+count = redis.call('incr', KEYS[1])
+local ttl = redis.call('pttl', KEYS[1])
+if ttl < 0 then
+    redis.call('pexpire', KEYS[1], ARGV[2])
+    ttl = tonumber(ARGV[2])
+end
+return {1, limit - count, ttl}
+"""
+
+# KEYS[1] sorted set of request times; ARGV limit, window_ms, unique member
+_SLIDING_WINDOW = """
+local limit = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local t = redis.call('time')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+redis.call('zremrangebyscore', KEYS[1], '-inf', now - window)
+local count = redis.call('zcard', KEYS[1])
+if count >= limit then
+    local oldest = redis.call('zrange', KEYS[1], 0, 0, 'WITHSCORES')
+    return {0, 0, tonumber(oldest[2]) + window - now}
+end
+redis.call('zadd', KEYS[1], now, ARGV[3])
+redis.call('pexpire', KEYS[1], window)
+return {1, limit - count - 1, window}
+"""
+
+# KEYS[1] hash {tokens, ts}; ARGV capacity, ms to refill one token
+_TOKEN_BUCKET = """
+local capacity = tonumber(ARGV[1])
+local per_token = tonumber(ARGV[2])
+local t = redis.call('time')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+local state = redis.call('hmget', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) / per_token)
+local allowed = 0
+local wait = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+else
+    wait = math.ceil((1 - tokens) * per_token)
+end
+redis.call('hset', KEYS[1], 'tokens', tostring(tokens), 'ts', now)
+redis.call('pexpire', KEYS[1], math.ceil(capacity * per_token))
+return {allowed, math.floor(tokens), wait}
+"""
+
+
+class RateLimitPolicy(NamedTuple):
+    algorithm: str
+    limit: int = 0
+    window_seconds: float = 0.0
+
+    def __str__(self) -> str:
+        if self.algorithm == NO_LIMIT:
+            return NO_LIMIT
+        return f"{self.algorithm}:{self.limit}/{self.window_seconds:g}"
+
+
+class RateLimitDecision(NamedTuple):
+    allowed: bool
+    policy: RateLimitPolicy
+    remaining: int
+    retry_after_ms: int
+
+    @property
+    def retry_after(self) -> int:
+        """Whole seconds to wait before retrying (Retry-After)."""
+        return max(1, math.ceil(self.retry_after_ms / 1000)) if not self.allowed else 0
+
+    def headers(self) -> Dict[str, str]:
+        headers = {"X-RateLimit-Limit": str(self.policy.limit), "X-RateLimit-Remaining": str(max(0, self.remaining))}
+        if not self.allowed:
+            headers["Retry-After"] = str(self.retry_after)
+        return headers
+
+
+def parse_policy(spec: str) -> RateLimitPolicy:
+    """ "token_bucket:10/60" -> RateLimitPolicy("token_bucket", 10, 60.0); raises ValueError if malformed."""
+    spec = spec.strip()
+    if spec == NO_LIMIT:
+        return RateLimitPolicy(NO_LIMIT)
+    try:
+        algorithm, rest = spec.split(":", 1)
+        limit, window = rest.split("/", 1)
+        policy = RateLimitPolicy(algorithm.strip(), int(limit), float(window))
+    except ValueError:
+        raise ValueError(f"Malformed rate limit policy {spec!r}; expected '<algorithm>:<limit>/<seconds>'") from None
+    if policy.algorithm not in (FIXED_WINDOW, SLIDING_WINDOW, TOKEN_BUCKET):
+        raise ValueError(f"Unknown rate limit algorithm {policy.algorithm!r}")
+    if policy.limit < 1 or policy.window_seconds <= 0:
+        raise ValueError(f"Rate limit policy {spec!r} needs a positive limit and window")
+    return policy
+
+
+def parse_route_policies(spec: str) -> Dict[str, RateLimitPolicy]:
+    pairs = (item.split("=", 1) for item in spec.split(",") if "=" in item)
+    return {route.strip(): parse_policy(policy) for route, policy in pairs if route.strip()}
+
+
+class RateLimiter:
+    """Applies the default or per-route policy to a caller identifier."""
+
+    def __init__(self, default: RateLimitPolicy, routes: Optional[Dict[str, RateLimitPolicy]] = None, client=None):
+        self.default = default
+        self.routes = routes or {}
+        self.client = client if client is not None else r
+        self._scripts = {
+            FIXED_WINDOW: self.client.register_script(_FIXED_WINDOW),
+            SLIDING_WINDOW: self.client.register_script(_SLIDING_WINDOW),
+            TOKEN_BUCKET: self.client.register_script(_TOKEN_BUCKET),
+        }
+
+    def policy_for(self, route: str) -> RateLimitPolicy:
+        return self.routes.get(route, self.default)
+
+    def _key(self, route: str, policy: RateLimitPolicy, identifier: str) -> str:
+        # The default policy is one quota across routes; overridden routes count separately
+        scope = route if route in self.routes else "default"
+        return f"ratelimit:{policy.algorithm}:{scope}:{identifier}"
+
+    async def hit(self, route: str, identifier: str) -> Optional[RateLimitDecision]:
+        """
+        Count one request by identifier on route. Returns None when the route is not limited or
+        Redis is unavailable (guests are let through rather than failing the request).
+        """
+        policy = self.policy_for(route)
+        if policy.algorithm == NO_LIMIT:
+            return None
+        window_ms = int(policy.window_seconds * 1000)
+        if policy.algorithm == FIXED_WINDOW:
+            args = [policy.limit, window_ms]
+        elif policy.algorithm == SLIDING_WINDOW:
+            args = [policy.limit, window_ms, uuid.uuid4().hex]
+        else:
+            args = [policy.limit, repr(window_ms / policy.limit)]
+        try:
+            with REDIS_COMMAND_SECONDS.time(operation="rate_limit"):
+                allowed, remaining, retry_ms = await self._scripts[policy.algorithm](
+                    keys=[self._key(route, policy, identifier)], args=args
+                )
+        except RedisError as e:
+            RATE_LIMIT_DECISIONS.inc(policy=str(policy), result="error")
+            logger.warning("Rate limiter unavailable (%s); letting the request through", e)
+            return None
+        decision = RateLimitDecision(bool(allowed), policy, int(remaining), int(retry_ms))
+        RATE_LIMIT_DECISIONS.inc(policy=str(policy), result="allowed" if decision.allowed else "limited")
+        return decision
+
+
+rate_limiter = RateLimiter(parse_policy(RATE_LIMIT_DEFAULT), parse_route_policies(RATE_LIMIT_ROUTES))
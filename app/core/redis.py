@@ -1,5 +1,8 @@
+import redis as redis_sync
 import redis.asyncio as redis
 import os
 
 REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
 r = redis.Redis.from_url(REDIS_URL, decode_responses=True)
+# For sync code paths (threadpool routes, CLI jobs) that cannot await the asyncio client
+sync_r = redis_sync.Redis.from_url(REDIS_URL, decode_responses=True)
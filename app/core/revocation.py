@@ -0,0 +1,186 @@
+# app/core/revocation.py
+"""
+Token revocation checks without a Redis round trip per authenticated request.
+
+Redis keys revoked:{sub}:{iat} (TTL = the token's remaining lifetime) stay the source of
+truth. Each worker keeps a Bloom filter of the revoked token ids:
+    - seeded from a SCAN of revoked:* at startup and re-seeded every REVOCATION_RESYNC_SECONDS
+      (in the background), which also drops ids whose keys have expired;
+    - updated immediately on this worker's logouts and, via pub/sub, on other workers'.
+A filter miss means "not revoked" with certainty; only filter hits (real revocations and
+rare false positives) are confirmed with a Redis GET. Until the first seed has loaded, or
+after it failed, every check goes to Redis as before.
+
+Decoded token payloads are kept in a bounded LRU (TOKEN_CACHE_SIZE) until they expire, so
+repeat requests with the same token skip the JWT signature check too.
+"""
+import asyncio
+import hashlib
+import math
+import os
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+
+from redis.exceptions import RedisError
+
+from app.core import pubsub
+from app.core.logger import get_logger
+from app.core.metrics import CACHE_LOOKUPS, REDIS_COMMAND_SECONDS
+from app.core.redis import r
+
+logger = get_logger(__name__)
+
+REVOKED_KEY_PREFIX = "revoked:"
+REVOCATION_CHANNEL = "auth:revoked"
+REVOCATION_BLOOM_CAPACITY = int(os.getenv("REVOCATION_BLOOM_CAPACITY", 100_000))
+REVOCATION_BLOOM_ERROR_RATE = float(os.getenv("REVOCATION_BLOOM_ERROR_RATE", 0.001))
+REVOCATION_RESYNC_SECONDS = int(os.getenv("REVOCATION_RESYNC_SECONDS", 300))
+TOKEN_CACHE_SIZE = int(os.getenv("TOKEN_CACHE_SIZE", 10_000))
+
+
+def token_id(sub: str, iat: int) -> str:
+    return f"{sub}:{iat}"
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over strings (double hashing on one blake2b digest)."""
+
+    def __init__(self, capacity: int, error_rate: float):
+        capacity = max(1, capacity)
+        self.size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item: str):
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hashes))
+
+    def add(self, item: str) -> None:
+        for pos in self._positions(item):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def __contains__(self, item: str) -> bool:
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item))
+
+
+class TokenPayloadCache:
+    """Bounded LRU of decoded token payloads; entries are dropped once the token expires."""
+
+    def __init__(self, size: int):
+        self.size = size
+        self._entries: "OrderedDict[str, dict]" = OrderedDict()
+
+    def get(self, token: str) -> Optional[dict]:
+        payload = self._entries.get(token)
+        if payload is None:
+            CACHE_LOOKUPS.inc(cache="token_payload", result="miss")
+            return None
+        if payload.get("exp", 0) <= time.time():
+            del self._entries[token]
+            CACHE_LOOKUPS.inc(cache="token_payload", result="miss")
+            return None
+        self._entries.move_to_end(token)
+        CACHE_LOOKUPS.inc(cache="token_payload", result="hit")
+        return payload
+
+    def put(self, token: str, payload: dict) -> None:
+        if self.size <= 0:
+            return
+        self._entries[token] = payload
+        self._entries.move_to_end(token)
+        while len(self._entries) > self.size:
+            self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class RevocationService:
+    def __init__(self):
+        self._filter: Optional[BloomFilter] = None
+        self._synced_at = 0.0
+        self._resync_task: Optional[asyncio.Task] = None
+        # Ids revoked while a re-seed is scanning; added to the new filter before it is swapped in
+        self._during_resync: Optional[set] = None
+
+    @property
+    def ready(self) -> bool:
+        return self._filter is not None
+
+    def add(self, tid: str) -> None:
+        """Record a revoked token id locally (this worker's logout or a pub/sub message)."""
+        if self._filter is not None:
+            self._filter.add(tid)
+        if self._during_resync is not None:
+            self._during_resync.add(tid)
+
+    def on_message(self, message: dict) -> None:
+        tid = message.get("token")
+        if tid:
+            self.add(tid)
+
+    async def resync(self) -> None:
+        """Rebuild the filter from the revoked:* keys currently in Redis."""
+        self._during_resync = set()
+        try:
+            ids = []
+            with REDIS_COMMAND_SECONDS.time(operation="revocation_scan"):
+                async for key in r.scan_iter(match=REVOKED_KEY_PREFIX + "*", count=1000):
+                    ids.append(key[len(REVOKED_KEY_PREFIX):])
+            bloom = BloomFilter(max(REVOCATION_BLOOM_CAPACITY, 2 * len(ids)), REVOCATION_BLOOM_ERROR_RATE)
+            for tid in ids:
+                bloom.add(tid)
+            for tid in self._during_resync:
+                bloom.add(tid)
+            self._filter = bloom
+            logger.info("Revocation filter loaded with %s revoked tokens", len(ids))
+        except RedisError as e:
+            logger.warning("Could not load revoked tokens (%s); checking Redis per request", e)
+        finally:
+            self._during_resync = None
+            self._synced_at = time.monotonic()
+
+    def _schedule_resync(self) -> None:
+        if self._resync_task is not None and not self._resync_task.done():
+            return
+        if time.monotonic() - self._synced_at < REVOCATION_RESYNC_SECONDS:
+            return
+        self._synced_at = time.monotonic()
+        self._resync_task = asyncio.get_running_loop().create_task(self.resync())
+
+    async def is_revoked(self, sub: str, iat: int) -> bool:
+        tid = token_id(sub, iat)
+        self._schedule_resync()
+        if self._filter is not None and tid not in self._filter:
+            CACHE_LOOKUPS.inc(cache="revocation_filter", result="negative")
+            return False
+        CACHE_LOOKUPS.inc(cache="revocation_filter", result="positive" if self._filter is not None else "bypass")
+        with REDIS_COMMAND_SECONDS.time(operation="revocation_get"):
+            return bool(await r.get(REVOKED_KEY_PREFIX + tid))
+
+    async def revoke(self, sub: str, iat: int, ttl_seconds: int) -> None:
+        """Revoke a token in Redis, locally and, best-effort, on the other workers."""
+        tid = token_id(sub, iat)
+        await r.set(REVOKED_KEY_PREFIX + tid, "revoked", ex=ttl_seconds)
+        self.add(tid)
+        await pubsub.publish_async(REVOCATION_CHANNEL, {"token": tid})
+
+    def stats(self) -> Dict[str, object]:
+        bloom = self._filter
+        return {
+            "ready": bloom is not None,
+            "revoked_tokens": bloom.count if bloom else 0,
+            "filter_bytes": len(bloom.bits) if bloom else 0,
+            "filter_hashes": bloom.hashes if bloom else 0,
+            "cached_payloads": len(token_cache),
+        }
+
+
+revocations = RevocationService()
+token_cache = TokenPayloadCache(TOKEN_CACHE_SIZE)
+pubsub.subscribe(REVOCATION_CHANNEL, revocations.on_message)
@@ -1,10 +1,20 @@
-from fastapi import FastAPI
-from app.core.database import Base, engine
-from app.routers import admin_ops, auth as auth_router, bulk_import, data_loaders, occupation_router, occupation_skill_relations, scoring_routes, skill_hierarchy_router, skill_router, skillgroup_router
-from app.core.logger import logger
+from fastapi import FastAPI, Response
+from app.core.database import Base, SessionLocal, async_engine, engine, ensure_indexes
+# ORM models for create_all() and the mappers; the COPY loaders no longer import them
+from app.models import occupation, occupation_skill_relation, skill, skill_group, skill_hierarchy  # noqa: F401
+from app.routers import admin_ops, auth as auth_router, bulk_import, data_loaders, occupation_router, occupation_skill_relations, skill_hierarchy_router, skill_router, skillgroup_router
+from app.core.logger import logger, route_external_loggers, stop_logging
 import logging   # <-- built-in Python logging
 from fastapi.middleware.cors import CORSMiddleware
-from app.scoring.router import router as scoring_router
+from app.scoring.router import autocomplete, router as scoring_router
+from fastapi.concurrency import run_in_threadpool
+from app.scoring.repository import ensure_data_version_triggers, ensure_scoring_indexes, ensure_search_indexes
+from app.core import metrics, pubsub
+from app.core.revocation import revocations
+from app.core.password_hasher import password_hasher
+from app.services import mail_service
+from app.services.occupation_skill_relation_service import ensure_relation_index
+from app.scoring.autocomplete import AUTOCOMPLETE_ENABLED
 
 
 
@@ -27,9 +37,19 @@ app.add_middleware(
     allow_methods=["*"],  # Allows all methods (GET, POST, etc.)
     allow_headers=["*"],  # Allows all headers
 )
+# Per-route request latency; also tags DB connection hold time with the route template
+app.add_middleware(metrics.RequestMetricsMiddleware)
 
 # Create tables on startup
 Base.metadata.create_all(bind=engine)
+with SessionLocal() as db:
+    # Before ensure_indexes(): the unique pair index needs duplicate relations removed first
+    ensure_relation_index(db)
+ensure_indexes()
+with SessionLocal() as db:
+    ensure_scoring_indexes(db)
+    ensure_data_version_triggers(db)
+    ensure_search_indexes(db)
 
 # Include auth routes
 app.include_router(auth_router.router)
@@ -50,6 +70,15 @@ app.include_router(data_loaders.router)
 
 @app.on_event("startup")
 async def startup_event():
+    route_external_loggers()
+    pubsub.start_listener()
+    await revocations.resync()
+    mail_service.start_worker()
+    if AUTOCOMPLETE_ENABLED:
+        try:
+            await run_in_threadpool(autocomplete.rebuild)
+        except Exception as e:
+            logger.error("Autocomplete index build failed, /scoring/search will use SQL: %s", e)
     logger.info("Application startup complete.")
 
 @app.get("/ping")
@@ -57,7 +86,17 @@ async def ping():
     logger.info("Ping endpoint was called.")
     return {"message": "pong"}
 
+@app.get("/metrics", include_in_schema=False)
+def metrics_endpoint():
+    """Prometheus scrape endpoint (this worker's pool and request metrics)."""
+    return Response(metrics.render(), media_type=metrics.CONTENT_TYPE)
+
 @app.on_event("shutdown")
 async def shutdown_event():
     logger.info("🛑 Application shutting down, flushing logs...")
-    logging.shutdown()
\ No newline at end of file
+    await pubsub.stop_listener()
+    await mail_service.stop_worker()
+    await async_engine.dispose()
+    password_hasher.shutdown()
+    stop_logging()
+    logging.shutdown()
@@ -0,0 +1,15 @@
+# app/models/occupation_risk_recompute.py
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, func
+from app.core.database import Base
+
+class OccupationRiskRecompute(Base):
+    """Risk score of one occupation in a catalogue recompute run (python -m app.scoring.recompute)."""
+    __tablename__ = "occupation_risk_recomputes"
+
+    run_id = Column(String(64), primary_key=True)
+    occupation_id = Column(Integer, ForeignKey("occupations.id", ondelete="CASCADE"), primary_key=True)
+    alpha = Column(Float, nullable=False)
+    risk_score = Column(Float, nullable=False)
+    level = Column(String(10), nullable=False)
+    skills_analyzed = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -0,0 +1,17 @@
+# app/models/occupation_risk_score.py
+from sqlalchemy import BigInteger, Column, Integer, String, Float, DateTime, ForeignKey, func
+from sqlalchemy.dialects.postgresql import JSONB
+from app.core.database import Base
+
+class OccupationRiskScore(Base):
+    """Materialized scoring payload, one row per occupation."""
+    __tablename__ = "occupation_risk_scores"
+
+    occupation_id = Column(Integer, ForeignKey("occupations.id", ondelete="CASCADE"), primary_key=True)
+    risk_score = Column(Float, nullable=False)
+    level = Column(String(10), nullable=False)
+    skills_analyzed = Column(Integer, nullable=False, default=0)
+    payload = Column(JSONB, nullable=False)
+    # scoring_data_versions "scores" version the payload was computed at; a mismatch reads as a miss
+    data_version = Column(BigInteger)
+    computed_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
@@ -1,14 +1,19 @@
-from sqlalchemy import Column, Integer, String, ForeignKey
+from sqlalchemy import Column, Integer, String, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from app.core.database import Base
 
 class OccupationSkillRelation(Base):
     __tablename__ = "occupation_skill_relations"
+    # Relation imports resolve against it with ON CONFLICT (occupation_id, skill_id) DO NOTHING.
+    # Existing databases get it from ensure_relation_pair_index(), which removes duplicate pairs first
+    __table_args__ = (
+        Index("uq_occupation_skill_relations_pair", "occupation_id", "skill_id", unique=True),
+    )
 
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     
-    occupation_id = Column(Integer, ForeignKey("occupations.id", ondelete="CASCADE"), nullable=False)
-    skill_id = Column(Integer, ForeignKey("skills.id", ondelete="CASCADE"), nullable=False)
+    occupation_id = Column(Integer, ForeignKey("occupations.id", ondelete="CASCADE"), nullable=False, index=True)
+    skill_id = Column(Integer, ForeignKey("skills.id", ondelete="CASCADE"), nullable=False, index=True)
 
     relationType = Column(String(50))
     skillType = Column(String(100))
@@ -0,0 +1,11 @@
+# app/models/scoring_data_version.py
+from sqlalchemy import Column, String, BigInteger, DateTime, func
+from app.core.database import Base
+
+class ScoringDataVersion(Base):
+    """Change counter per scoring dataset (e.g. "buckets"), bumped by triggers or admin invalidation."""
+    __tablename__ = "scoring_data_versions"
+
+    name = Column(String(50), primary_key=True)
+    version = Column(BigInteger, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
@@ -0,0 +1,31 @@
+# app/models/skill_bucket_match.py
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, func
+from app.core.database import Base
+
+class SkillBucketMatch(Base):
+    """One keyword hit of a bucket keyword in a skill's label or definition."""
+    __tablename__ = "skill_bucket_matches"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    skill_id = Column(Integer, ForeignKey("skills.id", ondelete="CASCADE"), nullable=False, index=True)
+    bucket_id = Column(Integer, nullable=False, index=True)
+    keyword = Column(Text, nullable=False)
+    field = Column(String(20), nullable=False)  # "label" | "definition"
+    position = Column(Integer, nullable=False)  # character offset within the field
+
+
+class SkillMatchSource(Base):
+    """Fingerprint of the skill text the matches were computed from."""
+    __tablename__ = "skill_match_sources"
+
+    skill_id = Column(Integer, ForeignKey("skills.id", ondelete="CASCADE"), primary_key=True)
+    text_hash = Column(String(32), nullable=False)
+    matched_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+
+class SkillMatchKeyword(Base):
+    """Snapshot of the bucket keywords the stored matches were built against."""
+    __tablename__ = "skill_match_keywords"
+
+    bucket_id = Column(Integer, primary_key=True)
+    keyword = Column(Text, primary_key=True)
@@ -1,10 +1,18 @@
 import os
 import re
+from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
 from sqlalchemy import text
-from app.core.database import get_db
+from app.core.database import Base, ensure_indexes, get_db
 from app.core.logger import logger
+from app.core.revocation import revocations
+from app.scoring import repository as scoring_repo
+from app.scoring.router import autocomplete, scorer
+from app.services import mail_service
+from app.services.cache_service import CacheService
+from app.services.occupation_skill_relation_service import ensure_relation_index
+from app.services.skill_bucket_match_service import build_skill_bucket_matches
 
 router = APIRouter(prefix="/admin/ops", tags=["Admin Operations"])
 
@@ -121,15 +129,173 @@ def swap_schemas_live(
             
             # B. Move staging to live
             db.execute(text(f"ALTER SCHEMA {staging_schema} RENAME TO public;"))
+
+            # C. schema.sql does not create the ORM-only tables (occupation_risk_scores,
+            # skill_match_*, ...); add them in the same transaction so no request sees them missing
+            Base.metadata.create_all(bind=db.connection())
             
         logger.info("✨ SUCCESS: Swap complete. New data is live.")
+        # The promoted schema may predate the search column / indexes / version triggers
+        ensure_relation_index(db)
+        ensure_indexes()
+        scoring_repo.ensure_scoring_indexes(db)
+        scoring_repo.ensure_data_version_triggers(db)
+        scoring_repo.ensure_search_indexes(db)
+        # Cached bucket metadata belongs to the old schema
+        scorer.invalidate_bucket_cache(broadcast=True)
+        # Keyword matches and stored scores have to be built for the new data
+        report = {}
+        try:
+            matches = build_skill_bucket_matches(db, full=True)
+            report["skill_bucket_matches"] = {k: v for k, v in matches.items() if not k.startswith("changed_")}
+            report["risk_scores"] = scorer.rebuild_materialized(db)
+        except Exception as e:
+            db.rollback()
+            # Scores missing from the store are computed live on their first read
+            logger.error(f"Post-swap risk score rebuild failed: {e}")
+            report["error"] = str(e)
+        CacheService.bump_dataset_version_sync()
         return {
             "status": "success", 
-            "message": f"Staging '{staging_schema}' is now LIVE. Old data backed up to '{BACKUP_SCHEMA}'."
+            "message": f"Staging '{staging_schema}' is now LIVE. Old data backed up to '{BACKUP_SCHEMA}'.",
+            "report": report,
         }
 
     except HTTPException as he:
         raise he
     except Exception as e:
         logger.error(f"Swap Failed: {e}")
-        raise HTTPException(status_code=500, detail=f"Database Swap Failed: {str(e)}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Database Swap Failed: {str(e)}")
+
+
+@router.post("/risk-scores/rebuild", summary="Recompute all materialized risk scores")
+def rebuild_risk_scores(db: Session = Depends(get_db)):
+    """
+    Batch job: recompute the occupation_risk_scores store for every occupation.
+    Run after an ESCO re-import or a schema swap.
+    """
+    try:
+        report = scorer.rebuild_materialized(db)
+        CacheService.bump_dataset_version_sync()
+        return {"status": "success", "report": report}
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Risk score rebuild failed: {e}")
+        raise HTTPException(status_code=500, detail=f"Risk score rebuild failed: {str(e)}")
+
+
+@router.post("/risk-scores/refresh", summary="Incrementally refresh materialized risk scores")
+def refresh_risk_scores(
+    occupation_ids: Optional[List[int]] = Query(None, description="Occupations whose relations changed"),
+    skill_ids: Optional[List[int]] = Query(None, description="Skills whose automation scores changed"),
+    bucket_ids: Optional[List[int]] = Query(None, description="Buckets whose weights or keywords changed"),
+    db: Session = Depends(get_db)
+):
+    """
+    Recompute only the occupations affected by the given changes.
+    """
+    if not (occupation_ids or skill_ids or bucket_ids):
+        raise HTTPException(status_code=400, detail="Provide occupation_ids, skill_ids or bucket_ids.")
+    try:
+        report = scorer.refresh_materialized(db, occupation_ids, skill_ids, bucket_ids)
+        CacheService.bump_dataset_version_sync()
+        return {"status": "success", "report": report}
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Risk score refresh failed: {e}")
+        raise HTTPException(status_code=500, detail=f"Risk score refresh failed: {str(e)}")
+
+
+@router.post("/skill-bucket-matches/rebuild", summary="Recompute skill -> bucket keyword matches")
+def rebuild_skill_bucket_matches(
+    full: bool = Query(False, description="Drop and rebuild all matches instead of only changed skills/keywords"),
+    db: Session = Depends(get_db)
+):
+    """
+    Re-run the keyword matching stage after editing skills or bucket keywords,
+    then refresh the materialized risk scores of the affected occupations.
+    """
+    try:
+        report = build_skill_bucket_matches(db, full=full)
+        changed_skill_ids = report.pop("changed_skill_ids")
+        changed_bucket_ids = report.pop("changed_bucket_ids")
+        if changed_skill_ids or changed_bucket_ids:
+            report["risk_scores"] = scorer.refresh_materialized(
+                db, skill_ids=changed_skill_ids, bucket_ids=changed_bucket_ids
+            )
+            CacheService.bump_dataset_version_sync()
+        return {"status": "success", "report": report}
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Skill bucket match rebuild failed: {e}")
+        raise HTTPException(status_code=500, detail=f"Skill bucket match rebuild failed: {str(e)}")
+
+
+@router.get("/scoring-cache", summary="Inspect this worker's bucket keyword cache")
+def get_scoring_cache_info(db: Session = Depends(get_db)):
+    """Cached version vs. the current scoring_data_versions counter."""
+    try:
+        info = scorer.bucket_cache_info()
+        info["db_version"] = scoring_repo.get_data_version(db, scoring_repo.BUCKET_VERSION_NAME)
+        return info
+    except Exception as e:
+        logger.error(f"Reading scoring cache info failed: {e}")
+        raise HTTPException(status_code=500, detail=f"Reading scoring cache info failed: {str(e)}")
+
+
+@router.post("/scoring-cache/invalidate", summary="Invalidate the bucket keyword cache on all workers")
+def invalidate_scoring_cache(db: Session = Depends(get_db)):
+    """
+    Bump the "buckets" data version and broadcast an invalidation over Redis pub/sub;
+    cached scoring/search responses are dropped too (new dataset version).
+    Workers that miss the broadcast still reload on their next version check.
+    """
+    try:
+        version = scoring_repo.bump_data_version(db, scoring_repo.BUCKET_VERSION_NAME)
+        db.commit()
+        scorer.invalidate_bucket_cache(broadcast=True)
+        CacheService.bump_dataset_version_sync()
+        return {"status": "success", "version": version}
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Scoring cache invalidation failed: {e}")
+        raise HTTPException(status_code=500, detail=f"Scoring cache invalidation failed: {str(e)}")
+
+
+@router.get("/autocomplete", summary="Autocomplete index stats for this worker")
+def get_autocomplete_stats():
+    """Size, build time, dataset version and approximate memory footprint of the in-memory index."""
+    return autocomplete.stats()
+
+
+@router.post("/autocomplete/rebuild", summary="Rebuild this worker's autocomplete index")
+def rebuild_autocomplete():
+    """Rebuild from the database now (other workers rebuild on their next dataset version check)."""
+    try:
+        return {"status": "success", "stats": autocomplete.rebuild()}
+    except Exception as e:
+        logger.error(f"Autocomplete rebuild failed: {e}")
+        raise HTTPException(status_code=500, detail=f"Autocomplete rebuild failed: {str(e)}")
+
+
+@router.get("/revocations", summary="Token revocation filter stats for this worker")
+def get_revocation_stats():
+    """Size of the in-process revocation Bloom filter and of the decoded-token cache."""
+    return revocations.stats()
+
+
+@router.post("/revocations/resync", summary="Reload this worker's revocation filter from Redis")
+async def resync_revocations():
+    await revocations.resync()
+    return {"status": "success", "stats": revocations.stats()}
+
+
+@router.get("/mail", summary="Outbound mail queue sizes")
+def get_mail_queue_stats():
+    """Jobs waiting (outbox), being sent (inflight), waiting to retry and given up on (dead)."""
+    return mail_service.queue_stats()
+
+
+@router.post("/mail/dead/requeue", summary="Retry mail that was given up on")
+def requeue_dead_mail(limit: int = Query(1000, ge=1)):
+    return {"status": "success", "requeued": mail_service.requeue_dead(limit)}
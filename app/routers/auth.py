@@ -11,7 +11,7 @@ from app.core.deps import get_current_user
 router = APIRouter(prefix="/auth", tags=["Auth"])
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
-@router.post("/signup", response_model=PublicUser)
+@router.post("/signup", response_model=PublicUser, status_code=status.HTTP_202_ACCEPTED)
 def signup(payload: SignUpRequest, db: Session = Depends(get_db)):
     logger.info(f"Signup API called for email: {payload.email}")
     try:
@@ -44,7 +44,7 @@ def login(payload: LoginRequest, db: Session = Depends(get_db)):
         logger.warning(f"Login failed for email: {payload.email} - {e.detail}")
         raise
 
-@router.post("/resend-verification-code")
+@router.post("/resend-verification-code", status_code=status.HTTP_202_ACCEPTED)
 def resend_verification(payload: dict, db: Session = Depends(get_db)):
     """
     Resend the email verification code to a user.
@@ -82,7 +82,7 @@ def refresh_token(refresh_token: str = Depends(oauth2_scheme)):
     except HTTPException as e:
         raise e
     
-@router.post("/send-forgot-password-code")
+@router.post("/send-forgot-password-code", status_code=status.HTTP_202_ACCEPTED)
 async def forgot_password(payload: ForgotPasswordRequest, db: Session = Depends(get_db)):
     user = auth_service.get_user_by_email(db, payload.email)  # DB lookup
     if not user:
@@ -2,30 +2,12 @@
 API Router for loading CSV data into specific database schemas.
 """
 import os
-import pandas as pd
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 
 from app.core.database import get_db
-# Import the Service Layer we just created
 import app.services.data_loader_service as service
 
-# Import Schemas
-
-from app.models.occupation import Occupation
-from app.models.skill import Skill
-from app.models.skill_group import SkillGroup
-from app.models.skill_hierarchy import SkillHierarchy
-from app.models.occupation_skill_relation import OccupationSkillRelation
-
-
-# Import Cleaning Utils (Assuming these exist or you will create them similar to occupations)
-from app.utils.occupations_cleaner import clean_occupations
-from app.utils.skill_cleaner import clean_skill_csv
-from app.utils.skill_hierarchy_cleaner import clean_skill_hierarchy_csv
-from app.utils.occupation_skill_relation_cleaner import clean_occupation_skill_relation_csv
-from app.utils.skillgroup_cleaner import clean_skillgroup_csv
-
 router = APIRouter(tags=["Data Loaders"])
 
 # CSV File Paths (Inside Docker Container)
@@ -37,11 +19,11 @@ PATHS = {
     "relations": "/app/data/occupationSkillRelations.csv"
 }
 
-def _load_csv_dataframe(file_path: str) -> pd.DataFrame:
-    """Helper to read CSV safely."""
+def _require_file(file_path: str) -> str:
+    """Helper to fail fast with 404 when a CSV is missing."""
     if not os.path.exists(file_path):
         raise HTTPException(status_code=404, detail=f"File not found: {file_path}")
-    return pd.read_csv(file_path, dtype=str, keep_default_na=False)
+    return file_path
 
 
 @router.post("/occupations/load", summary="Load Occupations CSV")
@@ -49,16 +31,9 @@ def load_occupations(
     target_schema: str = Query(..., description="Schema to insert data into"),
     db: Session = Depends(get_db)
 ):
+    file_path = _require_file(PATHS["occupation"])
     try:
-        df = _load_csv_dataframe(PATHS["occupation"])
-        cleaned_df = clean_occupations(df)
-        
-        # Convert to Pydantic
-        data_list = [Occupation(**row._asdict()) for row in cleaned_df.itertuples(index=False)]
-        
-        # Call Service
-        count = service.insert_occupations(db, data_list, target_schema)
-        
+        count = service.load_entity_csv(db, "occupations", file_path, target_schema)
         return {"status": "success", "schema": target_schema, "inserted": count}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -69,14 +44,9 @@ def load_skills(
     target_schema: str = Query(..., description="Schema to insert data into"),
     db: Session = Depends(get_db)
 ):
+    file_path = _require_file(PATHS["skill"])
     try:
-        df = _load_csv_dataframe(PATHS["skill"])
-        # Assuming you have a clean_skills function
-        cleaned_df = clean_skill_csv(df) 
-        
-        data_list = [Skill(**row._asdict()) for row in cleaned_df.itertuples(index=False)]
-        count = service.insert_skills(db, data_list, target_schema)
-        
+        count = service.load_entity_csv(db, "skills", file_path, target_schema)
         return {"status": "success", "schema": target_schema, "inserted": count}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -87,13 +57,9 @@ def load_skill_groups(
     target_schema: str = Query(..., description="Schema to insert data into"),
     db: Session = Depends(get_db)
 ):
+    file_path = _require_file(PATHS["skill_group"])
     try:
-        df = _load_csv_dataframe(PATHS["skill_group"])
-        cleaned_df = clean_skillgroup_csv(df)
-        
-        data_list = [SkillGroup(**row._asdict()) for row in cleaned_df.itertuples(index=False)]
-        count = service.insert_skill_groups(db, data_list, target_schema)
-        
+        count = service.load_entity_csv(db, "skill_groups", file_path, target_schema)
         return {"status": "success", "schema": target_schema, "inserted": count}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -104,13 +70,9 @@ def load_skill_hierarchy(
     target_schema: str = Query(..., description="Schema to insert data into"),
     db: Session = Depends(get_db)
 ):
+    file_path = _require_file(PATHS["hierarchy"])
     try:
-        df = _load_csv_dataframe(PATHS["hierarchy"])
-        cleaned_df = clean_skill_hierarchy_csv(df)
-        
-        data_list = [SkillHierarchy(**row._asdict()) for row in cleaned_df.itertuples(index=False)]
-        count = service.insert_skill_hierarchy(db, data_list, target_schema)
-        
+        count = service.load_entity_csv(db, "skill_hierarchy", file_path, target_schema)
         return {"status": "success", "schema": target_schema, "inserted": count}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -121,14 +83,17 @@ def load_relations(
     target_schema: str = Query(..., description="Schema to insert data into"),
     db: Session = Depends(get_db)
 ):
+    file_path = _require_file(PATHS["relations"])
     try:
-        df = _load_csv_dataframe(PATHS["relations"])
-        cleaned_df = clean_occupation_skill_relation_csv(df)
-        
-        data_list = [OccupationSkillRelation(**row._asdict()) for row in cleaned_df.itertuples(index=False)]
-        count = service.insert_relations(db, data_list, target_schema)
-        
-        return {"status": "success", "schema": target_schema, "inserted": count}
+        result = service.load_relations_csv(db, file_path, target_schema)
+        return {
+            "status": "success",
+            "schema": target_schema,
+            "inserted": result.inserted,
+            "already_present": result.existing,
+            "unresolved_occupation_uris": result.unresolved_occupations,
+            "unresolved_skill_uris": result.unresolved_skills,
+        }
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -1,12 +1,9 @@
 import os
-import pandas as pd
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 
 from app.core.database import get_db
-from app.utils.occupations_cleaner import clean_occupations
-from app.schemas.occupation import OccupationSchema
-from app.services.occupation_service import insert_occupations
+from app.services import copy_loader
 
 router = APIRouter(prefix="/occupations", tags=["Occupations"])
 
@@ -17,7 +14,7 @@ FILE_PATH = "/app/data/occupations_en.csv"
 @router.post("/load")
 def load_occupations_from_file(db: Session = Depends(get_db)):
     """
-    Load occupations from a local CSV file, clean it, and insert into PostgreSQL.
+    Load occupations from a local CSV file, clean it, and stream it into PostgreSQL with COPY.
     """
     if not os.path.exists(FILE_PATH):
         raise HTTPException(
@@ -26,24 +23,13 @@ def load_occupations_from_file(db: Session = Depends(get_db)):
         )
 
     try:
-        # 1. Read CSV into DataFrame
-        df = pd.read_csv(FILE_PATH, dtype=str, keep_default_na=False)
-
-        # 2. Clean DataFrame
-        cleaned_df = clean_occupations(df)
-
-        # 3. Convert rows to Pydantic schema objects
-        occupations = [
-            OccupationSchema(**row._asdict())
-            for row in cleaned_df.itertuples(index=False)
-        ]
-
-        # 4. Insert into DB
-        insert_occupations(db, occupations)
+        # Stream the cleaned rows straight into PostgreSQL with COPY
+        inserted = copy_loader.load_csv(db, "occupations", FILE_PATH)
+        db.commit()
 
         return {
             "status": "success",
-            "inserted_records": len(occupations),
+            "inserted_records": inserted,
             "file": FILE_PATH
         }
 
@@ -1,12 +1,9 @@
 import os
-import pandas as pd
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 
 from app.core.database import get_db
-from app.schemas.occupation_skill_relation import OccupationSkillRelationCreate
-from app.services.occupation_skill_relation_service import insert_occupation_skill_relations
-from app.utils.occupation_skill_relation_cleaner import clean_occupation_skill_relation_csv
+from app.services.occupation_skill_relation_service import import_occupation_skill_relations_csv
 
 router = APIRouter(prefix="/occupation-skill-relations", tags=["Occupation-Skill Relations"])
 
@@ -25,29 +22,15 @@ def load_occupation_skill_relations_from_file(db: Session = Depends(get_db)):
         )
 
     try:
-        # 1. Read CSV
-        df = pd.read_csv(FILE_PATH, dtype=str, keep_default_na=False)
-
-        # 2. Clean CSV
-        cleaned_df = clean_occupation_skill_relation_csv(df)
-
-        # 3. Convert to Pydantic schema objects
-        relations = [
-            OccupationSkillRelationCreate(
-                occupationUri=row["occupationUri"],
-                relationType=row.get("relationType"),
-                skillType=row.get("skillType"),
-                skillUri=row["skillUri"]
-            )
-            for row in cleaned_df.to_dict(orient="records")
-        ]
-
-        # 4. Insert into DB
-        inserted_count = insert_occupation_skill_relations(db, relations)
+        # COPY into a staging table, then resolve URIs to ids inside PostgreSQL
+        result = import_occupation_skill_relations_csv(db, FILE_PATH)
 
         return {
             "status": "success",
-            "inserted_records": inserted_count,
+            "inserted_records": result.inserted,
+            "already_present": result.existing,
+            "unresolved_occupation_uris": result.unresolved_occupations,
+            "unresolved_skill_uris": result.unresolved_skills,
             "file": FILE_PATH
         }
 
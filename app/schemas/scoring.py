@@ -0,0 +1,9 @@
+from typing import List, Literal
+from pydantic import BaseModel, Field
+
+# Fields per_skill entries can be sorted by; anything else is rejected with a 422
+SortField = Literal["raw_contrib", "normalized_contrib", "weight", "importance"]
+
+class BatchScoreRequest(BaseModel):
+    occupation_ids: List[int] = Field(min_length=1, max_length=1000)
+    sort_by: SortField = "normalized_contrib"
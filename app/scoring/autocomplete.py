@@ -0,0 +1,346 @@
+# app/scoring/autocomplete.py
+"""
+In-process autocomplete index over occupation labels.
+
+Every preferredLabel and every newline-separated altLabel is normalized (lower-cased,
+whitespace collapsed) and indexed once per word start, so "eng" finds "marine engineering
+technician". The keys live in one sorted list and a prefix query is a bisect range over it.
+Short prefixes (<= HOT_PREFIX_LENGTH chars), whose ranges are the largest, are answered from
+results precomputed at build time. Queries with several words fall back to intersecting the
+per-word prefix matches, and queries of INFIX_MIN_LENGTH+ chars to substring matching
+(candidates from a trigram posting index, verified with `in`).
+
+Ranking mirrors the SQL search: preferred-label prefix > preferred word prefix > alt-label
+prefix > alt word prefix > all-words match > substring, then shorter labels, then alphabetical.
+The index is immutable; AutocompleteService swaps in a freshly built one when the dataset
+version changes, so readers never see a half-built index. The service also owns the fuzzy
+name resolver (app/scoring/fuzzy.py), built from the same rows on the same schedule.
+"""
+import asyncio
+import os
+import sys
+import time
+from array import array
+from bisect import bisect_left
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+from fastapi.concurrency import run_in_threadpool
+from redis.exceptions import RedisError
+
+from app.core.database import SessionLocal
+from app.core.logger import get_logger
+from app.core.redis import sync_r
+from app.scoring import repository as repo
+from app.scoring.fuzzy import FuzzyOccupationIndex
+from app.services.cache_service import DATASET_VERSION_KEY, CacheService
+
+logger = get_logger(__name__)
+
+AUTOCOMPLETE_ENABLED = os.getenv("AUTOCOMPLETE_ENABLED", "true").lower() in ("1", "true", "yes")
+# How often a worker compares its index with the Redis dataset version
+AUTOCOMPLETE_VERSION_CHECK_SECONDS = float(os.getenv("AUTOCOMPLETE_VERSION_CHECK_SECONDS", "5"))
+HOT_PREFIX_LENGTH = 2
+INFIX_MIN_LENGTH = 3
+DEFAULT_LIMIT = 20
+
+# Match tiers (higher is better)
+TIER_PREFERRED_PREFIX = 7
+TIER_PREFERRED_WORD = 6
+TIER_ALL_WORDS_PREFERRED = 5
+TIER_ALT_PREFIX = 4
+TIER_ALT_WORD = 3
+TIER_ALL_WORDS = 2
+TIER_INFIX = 1
+
+# Upper bound of the key range for a prefix
+_RANGE_END = "\U0010ffff"
+
+
+def normalize(value: Optional[str]) -> str:
+    return " ".join((value or "").lower().split())
+
+
+def _has_word_prefix(label: str, word: str) -> bool:
+    """Whether a word of the (normalized) label starts with `word`."""
+    return label.startswith(word) or f" {word}" in label
+
+
+class AutocompleteIndex:
+    """Immutable sorted-array prefix index (see module docstring)."""
+
+    def __init__(self, rows: Iterable[Tuple[int, Optional[str], Optional[str]]]):
+        started = time.perf_counter()
+        self.ids = array("i")
+        self.labels: List[str] = []
+        entries: List[Tuple[str, int, int]] = []
+        infix_labels: List[str] = []
+        infix_owner = array("i")
+        label_start = array("i")
+        trigrams: Dict[str, List[int]] = {}
+
+        for occ_id, preferred, alt_labels in rows:
+            if not preferred:
+                continue
+            idx = len(self.ids)
+            self.ids.append(int(occ_id))
+            self.labels.append(preferred)
+            # This occupation's normalized labels are infix_labels[label_start[idx]:label_start[idx + 1]],
+            # preferred label first
+            label_start.append(len(infix_labels))
+
+            seen: Set[str] = set()
+            for is_preferred, label in [(True, preferred), *((False, alt) for alt in (alt_labels or "").split("\n"))]:
+                norm = normalize(label)
+                if not norm or norm in seen:
+                    continue
+                seen.add(norm)
+                word_start = 0
+                for word in norm.split(" "):
+                    if word_start == 0:
+                        tier = TIER_PREFERRED_PREFIX if is_preferred else TIER_ALT_PREFIX
+                    else:
+                        tier = TIER_PREFERRED_WORD if is_preferred else TIER_ALT_WORD
+                    entries.append((norm[word_start:], idx, tier))
+                    word_start += len(word) + 1
+                for gram in {norm[i:i + 3] for i in range(len(norm) - 2)}:
+                    trigrams.setdefault(gram, []).append(len(infix_labels))
+                infix_labels.append(norm)
+                infix_owner.append(idx)
+
+        entries.sort()
+        self.keys: List[str] = [e[0] for e in entries]
+        self.entry_owner = np.fromiter((e[1] for e in entries), dtype=np.int32, count=len(entries))
+        entry_tier = np.fromiter((e[2] for e in entries), dtype=np.int64, count=len(entries))
+        label_start.append(len(infix_labels))
+        self.infix_labels = infix_labels
+        self.infix_owner = infix_owner
+        self.label_start = label_start
+        # trigram -> ids of the labels containing it (ascending), for substring candidates
+        self.trigrams = {gram: np.array(ids, dtype=np.int32) for gram, ids in trigrams.items()}
+        # Within a tier: shorter labels first, then alphabetical
+        n = max(len(self.labels), 1)
+        order = sorted(range(len(self.labels)), key=lambda i: (len(self.labels[i]), self.labels[i].lower()))
+        self.label_rank = np.empty(len(order), dtype=np.int64)
+        self.label_rank[order] = np.arange(len(order))
+        # One sortable score per entry: tier first, label rank second (higher is better)
+        self._n = n
+        self.entry_score = entry_tier * n + (n - 1 - self.label_rank[self.entry_owner]) if len(entries) else entry_tier
+
+        self.hot: Dict[str, List[int]] = {}
+        for key in self.keys:
+            for length in range(1, min(HOT_PREFIX_LENGTH, len(key)) + 1):
+                self.hot.setdefault(key[:length], [])
+        for prefix in self.hot:
+            self.hot[prefix] = self._prefix_matches(prefix, DEFAULT_LIMIT)
+
+        self.build_ms = round((time.perf_counter() - started) * 1000, 1)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def _prefix_range(self, prefix: str) -> Tuple[int, int]:
+        lo = bisect_left(self.keys, prefix)
+        hi = bisect_left(self.keys, prefix + _RANGE_END, lo)
+        return lo, hi
+
+    def _prefix_count(self, prefix: str) -> int:
+        lo, hi = self._prefix_range(prefix)
+        return hi - lo
+
+    def _ranked_owners(self, prefix: str) -> Tuple[np.ndarray, np.ndarray]:
+        """Distinct occupations with a key starting with prefix, best first, and their best scores."""
+        lo, hi = self._prefix_range(prefix)
+        scores = self.entry_score[lo:hi]
+        order = np.argsort(-scores, kind="stable")
+        owners = self.entry_owner[lo:hi][order]
+        _, first = np.unique(owners, return_index=True)
+        first.sort()
+        return owners[first], scores[order][first]
+
+    def _best_tiers(self, prefix: str) -> Dict[int, int]:
+        """occupation index -> best tier among keys starting with prefix."""
+        owners, scores = self._ranked_owners(prefix)
+        return dict(zip(owners.tolist(), (scores // self._n).tolist()))
+
+    def _rank(self, best: Dict[int, int], limit: int) -> List[int]:
+        rank = self.label_rank
+        return sorted(best, key=lambda idx: (-best[idx], rank[idx]))[:limit]
+
+    def _prefix_matches(self, prefix: str, limit: int) -> List[int]:
+        return self._ranked_owners(prefix)[0][:limit].tolist()
+
+    def search(self, query: str, limit: int = DEFAULT_LIMIT) -> List[Dict[str, str]]:
+        """Ranked matches as [{"id", "label"}], same shape as service.search_occupations."""
+        q = normalize(query)
+        if not q:
+            return []
+        if limit <= DEFAULT_LIMIT and q in self.hot:
+            found = self.hot[q][:limit]
+        else:
+            found = self._prefix_matches(q, limit)
+            if len(found) < limit:
+                best = self._best_tiers(q)
+                words = q.split(" ")
+                if len(words) > 1:
+                    # Every word must start a word of the occupation's labels (like tsquery a:* & b:*):
+                    # candidates from the most selective word (smallest key range), the others verified per label
+                    words.sort(key=self._prefix_count)
+                    rest = words[1:]
+                    for idx, tier in self._best_tiers(words[0]).items():
+                        if idx in best:
+                            continue
+                        labels = self.infix_labels[self.label_start[idx]:self.label_start[idx + 1]]
+                        if tier >= TIER_PREFERRED_WORD and all(_has_word_prefix(labels[0], w) for w in rest):
+                            best[idx] = TIER_ALL_WORDS_PREFERRED
+                        elif all(any(_has_word_prefix(label, w) for label in labels) for w in rest):
+                            best[idx] = TIER_ALL_WORDS
+                if len(best) < limit and len(q) >= INFIX_MIN_LENGTH:
+                    for idx in self._infix(q, limit * 4):
+                        best.setdefault(idx, TIER_INFIX)
+                found = self._rank(best, limit)
+        return [{"id": str(self.ids[idx]), "label": self.labels[idx]} for idx in found]
+
+    def _infix(self, q: str, cap: int) -> List[int]:
+        """Occupations with q anywhere in a label: intersect trigram postings, then verify."""
+        postings = []
+        for gram in {q[i:i + 3] for i in range(len(q) - 2)}:
+            ids = self.trigrams.get(gram)
+            if ids is None:
+                return []
+            postings.append(ids)
+        postings.sort(key=len)
+        candidates = postings[0]
+        for ids in postings[1:]:
+            candidates = np.intersect1d(candidates, ids, assume_unique=True)
+            if not len(candidates):
+                return []
+
+        found: List[int] = []
+        seen: Set[int] = set()
+        for label_id in candidates.tolist():
+            if q in self.infix_labels[label_id]:
+                idx = self.infix_owner[label_id]
+                if idx not in seen:
+                    seen.add(idx)
+                    found.append(idx)
+                    if len(found) >= cap:
+                        break
+        return found
+
+    def memory_bytes(self) -> Dict[str, int]:
+        """Approximate footprint of the index structures."""
+        keys = sys.getsizeof(self.keys) + sum(sys.getsizeof(k) for k in self.keys)
+        labels = sys.getsizeof(self.labels) + sum(sys.getsizeof(s) for s in self.labels)
+        arrays = sum(sys.getsizeof(a) for a in (self.ids, self.infix_owner)) + sum(
+            a.nbytes for a in (self.entry_owner, self.entry_score, self.label_rank)
+        )
+        hot = sys.getsizeof(self.hot) + sum(sys.getsizeof(k) + sys.getsizeof(v) for k, v in self.hot.items())
+        infix = (
+            sys.getsizeof(self.infix_labels) + sum(sys.getsizeof(s) for s in self.infix_labels)
+            + sys.getsizeof(self.trigrams) + sum(sys.getsizeof(g) + a.nbytes for g, a in self.trigrams.items())
+        )
+        return {
+            "keys": keys,
+            "labels": labels,
+            "arrays": arrays,
+            "hot_prefixes": hot,
+            "infix": infix,
+            "total": keys + labels + arrays + hot + infix,
+        }
+
+
+class AutocompleteService:
+    """Holds the current index for this worker and rebuilds it when the dataset version moves."""
+
+    def __init__(self):
+        self._index: Optional[AutocompleteIndex] = None
+        # Built from the same rows and swapped together with the index
+        self._fuzzy: Optional[FuzzyOccupationIndex] = None
+        self._version: Optional[int] = None
+        self._built_at: Optional[float] = None
+        self._checked_at = 0.0
+        self._stale = False
+        self._rebuilding: Optional[asyncio.Task] = None
+
+    @property
+    def ready(self) -> bool:
+        return AUTOCOMPLETE_ENABLED and self._index is not None
+
+    def mark_stale(self, message: Optional[dict] = None) -> None:
+        """Pub/sub handler: the dataset changed elsewhere, rebuild on the next request."""
+        self._stale = True
+
+    def rebuild(self) -> Dict[str, Any]:
+        """Build a new index from the database and swap it in (blocking; run in a thread)."""
+        try:
+            version = int(sync_r.get(DATASET_VERSION_KEY) or 0)
+        except RedisError as e:
+            logger.warning("Could not read dataset version for autocomplete: %s", e)
+            version = None
+        with SessionLocal() as db:
+            rows = repo.get_occupation_labels_for_autocomplete(db)
+        index = AutocompleteIndex(rows)
+        fuzzy = FuzzyOccupationIndex(rows)
+        self._index, self._fuzzy, self._version, self._built_at = index, fuzzy, version, time.time()
+        self._stale = False
+        self._checked_at = time.monotonic()
+        logger.info(
+            "Autocomplete index built: %s occupations, %s keys, %s ms, fuzzy %s labels %s ms (dataset version %s)",
+            len(index), len(index.keys), index.build_ms, len(fuzzy.labels), fuzzy.build_ms, version,
+        )
+        return self.stats()
+
+    async def ensure_fresh(self) -> None:
+        """
+        Cheap staleness check (at most every AUTOCOMPLETE_VERSION_CHECK_SECONDS, or right after a
+        pub/sub notice); a rebuild runs in the background while the old index keeps serving.
+        """
+        now = time.monotonic()
+        if not self._stale and now - self._checked_at < AUTOCOMPLETE_VERSION_CHECK_SECONDS:
+            return
+        self._checked_at = now
+        try:
+            version = await CacheService.dataset_version()
+        except RedisError:
+            return
+        if (self._stale or version != self._version) and self._rebuilding is None:
+            logger.info("Autocomplete index is stale (version %s -> %s); rebuilding", self._version, version)
+            self._rebuilding = asyncio.get_running_loop().create_task(self._rebuild_in_background())
+
+    async def _rebuild_in_background(self) -> None:
+        try:
+            await run_in_threadpool(self.rebuild)
+        except Exception as e:
+            logger.error("Autocomplete rebuild failed: %s", e, exc_info=True)
+        finally:
+            self._rebuilding = None
+
+    def search(self, query: str, limit: int = DEFAULT_LIMIT) -> List[Dict[str, str]]:
+        return self._index.search(query, limit)
+
+    def resolve(self, name: str) -> Optional[Dict[str, Any]]:
+        """Typo-tolerant best match for an occupation name (see app/scoring/fuzzy.py)."""
+        return self._fuzzy.resolve(name)
+
+    def stats(self) -> Dict[str, Any]:
+        index = self._index
+        if index is None:
+            return {"enabled": AUTOCOMPLETE_ENABLED, "ready": False}
+        return {
+            "enabled": AUTOCOMPLETE_ENABLED,
+            "ready": True,
+            "dataset_version": self._version,
+            "built_at": self._built_at,
+            "build_ms": index.build_ms,
+            "occupations": len(index),
+            "keys": len(index.keys),
+            "hot_prefixes": len(index.hot),
+            "memory_bytes": index.memory_bytes(),
+            "fuzzy": {
+                "labels": len(self._fuzzy.labels),
+                "trigrams": len(self._fuzzy.postings),
+                "build_ms": self._fuzzy.build_ms,
+                "memory_bytes": self._fuzzy.memory_bytes(),
+            },
+        }
@@ -0,0 +1,160 @@
+# app/scoring/fuzzy.py
+"""
+Typo-tolerant occupation name resolution.
+
+Every preferredLabel and altLabel is folded (case-folded, accents stripped, punctuation turned
+into spaces, whitespace collapsed) and split into padded character trigrams. A query is blocked
+first: candidates are the labels sharing the most trigrams with it (at most SHORTLIST_SIZE,
+counted with numpy over the posting lists of the query's rarer trigrams), and only that
+shortlist is scored with rapidfuzz. The rapidfuzz work is therefore bounded by the shortlist
+size rather than by the number of labels, and the blocking cost by the posting lists of a
+handful of trigrams.
+
+Trigrams work the same for any script, so altLabels in other languages are matched too;
+folding lets "ingenieur" match "ingénieur".
+"""
+import os
+import sys
+import time
+import unicodedata
+from array import array
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from rapidfuzz import fuzz, process, utils
+
+# Minimum rapidfuzz score (0..100) for a match to be accepted
+FUZZY_SCORE_CUTOFF = float(os.getenv("FUZZY_SCORE_CUTOFF", "80"))
+SHORTLIST_SIZE = 200
+# Trigrams in more than this share of labels carry little signal; skip them while rarer ones exist
+COMMON_TRIGRAM_SHARE = 0.05
+MAX_QUERY_TRIGRAMS = 24
+# Matches on a subset of the label's words are capped below a whole-label match
+SUBSET_FACTOR = 0.9
+
+SOURCE_PREFERRED = "preferred"
+SOURCE_ALT = "alt"
+
+
+def fold(value: Optional[str]) -> str:
+    """Case-fold, strip accents and punctuation, collapse whitespace."""
+    decomposed = unicodedata.normalize("NFKD", value or "")
+    stripped = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return " ".join(utils.default_process(stripped.casefold()).split())
+
+
+def label_score(query: str, label: str, **kwargs) -> float:
+    """
+    Whole-label similarity, or word-set similarity scaled by SUBSET_FACTOR: "sofware developer"
+    scores 97 against "software developer", "nurse" 90 against "specialist nurse", and unrelated
+    labels that merely share a word stay low (unlike WRatio's partial alignment).
+    """
+    return max(fuzz.ratio(query, label), SUBSET_FACTOR * fuzz.token_set_ratio(query, label))
+
+
+def trigrams(folded: str) -> set:
+    padded = f"  {folded} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class FuzzyOccupationIndex:
+    """Immutable trigram blocking index plus rapidfuzz re-ranking (see module docstring)."""
+
+    def __init__(self, rows: Iterable[Tuple[int, Optional[str], Optional[str]]]):
+        started = time.perf_counter()
+        self.labels: List[str] = []        # folded, what rapidfuzz compares
+        self.display: List[str] = []       # original spelling
+        self.owner = array("i")
+        self.preferred_label: Dict[int, str] = {}
+        self.is_alt = array("b")
+        self.exact: Dict[str, int] = {}
+        postings: Dict[str, List[int]] = {}
+
+        for occ_id, preferred, alt_labels in rows:
+            if not preferred:
+                continue
+            self.preferred_label[occ_id] = preferred
+            candidates = [(preferred, False)] + [
+                (alt, True) for alt in (alt_labels or "").split("\n") if alt.strip()
+            ]
+            for label, alt in candidates:
+                folded = fold(label)
+                if not folded:
+                    continue
+                position = len(self.labels)
+                self.labels.append(folded)
+                self.display.append(label.strip())
+                self.owner.append(occ_id)
+                self.is_alt.append(alt)
+                # Preferred labels win exact-match ties: they come first per occupation and
+                # a later alt label of another occupation does not overwrite them
+                if folded not in self.exact or (not alt and self.is_alt[self.exact[folded]]):
+                    self.exact[folded] = position
+                for gram in trigrams(folded):
+                    postings.setdefault(gram, []).append(position)
+
+        self.postings = {gram: np.asarray(ids, dtype=np.int32) for gram, ids in postings.items()}
+        self.common_limit = max(SHORTLIST_SIZE, int(len(self.labels) * COMMON_TRIGRAM_SHARE))
+        self.build_ms = round((time.perf_counter() - started) * 1000, 1)
+
+    def __len__(self) -> int:
+        return len(self.preferred_label)
+
+    def _shortlist(self, folded: str) -> np.ndarray:
+        """Label positions sharing the most trigrams with the query (at most SHORTLIST_SIZE)."""
+        lists = [self.postings[g] for g in trigrams(folded) if g in self.postings]
+        if not lists:
+            return np.zeros(0, dtype=np.int32)
+        lists.sort(key=len)
+        rare = [p for p in lists if len(p) <= self.common_limit]
+        lists = (rare or lists)[:MAX_QUERY_TRIGRAMS]
+        hits = np.concatenate(lists)
+        counts = np.bincount(hits, minlength=len(self.labels))
+        candidates = np.flatnonzero(counts)
+        if len(candidates) > SHORTLIST_SIZE:
+            top = np.argpartition(counts[candidates], -SHORTLIST_SIZE)[-SHORTLIST_SIZE:]
+            candidates = candidates[top]
+        return candidates
+
+    def _match(self, query: str, position: int, score: float) -> Dict[str, Any]:
+        occ_id = self.owner[position]
+        return {
+            "occupation_id": occ_id,
+            "label": self.preferred_label[occ_id],
+            "matched_label": self.display[position],
+            "source": SOURCE_ALT if self.is_alt[position] else SOURCE_PREFERRED,
+            "confidence": round(score / 100.0, 3),
+            "query": query,
+        }
+
+    def resolve(self, query: str, score_cutoff: float = FUZZY_SCORE_CUTOFF) -> Optional[Dict[str, Any]]:
+        """Best matching occupation for a free-text name, or None when nothing scores >= score_cutoff."""
+        folded = fold(query)
+        if not folded:
+            return None
+        position = self.exact.get(folded)
+        if position is not None:
+            return self._match(query, position, 100.0)
+
+        shortlist = self._shortlist(folded)
+        if not len(shortlist):
+            return None
+        choices = {int(p): self.labels[p] for p in shortlist}
+        scored = process.extract(
+            folded, choices, scorer=label_score, processor=None,
+            score_cutoff=score_cutoff, limit=10,
+        )
+        if not scored:
+            return None
+        # Best score, then preferred over alt labels, then the closest label length
+        _, score, position = max(
+            scored,
+            key=lambda m: (m[1], not self.is_alt[m[2]], -abs(len(m[0]) - len(folded))),
+        )
+        return self._match(query, position, score)
+
+    def memory_bytes(self) -> int:
+        size = sum(sys.getsizeof(s) for s in self.labels) + sum(sys.getsizeof(s) for s in self.display)
+        size += sum(p.nbytes for p in self.postings.values()) + sys.getsizeof(self.postings)
+        size += self.owner.itemsize * len(self.owner) + len(self.is_alt) + sys.getsizeof(self.exact)
+        return size
@@ -0,0 +1,84 @@
+# app/scoring/kernel.py
+"""
+Vectorized scoring kernel.
+
+Takes columnar per-skill arrays (weights, importances) for one or many occupations,
+laid out back to back with a `lengths` array giving the number of skills of each
+occupation, and computes contributions, min/max normalization, vulnerability bins,
+safe factors and the overall risk score per occupation.
+
+Results are bit-identical to the scalar helpers in app/scoring/service.py
+(vulnerability_label_normalized, vuln_factor_from_label, compute_risk_from_contribs):
+every elementwise step uses the same float64 operations in the same order, and the
+per-occupation sums are sequential left-to-right (cumsum over a zero-padded matrix)
+rather than numpy's pairwise summation, to match Python's sum().
+"""
+from typing import NamedTuple, Sequence
+
+import numpy as np
+
+EPS = 1e-9
+
+# Bin index -> label / factor. np.digitize over VULNERABILITY_BINS gives 0..4;
+# NEUTRAL_BIN is only reachable for NaN, mirroring vulnerability_label_normalized.
+VULNERABILITY_LABELS = ("Safe", "Low", "Moderate", "High", "Very High", "Neutral")
+VULNERABILITY_FACTORS = np.array([0.0, 0.25, 0.5, 0.75, 1.0, 0.5])
+# "> 0" is ">= smallest positive float", the other thresholds are ">=".
+VULNERABILITY_BINS = np.array([np.nextafter(0.0, 1.0), 0.4, 0.7, 0.9])
+NEUTRAL_BIN = 5
+
+
+class KernelResult(NamedTuple):
+    raw_contrib: np.ndarray      # per skill
+    normalized: np.ndarray       # per skill
+    vulnerability: np.ndarray    # per skill, index into VULNERABILITY_LABELS
+    vuln_factor: np.ndarray      # per skill
+    risk_score: np.ndarray       # per occupation, unrounded 0..100
+
+
+def segment_sums(values: np.ndarray, lengths: np.ndarray) -> np.ndarray:
+    """Sequential (left-to-right) sum of each ragged segment."""
+    n = len(lengths)
+    if n == 0:
+        return np.zeros(0)
+    width = int(lengths.max())
+    padded = np.zeros((n, width + 1))
+    # Column 0 stays zero so empty segments sum to 0.0; Python's sum() also starts from 0
+    rows = np.repeat(np.arange(n), lengths)
+    cols = np.arange(len(values)) - np.repeat(np.cumsum(lengths) - lengths, lengths) + 1
+    padded[rows, cols] = values
+    return np.cumsum(padded, axis=1)[:, -1]
+
+
+def score_segments(weights: Sequence[float], importances: Sequence[float],
+                   lengths: Sequence[int], alpha: float, eps: float = EPS) -> KernelResult:
+    """
+    Score occupations given their skills' weights and importances.
+    Every segment must be non-empty (occupations without skills get the neutral result upstream).
+    """
+    weights = np.asarray(weights, dtype=np.float64)
+    importances = np.asarray(importances, dtype=np.float64)
+    lengths = np.asarray(lengths, dtype=np.int64)
+    if len(lengths) and lengths.min() < 1:
+        raise ValueError("score_segments requires at least one skill per occupation")
+
+    raw = weights * importances
+
+    starts = np.cumsum(lengths) - lengths
+    seg_min = np.minimum.reduceat(raw, starts) if len(raw) else np.zeros(0)
+    seg_max = np.maximum.reduceat(raw, starts) if len(raw) else np.zeros(0)
+    seg_range = seg_max - seg_min + eps
+    normalized = (raw - np.repeat(seg_min, lengths)) / np.repeat(seg_range, lengths)
+
+    vulnerability = np.digitize(normalized, VULNERABILITY_BINS)
+    vulnerability[np.isnan(normalized)] = NEUTRAL_BIN
+    vuln_factor = VULNERABILITY_FACTORS[vulnerability]
+    safe = (1.0 - vuln_factor) * raw
+
+    total_positive = segment_sums(raw, lengths)
+    total_safe = segment_sums(safe, lengths)
+    adjusted = total_positive - alpha * total_safe
+    max_possible = np.where(total_positive > 0, total_positive, 1.0)
+    risk = np.minimum(np.maximum(100.0 * adjusted / max_possible, 0.0), 100.0)
+
+    return KernelResult(raw, normalized, vulnerability, vuln_factor, risk)
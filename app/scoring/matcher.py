@@ -0,0 +1,81 @@
+# app/scoring/matcher.py
+import re
+from typing import Any, Dict, Iterator, List, NamedTuple, Tuple
+
+# Word tokens; punctuation and hyphens split tokens ("data," -> "data", "e-mail" -> "e", "mail")
+TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def tokenize(value: str) -> List[Tuple[str, int]]:
+    """Lower-cased word tokens of a string with their character offsets."""
+    return [(m.group(), m.start()) for m in TOKEN_RE.finditer(value.lower())]
+
+
+class BucketMatch(NamedTuple):
+    bucket_id: int
+    keyword: str
+    position: int  # character offset of the first keyword token in the (lower-cased) text
+
+
+class BucketKeywordMatcher:
+    """
+    Token-hash automaton over bucket keywords.
+
+    Keywords are tokenized once and indexed by their first token, so matching a text is a
+    single pass over its tokens with one dict lookup each; multi-word keywords are confirmed
+    by comparing the tokens that follow. Build one instance per bucket-cache version and reuse
+    it for request-time scoring and batch precomputation alike.
+    """
+
+    def __init__(self, buckets: Dict[int, Dict[str, Any]]):
+        # word -> [(bucket_id, keyword)] for single-token keywords
+        self._single: Dict[str, List[Tuple[int, str]]] = {}
+        # first word -> [(tokens, bucket_id, keyword)] for multi-word keywords
+        self._multi: Dict[str, List[Tuple[Tuple[str, ...], int, str]]] = {}
+        self.keyword_count = 0
+        for bucket_id in sorted(buckets):
+            for keyword in sorted(buckets[bucket_id]["keywords"]):
+                tokens = tuple(t for t, _ in tokenize(keyword))
+                if not tokens:
+                    continue
+                if len(tokens) == 1:
+                    self._single.setdefault(tokens[0], []).append((bucket_id, keyword))
+                else:
+                    self._multi.setdefault(tokens[0], []).append((tokens, bucket_id, keyword))
+                self.keyword_count += 1
+        self._single_ids = {w: frozenset(b for b, _ in entries) for w, entries in self._single.items()}
+
+    def finditer(self, value: str) -> Iterator[BucketMatch]:
+        """Yield every keyword occurrence in the text, in text order."""
+        if not value:
+            return
+        tokens = tokenize(value)
+        words = [t for t, _ in tokens]
+        for i, word in enumerate(words):
+            for bucket_id, keyword in self._single.get(word, ()):
+                yield BucketMatch(bucket_id, keyword, tokens[i][1])
+            for kw_tokens, bucket_id, keyword in self._multi.get(word, ()):
+                if tuple(words[i:i + len(kw_tokens)]) == kw_tokens:
+                    yield BucketMatch(bucket_id, keyword, tokens[i][1])
+
+    def match(self, value: str) -> List[int]:
+        """Distinct bucket ids matched by the text, ordered by bucket id."""
+        if not value:
+            return []
+        words = TOKEN_RE.findall(value.lower())
+        found = set()
+        single_ids = self._single_ids
+        for word in set(words):
+            ids = single_ids.get(word)
+            if ids:
+                found.update(ids)
+        if self._multi:
+            for i, word in enumerate(words):
+                for kw_tokens, bucket_id, _ in self._multi.get(word, ()):
+                    if bucket_id not in found and tuple(words[i:i + len(kw_tokens)]) == kw_tokens:
+                        found.add(bucket_id)
+        return sorted(found)
+
+    def match_skill(self, label: str, definition: str) -> List[int]:
+        """Bucket ids matched by a skill's preferred label or definition (each field on its own)."""
+        return sorted(set(self.match(label)) | set(self.match(definition)))
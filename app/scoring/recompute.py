@@ -0,0 +1,270 @@
+# app/scoring/recompute.py
+"""
+Full-catalogue risk recompute.
+
+Loads the scoring inputs for every occupation once into compact arrays (segment lengths,
+importances, precomputed automation weights, chosen keyword bucket per skill), then shards
+occupations across a ProcessPoolExecutor that runs the vectorized kernel for each requested
+ALPHA. Bucket default_weight overrides are applied on the arrays, so weight experiments do not
+need a database change. Results go to a Parquet/CSV file and/or the occupation_risk_recomputes
+table, and a per-run distribution summary is printed.
+
+Usage:
+    python -m app.scoring.recompute --alpha 0.7 --output risk.parquet
+    python -m app.scoring.recompute --alpha 0.5 --alpha 0.7 --bucket-weight 3=40 --table sweep-1
+    python -m app.scoring.recompute --rematch   # re-match keywords in-process (after keyword edits)
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List, NamedTuple, Optional
+
+import numpy as np
+from sqlalchemy import insert, text
+from sqlalchemy.orm import Session
+
+from app.core.database import SessionLocal, engine
+from app.core.logger import logger
+from app.models.occupation import Occupation  # noqa: F401  (FK target, needed for table creation)
+from app.models.occupation_risk_recompute import OccupationRiskRecompute
+from app.scoring import repository as repo
+from app.scoring.kernel import score_segments
+from app.scoring.matcher import BucketKeywordMatcher
+from app.scoring.service import ALPHA, DEFAULT_FALLBACK_WEIGHT, EPS, group_bucket_keywords
+
+LOAD_BATCH_SIZE = 1000
+NO_BUCKET = -1
+
+
+class ScoringInputs(NamedTuple):
+    occupation_ids: np.ndarray   # per occupation
+    lengths: np.ndarray          # per occupation: number of skill relations
+    importances: np.ndarray      # per skill relation
+    automation: np.ndarray       # per skill relation: automation weight, NaN when missing
+    bucket_ids: np.ndarray       # per skill relation: chosen bucket id, NO_BUCKET when none
+    bucket_weights: Dict[int, float]
+
+
+def load_inputs(db: Session, rematch: bool = False,
+                batch_size: int = LOAD_BATCH_SIZE) -> ScoringInputs:
+    """
+    Fetch everything the kernel needs for all occupations with set-based queries.
+    With rematch=True keyword buckets are matched in-process from the current keywords
+    instead of read from skill_bucket_matches.
+    """
+    buckets = group_bucket_keywords(repo.get_bucket_keywords(db))
+    matcher = BucketKeywordMatcher(buckets)
+    all_ids = repo.get_all_occupation_ids(db)
+
+    lengths: List[int] = []
+    importances: List[float] = []
+    automation: List[float] = []
+    bucket_ids: List[int] = []
+    for start in range(0, len(all_ids), batch_size):
+        batch_ids = all_ids[start:start + batch_size]
+        skills_by_occ = repo.get_skills_for_occupations(db, batch_ids)
+        automation_by_occ = repo.get_skill_automation_scores_for_occupations(db, batch_ids)
+        unscored = sorted({
+            s["skill_id"] for occ_id, skills in skills_by_occ.items() for s in skills
+            if s["skill_id"] not in automation_by_occ.get(occ_id, {})
+        })
+        skill_bucket_map = {} if rematch else repo.get_skill_bucket_matches(db, unscored)
+
+        for occ_id in batch_ids:
+            skills = skills_by_occ.get(occ_id, [])
+            automation_map = automation_by_occ.get(occ_id, {})
+            lengths.append(len(skills))
+            for s in skills:
+                sid = int(s["skill_id"])
+                importances.append(float(s.get("importance") or 1.0))
+                if sid in automation_map:
+                    automation.append(float(automation_map[sid]))
+                    bucket_ids.append(NO_BUCKET)
+                    continue
+                automation.append(np.nan)
+                matched = skill_bucket_map.get(sid)
+                if matched is None:
+                    matched = matcher.match_skill(s.get("skill_label"), s.get("definition") or "")
+                matched = [bid for bid in matched if bid in buckets]
+                bucket_ids.append(matched[0] if matched else NO_BUCKET)
+        logger.info(f"Loaded scoring inputs for {min(start + batch_size, len(all_ids))}/{len(all_ids)} occupations")
+
+    return ScoringInputs(
+        occupation_ids=np.asarray(all_ids, dtype=np.int64),
+        lengths=np.asarray(lengths, dtype=np.int64),
+        importances=np.asarray(importances, dtype=np.float64),
+        automation=np.asarray(automation, dtype=np.float64),
+        bucket_ids=np.asarray(bucket_ids, dtype=np.int64),
+        bucket_weights={bid: float(meta["default_weight"]) for bid, meta in buckets.items()},
+    )
+
+
+def resolve_weights(inputs: ScoringInputs, bucket_weight_overrides: Optional[Dict[int, float]] = None) -> np.ndarray:
+    """Per-relation weight: automation score, else chosen bucket's default_weight, else the fallback."""
+    bucket_weights = dict(inputs.bucket_weights)
+    bucket_weights.update(bucket_weight_overrides or {})
+    weights = np.full(len(inputs.importances), DEFAULT_FALLBACK_WEIGHT)
+    has_automation = ~np.isnan(inputs.automation)
+    weights[has_automation] = inputs.automation[has_automation]
+    for bid, weight in bucket_weights.items():
+        weights[(inputs.bucket_ids == bid) & ~has_automation] = weight
+    return weights
+
+
+def _score_shard(weights: np.ndarray, importances: np.ndarray, lengths: np.ndarray, alpha: float) -> np.ndarray:
+    """Worker entry point: risk scores for one contiguous shard of non-empty occupations."""
+    return score_segments(weights, importances, lengths, alpha, EPS).risk_score
+
+
+def _shards(lengths: np.ndarray, shard_count: int) -> List[slice]:
+    """Split occupations into contiguous shards of roughly equal skill-relation counts."""
+    offsets = np.concatenate(([0], np.cumsum(lengths)))
+    targets = np.linspace(0, offsets[-1], shard_count + 1)[1:-1]
+    cuts = [0, *np.searchsorted(offsets, targets, side="left").tolist(), len(lengths)]
+    cuts = sorted(set(cuts))
+    return [slice(a, b) for a, b in zip(cuts, cuts[1:])]
+
+
+def recompute(inputs: ScoringInputs, alphas: List[float], workers: int,
+              bucket_weight_overrides: Optional[Dict[int, float]] = None) -> Dict[float, np.ndarray]:
+    """Risk score (unrounded) per occupation for each alpha; occupations without skills score 50."""
+    weights = resolve_weights(inputs, bucket_weight_overrides)
+    scored = inputs.lengths > 0
+    lengths = inputs.lengths[scored]
+    # Relations of skill-less occupations do not exist, so the flat arrays line up with `lengths`
+    offsets = np.concatenate(([0], np.cumsum(lengths)))
+    shards = _shards(lengths, max(1, workers) * 4)
+
+    results = {alpha: np.full(len(inputs.lengths), 50.0) for alpha in alphas}
+    partial = {alpha: np.zeros(len(lengths)) for alpha in alphas}
+    total = len(alphas) * len(lengths)
+    done = 0
+
+    def tasks():
+        for alpha in alphas:
+            for shard in shards:
+                lo, hi = offsets[shard.start], offsets[shard.stop]
+                yield alpha, shard, (weights[lo:hi], inputs.importances[lo:hi], lengths[shard], alpha)
+
+    if workers <= 1:
+        for alpha, shard, args in tasks():
+            partial[alpha][shard] = _score_shard(*args)
+            done += shard.stop - shard.start
+        logger.info(f"Recomputed {done}/{total} occupation scores")
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(_score_shard, *args): (alpha, shard) for alpha, shard, args in tasks()}
+            for future in as_completed(futures):
+                alpha, shard = futures[future]
+                partial[alpha][shard] = future.result()
+                done += shard.stop - shard.start
+                logger.info(f"Recomputed {done}/{total} occupation scores")
+
+    for alpha in alphas:
+        results[alpha][scored] = partial[alpha]
+    return results
+
+
+def risk_levels(risk: np.ndarray) -> np.ndarray:
+    """Green / Yellow / Red with the same thresholds as build_result."""
+    return np.where(risk < 30, "Green", np.where(risk <= 70, "Yellow", "Red"))
+
+
+def to_rows(inputs: ScoringInputs, results: Dict[float, np.ndarray], run_id: str) -> List[dict]:
+    rows = []
+    for alpha, risk in results.items():
+        levels = risk_levels(risk)
+        for occ_id, score, level, n in zip(inputs.occupation_ids.tolist(), risk.tolist(),
+                                           levels.tolist(), inputs.lengths.tolist()):
+            rows.append({
+                "run_id": run_id if len(results) == 1 else f"{run_id}:alpha={alpha}",
+                "occupation_id": occ_id,
+                "alpha": alpha,
+                "risk_score": round(score, 2),
+                "level": level,
+                "skills_analyzed": n,
+            })
+    return rows
+
+
+def write_file(rows: List[dict], path: str) -> None:
+    """Parquet (needs pyarrow or fastparquet) or CSV, by file extension."""
+    import pandas as pd
+
+    df = pd.DataFrame(rows)
+    if path.endswith(".parquet"):
+        try:
+            df.to_parquet(path, index=False)
+        except ImportError as e:
+            raise SystemExit(f"Parquet output needs pyarrow or fastparquet installed ({e}); use a .csv path instead")
+    else:
+        df.to_csv(path, index=False)
+    logger.info(f"Wrote {len(rows)} rows to {path}")
+
+
+def write_table(db: Session, rows: List[dict]) -> None:
+    """Replace the rows of the given run(s) in occupation_risk_recomputes."""
+    OccupationRiskRecompute.__table__.create(bind=engine, checkfirst=True)
+    run_ids = sorted({r["run_id"] for r in rows})
+    db.execute(text("DELETE FROM occupation_risk_recomputes WHERE run_id = ANY(:run_ids)"), {"run_ids": run_ids})
+    for start in range(0, len(rows), 5000):
+        db.execute(insert(OccupationRiskRecompute.__table__), rows[start:start + 5000])
+    db.commit()
+    logger.info(f"Wrote {len(rows)} rows to occupation_risk_recomputes (runs: {', '.join(run_ids)})")
+
+
+def summarize(results: Dict[float, np.ndarray]) -> None:
+    for alpha, risk in results.items():
+        levels = risk_levels(risk)
+        counts = {level: int((levels == level).sum()) for level in ("Green", "Yellow", "Red")}
+        p10, p50, p90 = np.percentile(risk, [10, 50, 90]) if len(risk) else (0.0, 0.0, 0.0)
+        print(
+            f"alpha={alpha}: n={len(risk)} mean={risk.mean() if len(risk) else 0:.2f} "
+            f"p10={p10:.2f} p50={p50:.2f} p90={p90:.2f} levels={counts}"
+        )
+
+
+def _parse_bucket_weight(value: str) -> tuple:
+    bucket_id, _, weight = value.partition("=")
+    try:
+        return int(bucket_id), float(weight)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected BUCKET_ID=WEIGHT, got {value!r}")
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--alpha", type=float, action="append", help=f"repeatable; default {ALPHA}")
+    parser.add_argument("--bucket-weight", type=_parse_bucket_weight, action="append", default=[],
+                        metavar="ID=WEIGHT", help="override a bucket's default_weight (repeatable)")
+    parser.add_argument("--rematch", action="store_true", help="match keywords in-process instead of skill_bucket_matches")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--output", help="write results to a .parquet or .csv file")
+    parser.add_argument("--table", metavar="RUN_ID", help="write results to occupation_risk_recomputes under this run id")
+    args = parser.parse_args(argv)
+
+    alphas = args.alpha or [ALPHA]
+    started = time.perf_counter()
+    with SessionLocal() as db:
+        inputs = load_inputs(db, rematch=args.rematch)
+        loaded = time.perf_counter()
+        results = recompute(inputs, alphas, args.workers, dict(args.bucket_weight))
+        computed = time.perf_counter()
+
+        if args.output or args.table:
+            rows = to_rows(inputs, results, args.table or "adhoc")
+            if args.output:
+                write_file(rows, args.output)
+            if args.table:
+                write_table(db, rows)
+
+    summarize(results)
+    print(
+        f"{len(inputs.occupation_ids)} occupations x {len(alphas)} alpha(s): "
+        f"load {loaded - started:.2f}s, score {computed - loaded:.2f}s, total {time.perf_counter() - started:.2f}s"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,23 @@
 # app/scoring/repository.py
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
 from sqlalchemy.orm import Session
 from sqlalchemy import text
-from app.core.logger import logger
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from app.core.logger import get_logger
+from app.core.metrics import timed_query
+from app.models.occupation_risk_score import OccupationRiskScore
+from app.models.scoring_data_version import ScoringDataVersion  # noqa: F401  (table used below)
+
+logger = get_logger(__name__)
 
 # -------------------------------
 # Occupation Queries
 # -------------------------------
 
+@timed_query
 def get_occupation_by_name(db: Session, name: str) -> Optional[Dict[str, Any]]:
     """Fetch an occupation by its preferred label (case-insensitive)."""
-    logger.info(f"Fetching occupation by name: {name}")
+    logger.info("Fetching occupation by name: %s", name)
     query = text("""
         SELECT id, "preferredLabel" AS label, "conceptUri" AS uri, definition, description
         FROM occupations
@@ -19,15 +26,16 @@ def get_occupation_by_name(db: Session, name: str) -> Optional[Dict[str, Any]]:
     """)
     row = db.execute(query, {"name": f"%{name}%"}).mappings().first()
     if not row:
-        logger.warning(f"No occupation found for name: {name}")
+        logger.warning("No occupation found for name: %s", name)
         return None
-    logger.debug(f"Occupation found: {dict(row)}")
+    logger.debug("Occupation found: %s", row)
     return dict(row)
 
 
+@timed_query
 def list_occupations_like(db: Session, query_str: str, limit: int = 10) -> List[Dict[str, Any]]:
     """Suggest occupations based on partial search query."""
-    logger.info(f"Listing occupations like: {query_str}")
+    logger.info("Listing occupations like: %s", query_str)
     rows = db.execute(
         text("""
             SELECT id, "preferredLabel" AS label, "conceptUri" AS uri
@@ -38,7 +46,7 @@ def list_occupations_like(db: Session, query_str: str, limit: int = 10) -> List[
         """),
         {"query": f"%{query_str}%", "limit": limit}
     ).mappings().all()
-    logger.debug(f"Found {len(rows)} occupations matching query '{query_str}'")
+    logger.debug("Found %s occupations matching query '%s'", len(rows), query_str)
     return [dict(r) for r in rows]
 
 
@@ -46,13 +54,14 @@ def list_occupations_like(db: Session, query_str: str, limit: int = 10) -> List[
 # Skill Queries
 # -------------------------------
 
+@timed_query
 def get_skills_for_occupation(db: Session, occupation_id: int) -> List[Dict[str, Any]]:
     """
     Fetch all skills linked to a given occupation, including their importance
     directly from occupation_skill_relations. Automatically normalizes importance
     if missing or invalid.
     """
-    logger.info(f"Fetching skills for occupation_id={occupation_id}")
+    logger.info("Fetching skills for occupation_id=%s", occupation_id)
 
     query = text("""
         SELECT 
@@ -67,11 +76,12 @@ def get_skills_for_occupation(db: Session, occupation_id: int) -> List[Dict[str,
         FROM occupation_skill_relations osr
         JOIN skills s ON s.id = osr.skill_id
         WHERE osr.occupation_id = :occupation_id
+        ORDER BY osr.id
     """)
 
     rows = db.execute(query, {"occupation_id": occupation_id}).mappings().all()
 
-    logger.debug(f"Found {len(rows)} skills for occupation_id={occupation_id}")
+    logger.debug("Found %s skills for occupation_id=%s", len(rows), occupation_id)
 
     # Extra safety: normalize and clean data
     cleaned_rows = []
@@ -83,9 +93,51 @@ def get_skills_for_occupation(db: Session, occupation_id: int) -> List[Dict[str,
 
     return cleaned_rows
 
+@timed_query
+def get_skills_for_occupations(db: Session, occupation_ids: List[int]) -> Dict[int, List[Dict[str, Any]]]:
+    """
+    Set-based variant of get_skills_for_occupation: one query for many occupations,
+    returned as occupation_id -> skills (same row shape and cleaning).
+    """
+    if not occupation_ids:
+        return {}
+    logger.info("Fetching skills for %s occupations", len(occupation_ids))
+
+    query = text("""
+        SELECT
+            osr.occupation_id,
+            s.id AS skill_id,
+            s."preferredLabel" AS skill_label,
+            s.definition,
+            s."skillType",
+            s."reuseLevel",
+            COALESCE(NULLIF(osr.importance, 0), 1.0) AS importance,
+            osr."relationType",
+            osr."skillType" AS relation_skill_type
+        FROM occupation_skill_relations osr
+        JOIN skills s ON s.id = osr.skill_id
+        WHERE osr.occupation_id = ANY(:occupation_ids)
+        ORDER BY osr.occupation_id, osr.id
+    """)
+
+    rows = db.execute(query, {"occupation_ids": list(occupation_ids)}).mappings().all()
+
+    skills_by_occupation: Dict[int, List[Dict[str, Any]]] = {}
+    for r in rows:
+        skill = dict(r)
+        occupation_id = skill.pop("occupation_id")
+        skill["importance"] = float(skill.get("importance") or 1.0)
+        skill["skill_label"] = (skill.get("skill_label") or "").strip()
+        skills_by_occupation.setdefault(occupation_id, []).append(skill)
+
+    logger.debug("Found %s skill relations for %s occupations", len(rows), len(skills_by_occupation))
+    return skills_by_occupation
+
+
+@timed_query
 def get_skill_by_name(db: Session, skill_name: str) -> Optional[Dict[str, Any]]:
     """Fetch skill by name (preferred or alt labels)."""
-    logger.info(f"Fetching skill by name: {skill_name}")
+    logger.info("Fetching skill by name: %s", skill_name)
     row = db.execute(
         text("""
             SELECT id, "preferredLabel" AS skill_label, "conceptUri", definition
@@ -97,9 +149,9 @@ def get_skill_by_name(db: Session, skill_name: str) -> Optional[Dict[str, Any]]:
         {"skill_name": f"%{skill_name}%"}
     ).mappings().first()
     if row:
-        logger.debug(f"Skill found: {dict(row)}")
+        logger.debug("Skill found: %s", row)
         return dict(row)
-    logger.warning(f"No skill found for name: {skill_name}")
+    logger.warning("No skill found for name: %s", skill_name)
     return None
 
 
@@ -107,6 +159,7 @@ def get_skill_by_name(db: Session, skill_name: str) -> Optional[Dict[str, Any]]:
 # Keyword Buckets
 # -------------------------------
 
+@timed_query
 def get_bucket_keywords(db: Session) -> List[Dict[str, Any]]:
     """Retrieve all keyword → bucket mappings."""
     logger.info("Fetching bucket keywords from DB")
@@ -123,10 +176,11 @@ def get_bucket_keywords(db: Session) -> List[Dict[str, Any]]:
             ORDER BY sb.id, bk.id
         """)
     ).mappings().all()
-    logger.debug(f"Fetched {len(rows)} bucket keywords")
+    logger.debug("Fetched %s bucket keywords", len(rows))
     return [dict(r) for r in rows]
 
 
+@timed_query
 def get_buckets_summary(db: Session) -> List[Dict[str, Any]]:
     """Get list of all scoring buckets with weights and short description."""
     logger.info("Fetching buckets summary")
@@ -137,7 +191,7 @@ def get_buckets_summary(db: Session) -> List[Dict[str, Any]]:
             ORDER BY id
         """)
     ).mappings().all()
-    logger.debug(f"Found {len(rows)} buckets")
+    logger.debug("Found %s buckets", len(rows))
     return [dict(r) for r in rows]
 
 
@@ -145,22 +199,31 @@ def get_buckets_summary(db: Session) -> List[Dict[str, Any]]:
 # Automation & Importance
 # -------------------------------
 
-def get_skill_automation_scores(db: Session, skill_ids: List[int]) -> Dict[int, float]:
+@timed_query
+def get_skill_automation_scores(db: Session, skill_ids: List[int], occupation_id: int) -> Dict[int, float]:
     """
     Dynamically compute automation risk per skill using hybrid model:
     - Uses actual table data if present
     - Falls back to bucket or metadata logic
+
+    The skill-id filter is pushed into every branch so only the requested skills are
+    aggregated, and metadata_based is scoped to the occupation being scored (one row per skill).
     """
+    if not skill_ids:
+        return {}
+
     query = text("""
         WITH bucket_based AS (
             SELECT sbm.skill_id,
                    AVG(COALESCE(sbm.weight_override, sb.default_weight)) AS bucket_weight
             FROM skill_bucket_map sbm
             JOIN scoring_buckets sb ON sb.id = sbm.bucket_id
+            WHERE sbm.skill_id = ANY(:skill_ids)
             GROUP BY sbm.skill_id
         ),
         metadata_based AS (
-            SELECT s.id AS skill_id,
+            SELECT DISTINCT ON (osr.skill_id)
+                   osr.skill_id,
                    (
                        CASE
                            WHEN s."skillType" ILIKE '%competence%' THEN 10
@@ -185,31 +248,95 @@ def get_skill_automation_scores(db: Session, skill_ids: List[int]) -> Dict[int,
                    AS metadata_weight
             FROM occupation_skill_relations osr
             JOIN skills s ON s.id = osr.skill_id
-        ),
-        combined AS (
-            SELECT s.id AS skill_id,
-                   COALESCE(sas.automation_score,
-                            bucket_based.bucket_weight,
-                            metadata_based.metadata_weight,
-                            0) AS final_score
-            FROM skills s
-            LEFT JOIN skill_automation_scores sas ON sas.skill_id = s.id
-            LEFT JOIN bucket_based ON bucket_based.skill_id = s.id
-            LEFT JOIN metadata_based ON metadata_based.skill_id = s.id
+            WHERE osr.occupation_id = :occupation_id
+              AND osr.skill_id = ANY(:skill_ids)
+            ORDER BY osr.skill_id, osr.id
         )
-        SELECT skill_id,
-               ROUND(50 + (final_score * 100), 2) AS normalized_score
-        FROM combined
-        WHERE skill_id = ANY(:skill_ids)
+        SELECT s.id AS skill_id,
+               ROUND(50 + (COALESCE(sas.automation_score,
+                                    bucket_based.bucket_weight,
+                                    metadata_based.metadata_weight,
+                                    0) * 100), 2) AS normalized_score
+        FROM skills s
+        LEFT JOIN skill_automation_scores sas ON sas.skill_id = s.id
+        LEFT JOIN bucket_based ON bucket_based.skill_id = s.id
+        LEFT JOIN metadata_based ON metadata_based.skill_id = s.id
+        WHERE s.id = ANY(:skill_ids)
     """)
 
-    rows = db.execute(query, {"skill_ids": skill_ids}).mappings().all()
+    rows = db.execute(query, {"skill_ids": list(skill_ids), "occupation_id": occupation_id}).mappings().all()
     return {r["skill_id"]: float(r["normalized_score"]) for r in rows}
 
 
+@timed_query
+def get_skill_automation_scores_for_occupations(db: Session,
+                                                occupation_ids: List[int]) -> Dict[int, Dict[int, float]]:
+    """
+    Set-based variant of get_skill_automation_scores over every skill of the given
+    occupations: returns occupation_id -> {skill_id: normalized_score}. metadata_based is
+    keyed by (occupation_id, skill_id) so each occupation sees its own relation metadata.
+    """
+    if not occupation_ids:
+        return {}
 
+    query = text("""
+        WITH rel AS (
+            SELECT DISTINCT ON (osr.occupation_id, osr.skill_id)
+                   osr.occupation_id, osr.skill_id, osr."relationType", osr.importance
+            FROM occupation_skill_relations osr
+            WHERE osr.occupation_id = ANY(:occupation_ids)
+            ORDER BY osr.occupation_id, osr.skill_id, osr.id
+        ),
+        bucket_based AS (
+            SELECT sbm.skill_id,
+                   AVG(COALESCE(sbm.weight_override, sb.default_weight)) AS bucket_weight
+            FROM skill_bucket_map sbm
+            JOIN scoring_buckets sb ON sb.id = sbm.bucket_id
+            WHERE sbm.skill_id IN (SELECT skill_id FROM rel)
+            GROUP BY sbm.skill_id
+        )
+        SELECT rel.occupation_id,
+               rel.skill_id,
+               ROUND(50 + (COALESCE(sas.automation_score,
+                                    bucket_based.bucket_weight,
+                                    (
+                                        CASE
+                                            WHEN s."skillType" ILIKE '%competence%' THEN 10
+                                            WHEN s."skillType" ILIKE '%knowledge%' THEN -10
+                                            ELSE 0
+                                        END
+                                        +
+                                        CASE
+                                            WHEN s."reuseLevel" ILIKE '%cross%' THEN -5
+                                            ELSE 0
+                                        END
+                                    )
+                                    *
+                                    (
+                                        CASE
+                                            WHEN rel."relationType" = 'essential' THEN 1.2
+                                            WHEN rel."relationType" = 'optional' THEN 0.8
+                                            ELSE 1
+                                        END
+                                    )
+                                    * COALESCE(rel.importance, 1.0),
+                                    0) * 100), 2) AS normalized_score
+        FROM rel
+        JOIN skills s ON s.id = rel.skill_id
+        LEFT JOIN skill_automation_scores sas ON sas.skill_id = rel.skill_id
+        LEFT JOIN bucket_based ON bucket_based.skill_id = rel.skill_id
+    """)
+
+    rows = db.execute(query, {"occupation_ids": list(occupation_ids)}).mappings().all()
+    scores: Dict[int, Dict[int, float]] = {}
+    for r in rows:
+        scores.setdefault(r["occupation_id"], {})[r["skill_id"]] = float(r["normalized_score"])
+    return scores
+
+
+@timed_query
 def get_occupation_skill_importance(db: Session, occupation_id: int) -> Dict[int, float]:
-    logger.info(f"Fetching skill importance for occupation_id={occupation_id}")
+    logger.info("Fetching skill importance for occupation_id=%s", occupation_id)
     rows = db.execute(
         text("""
             SELECT skill_id, importance
@@ -218,36 +345,557 @@ def get_occupation_skill_importance(db: Session, occupation_id: int) -> Dict[int
         """),
         {"occupation_id": occupation_id}
     ).mappings().all()
-    logger.debug(f"Found importance for {len(rows)} skills")
+    logger.debug("Found importance for %s skills", len(rows))
     return {r["skill_id"]: float(r["importance"]) for r in rows}
 
 
 # -------------------------------
-# Optional: precompute matched_buckets per skill for faster scoring
+# Precomputed skill -> bucket matches (built by skill_bucket_match_service)
 # -------------------------------
 
-def get_skill_bucket_matches(db: Session, occupation_id: int) -> Dict[int, List[int]]:
+@timed_query
+def get_skill_bucket_matches(db: Session, skill_ids: List[int]) -> Dict[int, List[int]]:
     """
-    Returns a mapping: skill_id -> list of bucket_ids it matches.
-    Useful for fast computation of matched_buckets in service.py.
+    Returns a mapping: skill_id -> sorted distinct bucket_ids it matches, read from
+    skill_bucket_matches. Skills that were indexed without any match map to [];
+    skills that have not been indexed yet are absent from the mapping.
     """
-    logger.info(f"Precomputing skill bucket matches for occupation_id={occupation_id}")
+    if not skill_ids:
+        return {}
     rows = db.execute(
         text("""
-            SELECT osr.skill_id, sb.id AS bucket_id
-            FROM occupation_skill_relations osr
-            JOIN skills s ON s.id = osr.skill_id
-            JOIN bucket_keywords bk ON LOWER(bk.keyword) = ANY (string_to_array(LOWER(s."preferredLabel") || ' ' || COALESCE(s.definition, ''), ' '))
-            JOIN scoring_buckets sb ON sb.id = bk.bucket_id
-            WHERE osr.occupation_id = :occupation_id
+            SELECT src.skill_id, m.bucket_id
+            FROM skill_match_sources src
+            LEFT JOIN skill_bucket_matches m ON m.skill_id = src.skill_id
+            WHERE src.skill_id = ANY(:skill_ids)
+            GROUP BY src.skill_id, m.bucket_id
+            ORDER BY src.skill_id, m.bucket_id
         """),
-        {"occupation_id": occupation_id}
-    ).mappings().all()
+        {"skill_ids": list(skill_ids)}
+    ).all()
 
     mapping: Dict[int, List[int]] = {}
-    for r in rows:
-        sid = r["skill_id"]
-        bid = r["bucket_id"]
-        mapping.setdefault(sid, []).append(bid)
-    logger.debug(f"Computed matched_buckets for {len(mapping)} skills")
+    for sid, bid in rows:
+        bucket_ids = mapping.setdefault(sid, [])
+        if bid is not None:
+            bucket_ids.append(bid)
+    logger.debug("Read matched_buckets for %s skills", len(mapping))
     return mapping
+
+
+# -------------------------------
+# Single round-trip scoring inputs
+# -------------------------------
+
+SCORING_INPUTS_SQL = text("""
+    WITH occ AS (
+        SELECT id, "preferredLabel" AS label
+        FROM occupations
+        WHERE id = ANY(:occupation_ids)
+    ),
+    rel AS (
+        SELECT osr.id AS relation_id, osr.occupation_id, osr.skill_id, osr."relationType", osr.importance,
+               s."preferredLabel" AS skill_label, s.definition, s."skillType", s."reuseLevel",
+               osr."skillType" AS relation_skill_type
+        FROM occupation_skill_relations osr
+        JOIN skills s ON s.id = osr.skill_id
+        WHERE osr.occupation_id = ANY(:occupation_ids)
+    ),
+    first_rel AS (
+        SELECT DISTINCT ON (occupation_id, skill_id) *
+        FROM rel
+        ORDER BY occupation_id, skill_id, relation_id
+    ),
+    bucket_based AS (
+        SELECT sbm.skill_id,
+               AVG(COALESCE(sbm.weight_override, sb.default_weight)) AS bucket_weight
+        FROM skill_bucket_map sbm
+        JOIN scoring_buckets sb ON sb.id = sbm.bucket_id
+        WHERE sbm.skill_id IN (SELECT skill_id FROM rel)
+        GROUP BY sbm.skill_id
+    ),
+    auto AS (
+        SELECT DISTINCT ON (fr.occupation_id, fr.skill_id)
+               fr.occupation_id,
+               fr.skill_id,
+               ROUND(50 + (COALESCE(sas.automation_score,
+                                    bucket_based.bucket_weight,
+                                    (
+                                        CASE
+                                            WHEN fr."skillType" ILIKE '%competence%' THEN 10
+                                            WHEN fr."skillType" ILIKE '%knowledge%' THEN -10
+                                            ELSE 0
+                                        END
+                                        +
+                                        CASE
+                                            WHEN fr."reuseLevel" ILIKE '%cross%' THEN -5
+                                            ELSE 0
+                                        END
+                                    )
+                                    *
+                                    (
+                                        CASE
+                                            WHEN fr."relationType" = 'essential' THEN 1.2
+                                            WHEN fr."relationType" = 'optional' THEN 0.8
+                                            ELSE 1
+                                        END
+                                    )
+                                    * COALESCE(fr.importance, 1.0),
+                                    0) * 100), 2) AS normalized_score
+        FROM first_rel fr
+        LEFT JOIN skill_automation_scores sas ON sas.skill_id = fr.skill_id
+        LEFT JOIN bucket_based ON bucket_based.skill_id = fr.skill_id
+        ORDER BY fr.occupation_id, fr.skill_id
+    )
+    SELECT occ.id AS occupation_id,
+           occ.label AS occupation_label,
+           rel.skill_id,
+           rel.skill_label,
+           rel.definition,
+           rel."skillType",
+           rel."reuseLevel",
+           COALESCE(NULLIF(rel.importance, 0), 1.0) AS importance,
+           rel."relationType",
+           rel.relation_skill_type,
+           auto.normalized_score,
+           matches.indexed,
+           matches.bucket_ids
+    FROM occ
+    LEFT JOIN rel ON rel.occupation_id = occ.id
+    LEFT JOIN auto ON auto.occupation_id = rel.occupation_id AND auto.skill_id = rel.skill_id
+    -- Precomputed keyword matches, only looked up for skills without an automation score
+    LEFT JOIN LATERAL (
+        SELECT EXISTS (SELECT 1 FROM skill_match_sources src WHERE src.skill_id = rel.skill_id) AS indexed,
+               ARRAY(
+                   SELECT DISTINCT m.bucket_id
+                   FROM skill_bucket_matches m
+                   WHERE m.skill_id = rel.skill_id
+                   ORDER BY m.bucket_id
+               ) AS bucket_ids
+        WHERE rel.skill_id IS NOT NULL AND auto.normalized_score IS NULL
+    ) matches ON true
+    ORDER BY occ.id, rel.relation_id
+""")
+
+
+@timed_query
+def get_scoring_inputs(db: Session, occupation_ids: List[int]) -> Tuple[
+        Dict[int, Optional[str]], Dict[int, List[Dict[str, Any]]], Dict[int, Dict[int, float]], Dict[int, List[int]]]:
+    """
+    Everything _compute_many needs, in one statement: returns (labels, skills_by_occupation,
+    automation_by_occupation, skill_bucket_matches) shaped exactly like get_occupation_labels,
+    get_skills_for_occupations, get_skill_automation_scores_for_occupations and
+    get_skill_bucket_matches.
+    """
+    if not occupation_ids:
+        return {}, {}, {}, {}
+    rows = db.execute(SCORING_INPUTS_SQL, {"occupation_ids": list(occupation_ids)}).mappings().all()
+
+    labels: Dict[int, Optional[str]] = {}
+    skills_by_occupation: Dict[int, List[Dict[str, Any]]] = {}
+    automation_by_occupation: Dict[int, Dict[int, float]] = {}
+    bucket_matches: Dict[int, List[int]] = {}
+    for r in rows:
+        occupation_id = r["occupation_id"]
+        labels[occupation_id] = r["occupation_label"]
+        skill_id = r["skill_id"]
+        if skill_id is None:
+            continue
+        skills_by_occupation.setdefault(occupation_id, []).append({
+            "skill_id": skill_id,
+            "skill_label": (r["skill_label"] or "").strip(),
+            "definition": r["definition"],
+            "skillType": r["skillType"],
+            "reuseLevel": r["reuseLevel"],
+            "importance": float(r["importance"] or 1.0),
+            "relationType": r["relationType"],
+            "relation_skill_type": r["relation_skill_type"],
+        })
+        if r["normalized_score"] is not None:
+            automation_by_occupation.setdefault(occupation_id, {})[skill_id] = float(r["normalized_score"])
+        elif r["indexed"]:
+            bucket_matches[skill_id] = list(r["bucket_ids"] or [])
+
+    logger.debug("Fetched scoring inputs for %s occupations in one query", len(labels))
+    return labels, skills_by_occupation, automation_by_occupation, bucket_matches
+
+
+# -------------------------------
+# Materialized risk scores
+# -------------------------------
+
+# A stored payload is current only while its data_version matches the "scores" data version,
+# which the triggers below bump whenever a bucket, keyword match or automation score changes
+CURRENT_SCORE_CONDITION = """
+    data_version IS NOT DISTINCT FROM (SELECT version FROM scoring_data_versions WHERE name = 'scores')
+"""
+
+
+@timed_query
+def get_materialized_score(db: Session, occupation_id: int) -> Optional[Dict[str, Any]]:
+    """Return the current stored scoring payload for an occupation (primary-key read), or None."""
+    row = db.execute(
+        text(f"""
+            SELECT payload FROM occupation_risk_scores
+            WHERE occupation_id = :occupation_id AND {CURRENT_SCORE_CONDITION}
+        """),
+        {"occupation_id": occupation_id}
+    ).first()
+    return row[0] if row else None
+
+
+@timed_query
+def get_materialized_scores(db: Session, occupation_ids: List[int]) -> Dict[int, Dict[str, Any]]:
+    """Current stored scoring payloads for many occupations in one query: occupation_id -> payload."""
+    if not occupation_ids:
+        return {}
+    rows = db.execute(
+        text(f"""
+            SELECT occupation_id, payload FROM occupation_risk_scores
+            WHERE occupation_id = ANY(:occupation_ids) AND {CURRENT_SCORE_CONDITION}
+        """),
+        {"occupation_ids": list(occupation_ids)}
+    ).all()
+    return {r[0]: r[1] for r in rows}
+
+
+@timed_query
+def get_occupation_labels(db: Session, occupation_ids: List[int]) -> Dict[int, Optional[str]]:
+    """occupation_id -> preferredLabel for the ids that exist."""
+    if not occupation_ids:
+        return {}
+    rows = db.execute(
+        text('SELECT id, "preferredLabel" FROM occupations WHERE id = ANY(:occupation_ids)'),
+        {"occupation_ids": list(occupation_ids)}
+    ).all()
+    return {r[0]: r[1] for r in rows}
+
+
+@timed_query
+def upsert_materialized_scores(db: Session, results: List[Dict[str, Any]], data_version: Optional[int]) -> int:
+    """
+    Insert or replace scoring payloads, tagged with the "scores" data version read before their
+    inputs were fetched (so a change made meanwhile leaves them stale). The caller owns the transaction.
+    """
+    if not results:
+        return 0
+    rows = [
+        {
+            "occupation_id": r["occupation_id"],
+            "risk_score": r["risk_score"],
+            "level": r["level"],
+            "skills_analyzed": r["skills_analyzed"],
+            "payload": r,
+            "data_version": data_version,
+        }
+        for r in results
+    ]
+    stmt = pg_insert(OccupationRiskScore.__table__).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["occupation_id"],
+        set_={
+            "risk_score": stmt.excluded.risk_score,
+            "level": stmt.excluded.level,
+            "skills_analyzed": stmt.excluded.skills_analyzed,
+            "payload": stmt.excluded.payload,
+            "data_version": stmt.excluded.data_version,
+            "computed_at": text("now()"),
+        },
+    )
+    db.execute(stmt)
+    return len(rows)
+
+
+@timed_query
+def delete_materialized_scores(db: Session, occupation_ids: Optional[List[int]] = None) -> int:
+    """Drop stored payloads for the given occupations (all of them when ids is None)."""
+    if occupation_ids is None:
+        result = db.execute(text("DELETE FROM occupation_risk_scores"))
+    else:
+        result = db.execute(
+            text("DELETE FROM occupation_risk_scores WHERE occupation_id = ANY(:occupation_ids)"),
+            {"occupation_ids": list(occupation_ids)}
+        )
+    return result.rowcount
+
+
+@timed_query
+def get_all_occupation_ids(db: Session) -> List[int]:
+    """Return every occupation id, ordered."""
+    rows = db.execute(text("SELECT id FROM occupations ORDER BY id")).all()
+    return [r[0] for r in rows]
+
+
+@timed_query
+def get_occupation_ids_for_skills(db: Session, skill_ids: List[int]) -> List[int]:
+    """Occupations that reference any of the given skills."""
+    rows = db.execute(
+        text("""
+            SELECT DISTINCT occupation_id
+            FROM occupation_skill_relations
+            WHERE skill_id = ANY(:skill_ids)
+        """),
+        {"skill_ids": list(skill_ids)}
+    ).all()
+    return [r[0] for r in rows]
+
+
+@timed_query
+def get_occupation_ids_for_buckets(db: Session, bucket_ids: List[int]) -> List[int]:
+    """
+    Occupations whose score depends on the given buckets: skills explicitly mapped
+    via skill_bucket_map or matched by one of the bucket keywords.
+    """
+    rows = db.execute(
+        text("""
+            SELECT osr.occupation_id
+            FROM skill_bucket_map sbm
+            JOIN occupation_skill_relations osr ON osr.skill_id = sbm.skill_id
+            WHERE sbm.bucket_id = ANY(:bucket_ids)
+            UNION
+            SELECT osr.occupation_id
+            FROM skill_bucket_matches m
+            JOIN occupation_skill_relations osr ON osr.skill_id = m.skill_id
+            WHERE m.bucket_id = ANY(:bucket_ids)
+        """),
+        {"bucket_ids": list(bucket_ids)}
+    ).all()
+    return [r[0] for r in rows]
+
+
+# -------------------------------
+# Occupation search (pg_trgm + tsvector)
+# -------------------------------
+
+# Idempotent; applied at startup and after a schema swap. pg_trgm may be unavailable
+# (no contrib package / privileges), in which case search falls back to the tsvector only.
+SEARCH_DDL = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    """
+    ALTER TABLE occupations ADD COLUMN IF NOT EXISTS search_tsv tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('simple', coalesce("preferredLabel", '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce("altLabels", '')), 'B') ||
+        setweight(to_tsvector('simple', coalesce("hiddenLabels", '')), 'C')
+    ) STORED
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_occupations_search_tsv ON occupations USING gin (search_tsv)",
+    'CREATE INDEX IF NOT EXISTS ix_occupations_label_prefix ON occupations (lower("preferredLabel") text_pattern_ops)',
+    'CREATE INDEX IF NOT EXISTS ix_occupations_label_trgm ON occupations USING gin (lower("preferredLabel") gin_trgm_ops)',
+    'CREATE INDEX IF NOT EXISTS ix_occupations_alt_labels_trgm ON occupations USING gin (lower("altLabels") gin_trgm_ops)',
+    'CREATE INDEX IF NOT EXISTS ix_occupations_hidden_labels_trgm ON occupations USING gin (lower("hiddenLabels") gin_trgm_ops)',
+]
+
+# Candidates: substring hit on any label (trigram GIN) or word-prefix hit (tsvector GIN).
+# Rank: prefix boost (label starts with / has a word starting with the query), then trigram
+# word similarity, alt/hidden-label hits weighted lower.
+SEARCH_TRGM_SQL = text("""
+    SELECT id, label
+    FROM (
+        SELECT id,
+               "preferredLabel" AS label,
+               (CASE WHEN lower("preferredLabel") LIKE :prefix ESCAPE '\\' THEN 2.0
+                     WHEN search_tsv @@ to_tsquery('simple', :label_tsquery) THEN 1.0
+                     ELSE 0 END)
+               + GREATEST(word_similarity(:query, lower("preferredLabel")),
+                          0.5 * word_similarity(:query, lower(coalesce("altLabels", ''))),
+                          0.25 * word_similarity(:query, lower(coalesce("hiddenLabels", ''))))
+               AS score
+        FROM occupations
+        WHERE lower("preferredLabel") LIKE :contains ESCAPE '\\'
+           OR lower("altLabels") LIKE :contains ESCAPE '\\'
+           OR lower("hiddenLabels") LIKE :contains ESCAPE '\\'
+           OR search_tsv @@ to_tsquery('simple', :tsquery)
+    ) ranked
+    ORDER BY score DESC, length(label), label
+    LIMIT :limit
+""")
+
+# Without pg_trgm: word-prefix matches only, ranked by prefix boost then ts_rank (A > B > C).
+SEARCH_TSV_SQL = text("""
+    SELECT id, label
+    FROM (
+        SELECT id,
+               "preferredLabel" AS label,
+               (CASE WHEN lower("preferredLabel") LIKE :prefix ESCAPE '\\' THEN 2.0
+                     WHEN search_tsv @@ to_tsquery('simple', :label_tsquery) THEN 1.0
+                     ELSE 0 END)
+               + ts_rank(search_tsv, to_tsquery('simple', :tsquery), 1) AS score
+        FROM occupations
+        WHERE search_tsv @@ to_tsquery('simple', :tsquery)
+           OR lower("preferredLabel") LIKE :prefix ESCAPE '\\'
+    ) ranked
+    ORDER BY score DESC, length(label), label
+    LIMIT :limit
+""")
+
+_trigram_support: Optional[bool] = None
+
+
+@timed_query
+def get_occupation_labels_for_autocomplete(db: Session) -> List[tuple]:
+    """(id, preferredLabel, altLabels) for every occupation; altLabels are newline-separated."""
+    return [tuple(r) for r in db.execute(text('SELECT id, "preferredLabel", "altLabels" FROM occupations ORDER BY id')).all()]
+
+
+def ensure_search_indexes(db: Session) -> None:
+    """Create the pg_trgm extension, the occupations.search_tsv column and search indexes (idempotent)."""
+    global _trigram_support
+    _trigram_support = None
+    for ddl in SEARCH_DDL:
+        if "gin_trgm_ops" in ddl and not has_trigram_support(db):
+            continue
+        try:
+            db.execute(text(ddl))
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            logger.warning("Could not apply '%s': %s", ' '.join(ddl.split())[:80], e)
+        _trigram_support = None
+    if not has_trigram_support(db):
+        logger.warning("pg_trgm is not available; occupation search uses word-prefix matching only")
+
+
+def has_trigram_support(db: Session) -> bool:
+    """Whether pg_trgm is installed (checked once per process, reset by ensure_search_indexes)."""
+    global _trigram_support
+    if _trigram_support is None:
+        _trigram_support = bool(db.execute(text("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")).scalar())
+    return _trigram_support
+
+
+@timed_query
+def search_occupations_ranked(db: Session, query: str, tsquery: str, label_tsquery: str,
+                              limit: int) -> List[Dict[str, Any]]:
+    """
+    Ranked occupation search. `query` is the lower-cased search text, `tsquery` a prefix
+    tsquery over all labels and `label_tsquery` the same restricted to preferredLabel (weight A).
+    """
+    escaped = query.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    sql = SEARCH_TRGM_SQL if has_trigram_support(db) else SEARCH_TSV_SQL
+    rows = db.execute(sql, {
+        "query": query,
+        "prefix": f"{escaped}%",
+        "contains": f"%{escaped}%",
+        "tsquery": tsquery,
+        "label_tsquery": label_tsquery,
+        "limit": limit,
+    }).mappings().all()
+    return [dict(r) for r in rows]
+
+
+# -------------------------------
+# Scoring data versions (cache invalidation)
+# -------------------------------
+
+# Tables whose changes invalidate the cached bucket metadata / keyword matcher
+BUCKET_VERSION_NAME = "buckets"
+BUCKET_VERSION_TABLES = ["scoring_buckets", "bucket_keywords"]
+# Tables whose changes make stored occupation_risk_scores payloads stale. Relation imports are
+# not listed: they delete the payloads of the occupations they touch instead.
+SCORE_VERSION_NAME = "scores"
+SCORE_VERSION_TABLES = [
+    "scoring_buckets", "bucket_keywords", "skill_bucket_map", "skill_bucket_matches", "skill_automation_scores",
+]
+# (version name, trigger name suffix, tables)
+DATA_VERSION_TRIGGERS = [
+    (BUCKET_VERSION_NAME, "scoring_version", BUCKET_VERSION_TABLES),
+    (SCORE_VERSION_NAME, "score_version", SCORE_VERSION_TABLES),
+]
+
+
+@timed_query
+def get_data_version(db: Session, name: str) -> Optional[int]:
+    """Current change counter of a scoring dataset (primary-key read), or None if never bumped."""
+    return db.execute(
+        text("SELECT version FROM scoring_data_versions WHERE name = :name"),
+        {"name": name}
+    ).scalar()
+
+
+@timed_query
+def bump_data_version(db: Session, name: str) -> int:
+    """Increment a dataset's change counter and return the new value. The caller commits."""
+    return db.execute(
+        text("""
+            INSERT INTO scoring_data_versions (name, version, updated_at)
+            VALUES (:name, 1, now())
+            ON CONFLICT (name) DO UPDATE
+            SET version = scoring_data_versions.version + 1, updated_at = now()
+            RETURNING version
+        """),
+        {"name": name}
+    ).scalar()
+
+
+def ensure_data_version_triggers(db: Session) -> None:
+    """
+    Install statement-level triggers that bump scoring_data_versions whenever a table of
+    DATA_VERSION_TRIGGERS changes (idempotent; skips tables that do not exist).
+    """
+    ddl = [
+        """
+        CREATE OR REPLACE FUNCTION bump_scoring_data_version() RETURNS trigger AS $$
+        BEGIN
+            INSERT INTO scoring_data_versions (name, version, updated_at)
+            VALUES (TG_ARGV[0], 1, now())
+            ON CONFLICT (name) DO UPDATE
+            SET version = scoring_data_versions.version + 1, updated_at = now();
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """,
+    ]
+    for name, suffix, tables in DATA_VERSION_TRIGGERS:
+        ddl.append(f"""
+            INSERT INTO scoring_data_versions (name, version, updated_at)
+            VALUES ('{name}', 0, now())
+            ON CONFLICT (name) DO NOTHING
+        """)
+        for table in tables:
+            trigger = f"trg_{table}_{suffix}"
+            ddl.append(f"""
+                DO $$
+                BEGIN
+                    IF to_regclass('{table}') IS NOT NULL THEN
+                        DROP TRIGGER IF EXISTS {trigger} ON {table};
+                        CREATE TRIGGER {trigger}
+                        AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON {table}
+                        FOR EACH STATEMENT EXECUTE PROCEDURE bump_scoring_data_version('{name}');
+                    END IF;
+                END
+                $$
+            """)
+    try:
+        for statement in ddl:
+            db.execute(text(statement))
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        logger.warning("Could not install scoring data version triggers: %s", e)
+
+
+# -------------------------------
+# Indexes on tables not managed by the ORM
+# -------------------------------
+
+SCORING_INDEXES = [
+    # Databases created before payloads were versioned; their NULL-version rows read as stale
+    "ALTER TABLE occupation_risk_scores ADD COLUMN IF NOT EXISTS data_version bigint",
+    "CREATE INDEX IF NOT EXISTS ix_skill_bucket_map_skill_id ON skill_bucket_map (skill_id)",
+    "CREATE INDEX IF NOT EXISTS ix_skill_automation_scores_skill_id ON skill_automation_scores (skill_id)",
+    # Serves the per-occupation relation scans and their (skill_id, id) ordering without a sort
+    "CREATE INDEX IF NOT EXISTS ix_occupation_skill_relations_occ_skill "
+    "ON occupation_skill_relations (occupation_id, skill_id, id)",
+]
+
+
+def ensure_scoring_indexes(db: Session) -> None:
+    """Create the indexes the scoring queries rely on (idempotent)."""
+    for ddl in SCORING_INDEXES:
+        try:
+            db.execute(text(ddl))
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            logger.warning("Could not apply '%s': %s", ' '.join(ddl.split())[:80], e)
@@ -1,20 +1,32 @@
 from fastapi import APIRouter, Depends, Query, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from typing import Any, Dict, List, Optional
-from app.core.logger import logger
-from app.core.database import get_db
-from app.scoring.service import SimpleDbDrivenScorer, search_occupations
+from app.core.logger import get_logger
+from app.core.database import get_async_db, get_db
+from app.core import pubsub
+from app.scoring.service import BUCKET_CACHE_CHANNEL, DEFAULT_SORT, SimpleDbDrivenScorer, search_occupations_async
+from app.schemas.scoring import BatchScoreRequest, SortField
+from app.scoring.autocomplete import AutocompleteService
+from app.services.cache_service import DATASET_VERSION_CHANNEL, CacheService
 from app.core.deps import get_current_user, get_rate_limiter
 
+logger = get_logger(__name__)
+
 
 router = APIRouter(prefix="/scoring", tags=["Scoring"])
 scorer = SimpleDbDrivenScorer()
+# Other workers announce bucket/keyword changes; drop our copy so the next request reloads
+pubsub.subscribe(BUCKET_CACHE_CHANNEL, lambda message: scorer.invalidate_bucket_cache())
+# In-memory label index for /scoring/search, built at startup and rebuilt on dataset version changes
+autocomplete = AutocompleteService()
+pubsub.subscribe(DATASET_VERSION_CHANNEL, autocomplete.mark_stale)
 
 
 @router.get("/occupation", response_model=Dict[str, Any])
-def get_score_by_occupation_name(
+async def get_score_by_occupation_name(
     name: str = Query(..., description="Name or label of the occupation (fuzzy search)"),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
     # _limit: bool = Depends(get_rate_limiter) # <-- This handles everything!
 ):
     """
@@ -22,23 +34,31 @@ def get_score_by_occupation_name(
     Example:
         GET /scoring/occupation?name=Software%20Developer
     """
-    logger.info(f"Request received: score_by_occupation_name name='{name}'")
+    logger.info("Request received: score_by_occupation_name name='%s'", name)
     try:
-        result = scorer.score_by_occupation_name(db, name)
-        logger.info(f"Successfully computed score for occupation name='{name}'")
+        resolver = None
+        if autocomplete.ready:
+            await autocomplete.ensure_fresh()
+            resolver = autocomplete.resolve
+        result = await CacheService.get_or_compute(
+            "score_by_name", [name.lower()],
+            lambda: scorer.score_by_occupation_name_async(db, name, resolver)
+        )
+        logger.info("Successfully computed score for occupation name='%s'", name)
         return result
     except ValueError as e:
-        logger.warning(f"Occupation not found: {e}")
+        logger.warning("Occupation not found: %s", e)
         raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
-        logger.error(f"Unexpected error occurred while scoring occupation name='{name}': {e}", exc_info=True)
+        logger.error("Unexpected error occurred while scoring occupation name='%s': %s", name, e, exc_info=True)
         raise HTTPException(status_code=500, detail=f"Unexpected error: {str(e)}")
 
 
 @router.get("/occupation/{occupation_id}", response_model=Dict[str, Any])
-def get_score_by_occupation_id(
+async def get_score_by_occupation_id(
     occupation_id: int,
-    db: Session = Depends(get_db),
+    sort_by: SortField = Query(DEFAULT_SORT, description="Per-skill sort field"),
+    db: AsyncSession = Depends(get_async_db),
     _limit: bool = Depends(get_rate_limiter) # <-- This handles everything!
 ):
     """
@@ -46,16 +66,41 @@ def get_score_by_occupation_id(
     Example:
         GET /scoring/occupation/123
     """
-    logger.info(f"Request received: score_by_occupation_id id={occupation_id}")
+    logger.info("Request received: score_by_occupation_id id=%s", occupation_id)
     try:
-        result = scorer.score_by_occupation_id(db, occupation_id)
-        logger.info(f"Successfully computed score for occupation_id={occupation_id}")
+        result = await CacheService.get_or_compute(
+            "score", [occupation_id, sort_by],
+            lambda: scorer.get_score_async(db, occupation_id, sort_by)
+        )
+        logger.info("Successfully computed score for occupation_id=%s", occupation_id)
         return result
     except ValueError as e:
-        logger.warning(f"Occupation ID not found: {e}")
+        logger.warning("Occupation ID not found: %s", e)
         raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
-        logger.error(f"Unexpected error occurred while scoring occupation_id={occupation_id}: {e}", exc_info=True)
+        logger.error("Unexpected error occurred while scoring occupation_id=%s: %s", occupation_id, e, exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Unexpected error: {str(e)}")
+
+
+@router.post("/occupations/batch", response_model=Dict[str, Any])
+async def get_scores_for_occupations(
+    payload: BatchScoreRequest,
+    db: AsyncSession = Depends(get_async_db),
+    _limit: bool = Depends(get_rate_limiter)
+):
+    """
+    Score many occupations in one request (set-based queries, one rate-limit check).
+    Example:
+        POST /scoring/occupations/batch  {"occupation_ids": [1, 2, 3]}
+    Unknown ids are listed under "not_found".
+    """
+    logger.info("Request received: batch score for %s occupations", len(payload.occupation_ids))
+    try:
+        result = await scorer.score_many_async(db, payload.occupation_ids, payload.sort_by)
+        logger.info("Successfully computed %s batch scores", result['count'])
+        return result
+    except Exception as e:
+        logger.error("Unexpected error occurred while batch scoring occupations: %s", e, exc_info=True)
         raise HTTPException(status_code=500, detail=f"Unexpected error: {str(e)}")
 
 
@@ -72,21 +117,28 @@ def get_bucket_keywords(
     logger.info("Request received: get_bucket_keywords")
     try:
         buckets = scorer._load_bucket_keywords(db)
-        logger.info(f"Successfully retrieved {len(buckets)} buckets")
+        logger.info("Successfully retrieved %s buckets", len(buckets))
         return {"count": len(buckets), "buckets": buckets}
     except Exception as e:
-        logger.error(f"Unexpected error occurred while loading bucket keywords: {e}", exc_info=True)
+        logger.error("Unexpected error occurred while loading bucket keywords: %s", e, exc_info=True)
         raise HTTPException(status_code=500, detail=f"Unexpected error: {str(e)}")
     
 @router.get("/search", response_model=List[Dict[str, str]])
-def search_occupations_endpoint(
+async def search_occupations_endpoint(
     query: str = Query(..., min_length=1),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
     # user: Optional[Dict] = Depends(get_current_user) # <-- Still good to have
 ):
     """
     API endpoint to search occupations for autocomplete.
+    Served from the in-process autocomplete index; falls back to the (cached) SQL search
+    while the index is not built.
     """
-    results = search_occupations(db, query)
+    if autocomplete.ready:
+        await autocomplete.ensure_fresh()
+        return autocomplete.search(query)
+    results = await CacheService.get_or_compute(
+        "search", [query.lower()],
+        lambda: search_occupations_async(db, query)
+    )
     return results
-
@@ -1,15 +1,41 @@
 # app/scoring/service.py
-from typing import Any, Dict, List, Optional
-from app.core.logger import logger
+import asyncio
+import os
+import re
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple, get_args
+from app.core.logger import get_logger
 from sqlalchemy.orm import Session
 from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core import pubsub
+from app.core.metrics import CACHE_LOOKUPS
+from app.db import scoring_repository as async_repo
 from app.scoring import repository as repo
+from app.scoring.kernel import VULNERABILITY_LABELS, score_segments
+from app.scoring.matcher import BucketKeywordMatcher
+from app.schemas.scoring import SortField
+
+logger = get_logger(__name__)
 
 # Tunable parameters
 DEFAULT_FALLBACK_WEIGHT = 5.0
 ALPHA = 0.7  # how strongly "safe" offsets positive risk
 EPS = 1e-9
+SORTABLE_FIELDS = set(get_args(SortField))
+DEFAULT_SORT = "normalized_contrib"
+MATERIALIZE_BATCH_SIZE = 200
+# How often a worker checks scoring_data_versions for bucket/keyword edits
+BUCKET_CACHE_CHECK_SECONDS = float(os.getenv("BUCKET_CACHE_CHECK_SECONDS", "5"))
+BUCKET_CACHE_CHANNEL = "scoring:bucket-cache"
+# How live scoring fetches its inputs: "multi" (one query per input kind) or "single"
+# (repo.get_scoring_inputs, one round trip; bucket metadata still comes from the in-process cache)
+SCORING_DATA_PATH = os.getenv("SCORING_DATA_PATH", "multi").lower()
+# Words of a search query that are safe to use as tsquery prefix terms
+SEARCH_WORD_RE = re.compile(r"[^\W_]+")
 
 
 def vulnerability_label_normalized(normalized: float) -> str:
@@ -48,54 +74,439 @@ def compute_risk_from_contribs(raw_contribs: List[float], safe_contribs: List[fl
     adjusted_risk = total_positive - ALPHA * total_safe
     max_possible = total_positive if total_positive > 0 else 1.0
     score = max(0.0, min(100.0, 100.0 * adjusted_risk / max_possible))
-    logger.debug(f"Risk computation: positive={total_positive}, safe={total_safe}, score={score}")
+    logger.debug("Risk computation: positive=%s, safe=%s, score=%s", total_positive, total_safe, score)
     return score
 
 
+def group_bucket_keywords(rows: List[Dict[str, Any]]) -> Dict[int, Dict[str, Any]]:
+    """Group keyword rows from repo.get_bucket_keywords into bucket metadata with a keyword set."""
+    buckets: Dict[int, Dict[str, Any]] = {}
+    for r in rows:
+        b_id = int(r["bucket_id"])
+        if b_id not in buckets:
+            buckets[b_id] = {
+                "bucket_id": b_id,
+                "bucket_name": r["bucket_name"],
+                "default_weight": float(r["default_weight"]) if r["default_weight"] is not None else DEFAULT_FALLBACK_WEIGHT,
+                "keywords": set(),
+            }
+        kw = r["keyword"]
+        if kw:
+            buckets[b_id]["keywords"].add(kw.lower())
+    return buckets
+
+
+def neutral_result(occupation_id: int, occupation_label: str) -> dict:
+    """Payload returned for occupations without any linked skills."""
+    return {
+        "occupation_id": occupation_id,
+        "occupation_label": occupation_label,
+        "risk_score": 50.0,
+        "level": "Yellow",
+        "explanation": "No skills available; returned neutral score",
+        "skills_analyzed": 0,
+        "per_skill": [],
+        "matched_buckets": {},
+    }
+
+
 class SimpleDbDrivenScorer:
     """DB-driven scoring service with optimized bucket matching."""
 
     def __init__(self):
         self._bucket_keywords_cache: Optional[Dict[int, Dict[str, Any]]] = None
+        self._bucket_cache_version: Optional[int] = None
+        self._bucket_cache_checked_at = 0.0
+        self._matcher: Optional[BucketKeywordMatcher] = None
+        self._bucket_lock = threading.Lock()
+        # Guards reloads on the async path, where the loading coroutines share one thread
+        self._async_bucket_lock = asyncio.Lock()
+
+    def _reset_bucket_cache(self) -> None:
+        """Drop cached bucket metadata and the matcher compiled from it."""
+        self._bucket_keywords_cache = None
+        self._bucket_cache_version = None
+        self._matcher = None
+
+    def invalidate_bucket_cache(self, broadcast: bool = False) -> None:
+        """
+        Drop this worker's bucket cache; with broadcast=True also tell the other workers
+        over Redis pub/sub (they reload on their next request).
+        """
+        logger.info("Invalidating bucket keyword cache")
+        self._reset_bucket_cache()
+        if broadcast:
+            pubsub.publish(BUCKET_CACHE_CHANNEL, {"event": "invalidate"})
+
+    def _bucket_check_due(self) -> bool:
+        """True at most once every BUCKET_CACHE_CHECK_SECONDS."""
+        now = time.monotonic()
+        if now - self._bucket_cache_checked_at < BUCKET_CACHE_CHECK_SECONDS:
+            return False
+        self._bucket_cache_checked_at = now
+        return True
+
+    def _bucket_version_changed(self, version: int) -> bool:
+        if version != self._bucket_cache_version:
+            logger.info("Bucket keyword cache is stale (version %s -> %s)", self._bucket_cache_version, version)
+            return True
+        return False
+
+    def _bucket_cache_is_stale(self, db: Session) -> bool:
+        """Compare the cached version with scoring_data_versions at most every BUCKET_CACHE_CHECK_SECONDS."""
+        if not self._bucket_check_due():
+            return False
+        return self._bucket_version_changed(repo.get_data_version(db, repo.BUCKET_VERSION_NAME))
+
+    def _install_bucket_keywords(self, rows: List[Dict[str, Any]], version: int) -> Dict[int, Dict[str, Any]]:
+        """Group freshly loaded keyword rows, compile the matcher and swap both in."""
+        buckets = group_bucket_keywords(rows)
+        self._matcher = BucketKeywordMatcher(buckets)
+        self._bucket_keywords_cache = buckets
+        self._bucket_cache_version = version
+        self._bucket_cache_checked_at = time.monotonic()
+        logger.debug(
+            "Loaded %s buckets with %s keywords (version %s)", len(buckets), self._matcher.keyword_count, version
+        )
+        return buckets
 
     def _load_bucket_keywords(self, db: Session) -> Dict[int, Dict[str, Any]]:
-        """Load bucket keywords & metadata from DB and cache."""
-        if self._bucket_keywords_cache:
-            logger.debug("Using cached bucket keywords")
-            return self._bucket_keywords_cache
-
-        logger.info("Loading bucket keywords from DB")
-        rows = repo.get_bucket_keywords(db)
-        buckets: Dict[int, Dict[str, Any]] = {}
-        for r in rows:
-            b_id = int(r["bucket_id"])
-            if b_id not in buckets:
-                buckets[b_id] = {
-                    "bucket_id": b_id,
-                    "bucket_name": r["bucket_name"],
-                    "default_weight": float(r["default_weight"]) if r["default_weight"] is not None else DEFAULT_FALLBACK_WEIGHT,
-                    "keywords": set(),
-                }
-            kw = r["keyword"]
-            if kw:
-                buckets[b_id]["keywords"].add(kw.lower())
+        """Load bucket keywords & metadata from DB and cache, reloading when the data version changes."""
+        buckets = self._bucket_keywords_cache
+        if buckets is not None and not self._bucket_cache_is_stale(db):
+            CACHE_LOOKUPS.inc(cache="bucket_keywords", result="hit")
+            return buckets
+
+        CACHE_LOOKUPS.inc(cache="bucket_keywords", result="miss")
+        with self._bucket_lock:
+            current = self._bucket_keywords_cache
+            if current is not None and current is not buckets:
+                # Another thread reloaded while we waited
+                return current
+
+            logger.info("Loading bucket keywords from DB")
+            # Read the version first so a change made during the load is seen by the next check
+            version = repo.get_data_version(db, repo.BUCKET_VERSION_NAME)
+            return self._install_bucket_keywords(repo.get_bucket_keywords(db), version)
+
+    async def _load_bucket_keywords_async(self, db: AsyncSession) -> Dict[int, Dict[str, Any]]:
+        """
+        Async counterpart of _load_bucket_keywords. Coroutines on one event loop share a thread, so
+        they serialize on an asyncio.Lock; blocking on the threading lock there could deadlock.
+        """
+        buckets = self._bucket_keywords_cache
+        if buckets is not None and not (
+            self._bucket_check_due()
+            and self._bucket_version_changed(await db.run_sync(repo.get_data_version, repo.BUCKET_VERSION_NAME))
+        ):
+            CACHE_LOOKUPS.inc(cache="bucket_keywords", result="hit")
+            return buckets
+
+        CACHE_LOOKUPS.inc(cache="bucket_keywords", result="miss")
+        async with self._async_bucket_lock:
+            current = self._bucket_keywords_cache
+            if current is not None and current is not buckets:
+                return current
+            logger.info("Loading bucket keywords from DB")
+            version = await db.run_sync(repo.get_data_version, repo.BUCKET_VERSION_NAME)
+            rows = await db.run_sync(repo.get_bucket_keywords)
+            return self._install_bucket_keywords(rows, version)
+
+    def _score_version(self, db: Session) -> Optional[int]:
+        """
+        "scores" data version to store with payloads computed now. Read before their inputs, and
+        the bucket cache is checked right away (not throttled) so it is not older than the version.
+        """
+        version = repo.get_data_version(db, repo.SCORE_VERSION_NAME)
+        if self._bucket_keywords_cache is not None and self._bucket_version_changed(
+            repo.get_data_version(db, repo.BUCKET_VERSION_NAME)
+        ):
+            self._reset_bucket_cache()
+        return version
+
+    async def _score_version_async(self, db: AsyncSession) -> Optional[int]:
+        """Async counterpart of _score_version."""
+        version = await db.run_sync(repo.get_data_version, repo.SCORE_VERSION_NAME)
+        if self._bucket_keywords_cache is not None and self._bucket_version_changed(
+            await db.run_sync(repo.get_data_version, repo.BUCKET_VERSION_NAME)
+        ):
+            self._reset_bucket_cache()
+        return version
+
+    def _get_matcher(self, db: Session) -> BucketKeywordMatcher:
+        """Keyword matcher compiled with the currently loaded bucket cache."""
+        buckets = self._load_bucket_keywords(db)
+        matcher = self._matcher
+        if matcher is None:
+            # Cache was invalidated concurrently; compile for the buckets we were handed
+            matcher = BucketKeywordMatcher(buckets)
+        return matcher
+
+    def bucket_cache_info(self) -> Dict[str, Any]:
+        """State of this worker's bucket cache (for the admin endpoint)."""
+        buckets = self._bucket_keywords_cache
+        return {
+            "loaded": buckets is not None,
+            "version": self._bucket_cache_version,
+            "buckets": len(buckets) if buckets is not None else 0,
+            "keywords": self._matcher.keyword_count if self._matcher is not None else 0,
+            "check_interval_seconds": BUCKET_CACHE_CHECK_SECONDS,
+            "worker": pubsub.WORKER_ID,
+        }
 
-        self._bucket_keywords_cache = buckets
-        logger.debug(f"Loaded {len(buckets)} buckets with keywords")
-        return buckets
+    def score_by_occupation_name(self, db: Session, occupation_name: str,
+                                 resolver: Optional[Callable[[str], Optional[Dict[str, Any]]]] = None) -> Dict[str, Any]:
+        """
+        Compute score using occupation name (fuzzy match).
+        With a resolver (the in-memory fuzzy index) the best match is typo-tolerant and reported under
+        "match" with its confidence; without one the SQL substring lookup is used.
+        """
+        logger.info("Scoring by occupation name: %s", occupation_name)
+        if resolver is not None:
+            match = resolver(occupation_name)
+            if not match:
+                logger.warning("Occupation matching '%s' not found", occupation_name)
+                raise ValueError(f"Occupation matching '{occupation_name}' not found")
+            result = dict(self.get_score(db, int(match["occupation_id"])))
+            result["match"] = match
+            return result
 
-    def score_by_occupation_name(self, db: Session, occupation_name: str) -> Dict[str, Any]:
-        """Compute score using occupation name (fuzzy match)."""
-        logger.info(f"Scoring by occupation name: {occupation_name}")
         occ = repo.get_occupation_by_name(db, occupation_name)
         if not occ:
-            logger.warning(f"Occupation matching '{occupation_name}' not found")
+            logger.warning("Occupation matching '%s' not found", occupation_name)
+            raise ValueError(f"Occupation matching '{occupation_name}' not found")
+        return self.get_score(db, int(occ["id"]))
+
+    async def score_by_occupation_name_async(self, db: AsyncSession, occupation_name: str,
+                                             resolver: Optional[Callable[[str], Optional[Dict[str, Any]]]] = None
+                                             ) -> Dict[str, Any]:
+        """Async counterpart of score_by_occupation_name."""
+        logger.info("Scoring by occupation name: %s", occupation_name)
+        if resolver is not None:
+            match = resolver(occupation_name)
+            occupation_id = int(match["occupation_id"]) if match else None
+        else:
+            match = None
+            occ = await db.run_sync(repo.get_occupation_by_name, occupation_name)
+            occupation_id = int(occ["id"]) if occ else None
+        if occupation_id is None:
+            logger.warning("Occupation matching '%s' not found", occupation_name)
             raise ValueError(f"Occupation matching '{occupation_name}' not found")
-        return self.score_by_occupation_id(db, int(occ["id"]))
 
-    def score_by_occupation_id(self, db: Session, occupation_id: int, sort_by: str = "normalized_contrib") -> dict:
+        result = await self.get_score_async(db, occupation_id)
+        if match:
+            result = dict(result)
+            result["match"] = match
+        return result
+
+    def get_score(self, db: Session, occupation_id: int, sort_by: str = DEFAULT_SORT) -> dict:
+        """
+        Serve a score from the materialized occupation_risk_scores store.
+        On a miss (no payload, or one computed before a bucket / automation score change) the score
+        is computed live and written back so the next read is a single PK lookup.
+        """
+        result = repo.get_materialized_score(db, occupation_id)
+        CACHE_LOOKUPS.inc(cache="materialized_scores", result="miss" if result is None else "hit")
+        if result is None:
+            logger.info("No current materialized score for occupation id=%s, computing live", occupation_id)
+            version = self._score_version(db)
+            result = self.score_by_occupation_id(db, occupation_id)
+            try:
+                repo.upsert_materialized_scores(db, [result], version)
+                db.commit()
+            except SQLAlchemyError as e:
+                db.rollback()
+                logger.warning("Could not store materialized score for occupation id=%s: %s", occupation_id, e)
+        return sort_per_skill(result, sort_by)
+
+    async def get_score_async(self, db: AsyncSession, occupation_id: int, sort_by: str = DEFAULT_SORT) -> dict:
+        """
+        Async counterpart of get_score: the stored payload is read with asyncpg; a miss is computed
+        with set-based queries awaited on the same session (see _compute_many_async) and stored.
+        """
+        result = await async_repo.fetch_materialized_score(db, occupation_id)
+        CACHE_LOOKUPS.inc(cache="materialized_scores", result="miss" if result is None else "hit")
+        if result is None:
+            logger.info("No current materialized score for occupation id=%s, computing live", occupation_id)
+            version = await self._score_version_async(db)
+            computed = await self._compute_many_async(db, [occupation_id])
+            if occupation_id not in computed:
+                raise ValueError(f"Occupation id={occupation_id} not found")
+            result = computed[occupation_id]
+            await self._store_async(db, [result], version)
+        return sort_per_skill(result, sort_by)
+
+    def score_many(self, db: Session, occupation_ids: List[int], sort_by: str = DEFAULT_SORT) -> Dict[str, Any]:
+        """
+        Score many occupations with set-based queries.
+        Stored payloads are read in one query; the rest are computed from inputs fetched for
+        all of them at once (labels, skills, automation scores, bucket matches) and stored.
+        """
+        ids = list(dict.fromkeys(int(i) for i in occupation_ids))
+        logger.info("Batch scoring %s occupations", len(ids))
+
+        results: Dict[int, dict] = repo.get_materialized_scores(db, ids)
+        missing = [i for i in ids if i not in results]
+        CACHE_LOOKUPS.inc(len(results), cache="materialized_scores", result="hit")
+        CACHE_LOOKUPS.inc(len(missing), cache="materialized_scores", result="miss")
+        if missing:
+            version = self._score_version(db)
+            computed = self._compute_many(db, missing)
+            if computed:
+                try:
+                    repo.upsert_materialized_scores(db, list(computed.values()), version)
+                    db.commit()
+                except SQLAlchemyError as e:
+                    db.rollback()
+                    logger.warning("Could not store %s batch-computed scores: %s", len(computed), e)
+            results.update(computed)
+        return batch_response(ids, results, sort_by)
+
+    async def score_many_async(self, db: AsyncSession, occupation_ids: List[int],
+                               sort_by: str = DEFAULT_SORT) -> Dict[str, Any]:
+        """Async counterpart of score_many."""
+        ids = list(dict.fromkeys(int(i) for i in occupation_ids))
+        logger.info("Batch scoring %s occupations", len(ids))
+
+        results: Dict[int, dict] = await async_repo.fetch_materialized_scores(db, ids)
+        missing = [i for i in ids if i not in results]
+        CACHE_LOOKUPS.inc(len(results), cache="materialized_scores", result="hit")
+        CACHE_LOOKUPS.inc(len(missing), cache="materialized_scores", result="miss")
+        if missing:
+            version = await self._score_version_async(db)
+            computed = await self._compute_many_async(db, missing)
+            await self._store_async(db, list(computed.values()), version)
+            results.update(computed)
+        return batch_response(ids, results, sort_by)
+
+    async def _store_async(self, db: AsyncSession, results: List[dict], version: Optional[int]) -> None:
+        """Best-effort write-back of live-computed payloads."""
+        if not results:
+            return
+        try:
+            await db.run_sync(repo.upsert_materialized_scores, results, version)
+            await db.commit()
+        except SQLAlchemyError as e:
+            await db.rollback()
+            logger.warning("Could not store %s live-computed scores: %s", len(results), e)
+
+    def _compute_many(self, db: Session, occupation_ids: List[int]) -> Dict[int, dict]:
+        """Live-score the given occupations with one query per input kind (or one query, see SCORING_DATA_PATH)."""
+        if SCORING_DATA_PATH == "single":
+            labels, skills_by_occ, automation_by_occ, skill_bucket_map = repo.get_scoring_inputs(db, occupation_ids)
+            found = [i for i in occupation_ids if i in labels]
+            buckets = self._load_bucket_keywords(db)
+            return self._score_inputs(db, found, labels, skills_by_occ, automation_by_occ, skill_bucket_map, buckets)
+
+        labels = repo.get_occupation_labels(db, occupation_ids)
+        found = [i for i in occupation_ids if i in labels]
+        skills_by_occ = repo.get_skills_for_occupations(db, found)
+        automation_by_occ = repo.get_skill_automation_scores_for_occupations(db, found)
+        buckets = self._load_bucket_keywords(db)
+        skill_bucket_map = repo.get_skill_bucket_matches(db, unscored_skill_ids(skills_by_occ, automation_by_occ))
+        return self._score_inputs(db, found, labels, skills_by_occ, automation_by_occ, skill_bucket_map, buckets)
+
+    async def _compute_many_async(self, db: AsyncSession, occupation_ids: List[int]) -> Dict[int, dict]:
+        """
+        Async counterpart of _compute_many. The sync repository functions run through
+        AsyncSession.run_sync, so their statements are awaited on asyncpg without a worker thread.
+        """
+        if SCORING_DATA_PATH == "single":
+            labels, skills_by_occ, automation_by_occ, skill_bucket_map = await db.run_sync(
+                repo.get_scoring_inputs, occupation_ids
+            )
+            found = [i for i in occupation_ids if i in labels]
+            buckets = await self._load_bucket_keywords_async(db)
+        else:
+            labels = await db.run_sync(repo.get_occupation_labels, occupation_ids)
+            found = [i for i in occupation_ids if i in labels]
+            skills_by_occ = await db.run_sync(repo.get_skills_for_occupations, found)
+            automation_by_occ = await db.run_sync(repo.get_skill_automation_scores_for_occupations, found)
+            buckets = await self._load_bucket_keywords_async(db)
+            skill_bucket_map = await db.run_sync(
+                repo.get_skill_bucket_matches, unscored_skill_ids(skills_by_occ, automation_by_occ)
+            )
+        # Pass the matcher in so scoring never falls back to the blocking cache loader
+        matcher = self._matcher or BucketKeywordMatcher(buckets)
+        return self._score_inputs(None, found, labels, skills_by_occ, automation_by_occ,
+                                  skill_bucket_map, buckets, matcher)
+
+    def _score_inputs(self, db: Optional[Session], found: List[int], labels: Dict[int, Optional[str]],
+                      skills_by_occ: Dict[int, List[dict]], automation_by_occ: Dict[int, Dict[int, float]],
+                      skill_bucket_map: Dict[int, List[int]], buckets: Dict[int, Dict[str, Any]],
+                      matcher: Optional[BucketKeywordMatcher] = None) -> Dict[int, dict]:
+        """Score occupations from already-fetched inputs (no queries when a matcher is given)."""
+        computed: Dict[int, dict] = {}
+        scored: List[tuple] = []
+        for occ_id in found:
+            label = labels[occ_id] or f"occupation:{occ_id}"
+            skills = skills_by_occ.get(occ_id)
+            if not skills:
+                computed[occ_id] = neutral_result(occ_id, label)
+                continue
+            items, matched_counts = self._skill_items(
+                db, skills, automation_by_occ.get(occ_id, {}), skill_bucket_map, buckets, matcher
+            )
+            scored.append((occ_id, label, items, matched_counts))
+
+        # One kernel call for every occupation in the batch
+        risk_scores = apply_kernel([items for _, _, items, _ in scored])
+        for (occ_id, label, items, matched_counts), risk_score in zip(scored, risk_scores):
+            computed[occ_id] = build_result(occ_id, label, items, matched_counts, risk_score, DEFAULT_SORT)
+        return computed
+
+    def materialize(self, db: Session, occupation_ids: Optional[List[int]] = None,
+                    batch_size: int = MATERIALIZE_BATCH_SIZE) -> Dict[str, int]:
+        """
+        Batch job: compute and store scores for the given occupations (all when None).
+        Each batch is scored with set-based queries (see score_many). Commits once per batch so a long rebuild does not hold one huge transaction.
+        """
+        ids = list(occupation_ids) if occupation_ids is not None else repo.get_all_occupation_ids(db)
+        logger.info("Materializing risk scores for %s occupations", len(ids))
+
+        written = 0
+        skipped = 0
+        for start in range(0, len(ids), batch_size):
+            batch_ids = ids[start:start + batch_size]
+            version = self._score_version(db)
+            computed = self._compute_many(db, batch_ids)
+            if len(computed) < len(batch_ids):
+                missing = [i for i in batch_ids if i not in computed]
+                logger.warning("Skipping %s unknown occupation ids: %s", len(missing), missing[:10])
+                skipped += len(missing)
+            written += repo.upsert_materialized_scores(db, list(computed.values()), version)
+            db.commit()
+            logger.info("Materialized %s/%s occupation scores", written, len(ids))
+
+        return {"requested": len(ids), "written": written, "skipped": skipped}
+
+    def refresh_materialized(self, db: Session, occupation_ids: Optional[List[int]] = None,
+                             skill_ids: Optional[List[int]] = None,
+                             bucket_ids: Optional[List[int]] = None) -> Dict[str, int]:
+        """
+        Incremental refresh: recompute only the occupations affected by changed
+        relations (occupation_ids), automation scores (skill_ids) or buckets (bucket_ids).
+        Not needed for correctness after bucket or automation score edits (the version triggers
+        already make those payloads read as misses); it recomputes them ahead of the next read.
+        """
+        affected = set(occupation_ids or [])
+        if skill_ids:
+            affected.update(repo.get_occupation_ids_for_skills(db, skill_ids))
+        if bucket_ids:
+            # Bucket weights/keywords changed, so the cached metadata is stale too
+            self.invalidate_bucket_cache(broadcast=True)
+            affected.update(repo.get_occupation_ids_for_buckets(db, bucket_ids))
+        logger.info("Refreshing materialized scores for %s affected occupations", len(affected))
+        return self.materialize(db, sorted(affected))
+
+    def rebuild_materialized(self, db: Session) -> Dict[str, int]:
+        """Recompute the whole occupation_risk_scores store (e.g. after an ESCO re-import)."""
+        self.invalidate_bucket_cache(broadcast=True)
+        return self.materialize(db)
+
+    def score_by_occupation_id(self, db: Session, occupation_id: int, sort_by: str = DEFAULT_SORT) -> dict:
         """Compute risk score for an occupation using normalized contributions with safe skill adjustment."""
-        logger.info(f"Scoring occupation id={occupation_id}")
+        logger.info("Scoring occupation id=%s", occupation_id)
 
         # Fetch occupation label
         occ_row = db.execute(
@@ -105,35 +516,31 @@ class SimpleDbDrivenScorer:
         if not occ_row:
             raise ValueError(f"Occupation id={occupation_id} not found")
         occupation_label = occ_row["label"] or f"occupation:{occupation_id}"
-        logger.debug(f"Occupation label: {occupation_label}")
+        logger.debug("Occupation label: %s", occupation_label)
 
         # Fetch skills
         skills = repo.get_skills_for_occupation(db, occupation_id)
         if not skills:
-            logger.info(f"No skills for occupation id={occupation_id}, returning neutral score")
-            return {
-                "occupation_id": occupation_id,
-                "occupation_label": occupation_label,
-                "risk_score": 50.0,
-                "level": "Yellow",
-                "explanation": "No skills available; returned neutral score",
-                "skills_analyzed": 0,
-                "per_skill": [],
-                "matched_buckets": {},
-            }
+            logger.info("No skills for occupation id=%s, returning neutral score", occupation_id)
+            return neutral_result(occupation_id, occupation_label)
 
         skill_ids = [s["skill_id"] for s in skills]
-        automation_map = repo.get_skill_automation_scores(db, skill_ids)
+        automation_map = repo.get_skill_automation_scores(db, skill_ids, occupation_id)
         buckets = self._load_bucket_keywords(db)
-        skill_bucket_map = repo.get_skill_bucket_matches(db, occupation_id)
+        # Keyword buckets only matter for skills without an automation score
+        skill_bucket_map = repo.get_skill_bucket_matches(db, [sid for sid in skill_ids if sid not in automation_map])
+
+        items, matched_counts = self._skill_items(db, skills, automation_map, skill_bucket_map, buckets)
+        risk_score = apply_kernel([items])[0]
+        return build_result(occupation_id, occupation_label, items, matched_counts, risk_score, sort_by)
 
+    def _skill_items(self, db: Optional[Session], skills: List[dict], automation_map: Dict[int, float],
+                     skill_bucket_map: Dict[int, List[int]], buckets: Dict[int, Dict[str, Any]],
+                     matcher: Optional[BucketKeywordMatcher] = None) -> Tuple[List[dict], Dict[int, int]]:
+        """Step 1: resolve each skill's weight and raw contribution from already-fetched inputs."""
         per_skill_items: List[dict] = []
         matched_buckets_counts: Dict[int, int] = {}
 
-        raw_contribs: List[float] = []
-        safe_contribs: List[float] = []
-
-        # Step 1: Compute raw contributions & safe factors
         for s in skills:
             sid = int(s["skill_id"])
             label = (s.get("skill_label") or "").strip() or f"skill:{sid}"
@@ -150,7 +557,13 @@ class SimpleDbDrivenScorer:
                 mapping_source = "precomputed_score"
                 weight_source = "automation_score"
             else:
-                matched_buckets = skill_bucket_map.get(sid, [])
+                matched_buckets = skill_bucket_map.get(sid)
+                if matched_buckets is None:
+                    # Skill not indexed in skill_bucket_matches yet: match in-process
+                    if matcher is None:
+                        matcher = self._get_matcher(db)
+                    matched_buckets = matcher.match_skill(s.get("skill_label"), definition)
+                matched_buckets = [bid for bid in matched_buckets if bid in buckets]
                 if matched_buckets:
                     chosen_bucket_id = matched_buckets[0]
                     b_meta = buckets[chosen_bucket_id]
@@ -161,8 +574,6 @@ class SimpleDbDrivenScorer:
                         matched_buckets_counts[bid] = matched_buckets_counts.get(bid, 0) + 1
 
             contrib = chosen_weight * importance
-            raw_contribs.append(contrib)
-
             per_skill_items.append({
                 "skill_id": sid,
                 "skill_label": label,
@@ -176,52 +587,96 @@ class SimpleDbDrivenScorer:
                 "weighted_contrib": contrib,  # optional for table output
             })
 
-        # Step 2: normalize contributions & assign vulnerability labels
-        min_contrib = min(raw_contribs)
-        max_contrib = max(raw_contribs)
-        range_contrib = max_contrib - min_contrib + EPS
-
-        for item in per_skill_items:
-            normalized = (item["raw_contrib"] - min_contrib) / range_contrib
-            item["normalized_contrib"] = normalized
-            item["vulnerability"] = vulnerability_label_normalized(normalized)
-            item["vuln_factor"] = vuln_factor_from_label(item["vulnerability"])
-            # safe factor contributes to risk reduction
-            safe_contribs.append((1.0 - item["vuln_factor"]) * item["raw_contrib"])
-
-        # Step 3: compute overall risk
-        risk_score = compute_risk_from_contribs(raw_contribs, safe_contribs)
-        level = (
-            "Green" if risk_score < 30
-            else "Yellow" if risk_score <= 70
-            else "Red"
-        )
+        return per_skill_items, matched_buckets_counts
 
-        # Step 4: sort per skill
-        if sort_by in {"raw_contrib", "normalized_contrib", "weight", "importance"}:
-            per_skill_items.sort(key=lambda x: x[sort_by], reverse=True)
 
-        # Step 5: explanation text
-        top_vulnerable = [p["skill_label"] for p in per_skill_items if p["normalized_contrib"] > 0.6][:5]
-        top_safe = [p["skill_label"] for p in per_skill_items if p["normalized_contrib"] <= 0.3][:5]
+def unscored_skill_ids(skills_by_occ: Dict[int, List[dict]],
+                       automation_by_occ: Dict[int, Dict[int, float]]) -> List[int]:
+    """Skills (across the batch) without an automation score, i.e. the ones that need bucket matches."""
+    return sorted({
+        s["skill_id"]
+        for occ_id, skills in skills_by_occ.items()
+        for s in skills
+        if s["skill_id"] not in automation_by_occ.get(occ_id, {})
+    })
 
-        explanation_parts = []
-        if top_vulnerable:
-            explanation_parts.append(f"Top vulnerable skills: {', '.join(top_vulnerable)}")
-        if top_safe:
-            explanation_parts.append(f"Safe skills: {', '.join(top_safe)}")
-        explanation = " — ".join(explanation_parts) if explanation_parts else "Mixed profile"
 
-        return {
-            "occupation_id": occupation_id,
-            "occupation_label": occupation_label,
-            "risk_score": round(risk_score, 2),
-            "level": level,
-            "explanation": explanation,
-            "skills_analyzed": len(per_skill_items),
-            "matched_buckets": matched_buckets_counts,
-            "per_skill": per_skill_items,
-        }
+def sort_per_skill(result: dict, sort_by: str) -> dict:
+    """Stored payloads are sorted by DEFAULT_SORT; re-sort per_skill in place for other fields."""
+    if sort_by != DEFAULT_SORT and sort_by in SORTABLE_FIELDS:
+        result["per_skill"].sort(key=lambda x: x[sort_by], reverse=True)
+    return result
+
+
+def batch_response(ids: List[int], results: Dict[int, dict], sort_by: str) -> Dict[str, Any]:
+    """Batch payload in request order, with the ids that matched no occupation."""
+    ordered = [sort_per_skill(results[i], sort_by) for i in ids if i in results]
+    return {
+        "count": len(ordered),
+        "results": ordered,
+        "not_found": [i for i in ids if i not in results],
+    }
+
+
+def apply_kernel(items_per_occupation: List[List[dict]]) -> List[float]:
+    """
+    Steps 2-3 for a batch of occupations in one vectorized pass (app/scoring/kernel.py):
+    fills normalized_contrib / vulnerability / vuln_factor on each item and returns the
+    unrounded risk score per occupation.
+    """
+    if not items_per_occupation:
+        return []
+    flat = [item for items in items_per_occupation for item in items]
+    result = score_segments(
+        [item["weight"] for item in flat],
+        [item["importance"] for item in flat],
+        [len(items) for items in items_per_occupation],
+        ALPHA,
+        EPS,
+    )
+    for item, normalized, vuln_bin, vuln_factor in zip(
+        flat, result.normalized.tolist(), result.vulnerability.tolist(), result.vuln_factor.tolist()
+    ):
+        item["normalized_contrib"] = normalized
+        item["vulnerability"] = VULNERABILITY_LABELS[vuln_bin]
+        item["vuln_factor"] = vuln_factor
+    return result.risk_score.tolist()
+
+
+def build_result(occupation_id: int, occupation_label: str, per_skill_items: List[dict],
+                 matched_buckets_counts: Dict[int, int], risk_score: float, sort_by: str) -> dict:
+    """Steps 4-5: level, ordering and explanation for one scored occupation."""
+    level = (
+        "Green" if risk_score < 30
+        else "Yellow" if risk_score <= 70
+        else "Red"
+    )
+
+    # Step 4: sort per skill
+    if sort_by in SORTABLE_FIELDS:
+        per_skill_items.sort(key=lambda x: x[sort_by], reverse=True)
+
+    # Step 5: explanation text
+    top_vulnerable = [p["skill_label"] for p in per_skill_items if p["normalized_contrib"] > 0.6][:5]
+    top_safe = [p["skill_label"] for p in per_skill_items if p["normalized_contrib"] <= 0.3][:5]
+
+    explanation_parts = []
+    if top_vulnerable:
+        explanation_parts.append(f"Top vulnerable skills: {', '.join(top_vulnerable)}")
+    if top_safe:
+        explanation_parts.append(f"Safe skills: {', '.join(top_safe)}")
+    explanation = " — ".join(explanation_parts) if explanation_parts else "Mixed profile"
+
+    return {
+        "occupation_id": occupation_id,
+        "occupation_label": occupation_label,
+        "risk_score": round(risk_score, 2),
+        "level": level,
+        "explanation": explanation,
+        "skills_analyzed": len(per_skill_items),
+        "matched_buckets": matched_buckets_counts,
+        "per_skill": per_skill_items,
+    }
 
 
 # -------------------------
@@ -229,27 +684,20 @@ class SimpleDbDrivenScorer:
 # -------------------------
 def search_occupations(db: Session, query: str, limit: int = 20) -> List[Dict[str, str]]:
     """
-    Optimized search for autocomplete: exact start > contains > altLabels
+    Ranked search for autocomplete over preferred, alt and hidden labels (pg_trgm + tsvector
+    indexes, see repo.SEARCH_DDL): label prefix > word prefix > trigram similarity.
     """
-    prefix_query = f"{query}%"
-    contains_query = f"%{query}%"
-
-    sql = text("""
-        SELECT id, "preferredLabel" AS label
-        FROM occupations
-        WHERE "preferredLabel" ILIKE :prefix_query
-           OR "preferredLabel" ILIKE :contains_query
-           OR "altLabels" ILIKE :contains_query
-        ORDER BY
-            CASE 
-                WHEN "preferredLabel" ILIKE :prefix_query THEN 1
-                WHEN "preferredLabel" ILIKE :contains_query THEN 2
-                ELSE 3
-            END,
-            "preferredLabel"
-        LIMIT :limit
-    """)
-
-    rows = db.execute(sql, {"prefix_query": prefix_query, "contains_query": contains_query, "limit": limit}).mappings().all()
-
+    normalized = " ".join(query.lower().split())
+    words = SEARCH_WORD_RE.findall(normalized)
+    if not words:
+        return []
+    tsquery = " & ".join(f"{w}:*" for w in words)
+    label_tsquery = " & ".join(f"{w}:*A" for w in words)
+
+    rows = repo.search_occupations_ranked(db, normalized, tsquery, label_tsquery, limit)
     return [{"id": str(r["id"]), "label": r["label"]} for r in rows]
+
+
+async def search_occupations_async(db: AsyncSession, query: str, limit: int = 20) -> List[Dict[str, str]]:
+    """Async counterpart of search_occupations (same ranked query, awaited on asyncpg)."""
+    return await db.run_sync(search_occupations, query, limit)
@@ -6,11 +6,14 @@ from sqlalchemy.exc import IntegrityError
 from fastapi import HTTPException, status
 from app.models.user import User
 from app.models.email_verification import EmailVerification
-from app.utils.security import hash_password, verify_password, create_access_token, refresh_access_token as security_refresh_token
-from app.utils.email import send_email, validate_and_normalize_email, generate_verification_email_template
+from app.utils.security import create_access_token, refresh_access_token as security_refresh_token
+from app.core.password_hasher import password_hasher
+from app.utils.email import validate_and_normalize_email, generate_verification_email_template
+from app.services.mail_service import queue_email, queue_email_async
 from app.core.logger import logger
 from sqlalchemy.exc import SQLAlchemyError
 from app.core.redis import r
+from app.core.revocation import revocations
 
 CODE_TTL_MINUTES = 15
 MAX_ATTEMPTS = 5
@@ -30,7 +33,7 @@ def signup(db: Session, email: str, password: str, name: str):
     user = User(
         name=name,
         email=email,  # already normalized in validate_email_address
-        password_hash=hash_password(password),
+        password_hash=password_hasher.hash(password),
         is_verified=False
     )
 
@@ -65,9 +68,9 @@ def signup(db: Session, email: str, password: str, name: str):
     logger.info(f"Verification code generated for user: {email}")
 
     subject, html, text_body = generate_verification_email_template(user.email, code)
-    send_email(user.email, subject, html, text_body=text_body)
+    queue_email(user.email, subject, html, text_body=text_body)
 
-    logger.info(f"Verification email sent to: {email}")
+    logger.info(f"Verification email queued for: {email}")
 
     return user
 
@@ -123,7 +126,7 @@ def login(db: Session, email: str, password: str) -> str:
     validate_and_normalize_email(email)
 
     user = get_user_by_email(db, email)
-    if not user or not verify_password(password, user.password_hash):
+    if not user or not password_hasher.verify(password, user.password_hash):
         logger.warning(f"Invalid credentials for email: {email}")
         raise HTTPException(status_code=401, detail="Invalid credentials.")
     if not user.is_verified:
@@ -172,17 +175,15 @@ def resend_verification_email(db: Session, email: str):
 
     # Send email
     subject, html, text_body = generate_verification_email_template(user.email, code)
-    send_email(user.email, subject, html, text_body=text_body)
-    logger.info(f"Verification email sent to: {email}")
+    queue_email(user.email, subject, html, text_body=text_body)
+    logger.info(f"Verification email queued for: {email}")
 
-    return {"message": "Verification email resent successfully."}
+    return {"message": "Verification email queued for delivery."}
 
 async def logout(current_user: dict):
     """
     Business logic to revoke the current JWT.
     """
-    token_key = f"revoked:{current_user['sub']}:{current_user['iat']}"
-    
     # Calculate remaining lifetime
     exp = datetime.fromtimestamp(current_user["exp"], tz=timezone.utc)
     now = datetime.now(timezone.utc)
@@ -191,8 +192,8 @@ async def logout(current_user: dict):
     if ttl <= 0:
         raise HTTPException(status_code=400, detail="Token already expired")
     
-    # Store in Redis with TTL
-    await r.set(token_key, "revoked", ex=int(ttl))
+    # Store in Redis with TTL and tell every worker's revocation filter
+    await revocations.revoke(current_user["sub"], current_user["iat"], int(ttl))
     
     return {"message": "Successfully logged out"}
 
@@ -245,9 +246,9 @@ async def send_reset_password_email(user):
         f"Expires in {CODE_TTL_MINUTES} minutes."
     )
         
-        send_email(user.email, subject, html_body, text_body=text_body)
+        await queue_email_async(user.email, subject, html_body, text_body=text_body)
 
-        return {"message": "Password reset code sent."}
+        return {"message": "Password reset code queued for delivery."}
 
 async def reset_password(db:Session, email: str, code: str, new_password: str):
     """
@@ -263,7 +264,7 @@ async def reset_password(db:Session, email: str, code: str, new_password: str):
 
     # Update password in DB
     user = get_user_by_email(db, email)
-    user.password_hash = hash_password(new_password)
+    user.password_hash = await password_hasher.hash_async(new_password)
     db.commit()
     await r.delete(key)  # Invalidate reset code
     return {"message": "Password updated successfully."}
@@ -1,26 +1,8 @@
-import os
-import pandas as pd
 from sqlalchemy.orm import Session
 
-from app.utils.data_cleaner import clean_occupation_csv
-from app.schemas.occupation import OccupationSchema
-from app.services.occupation_service import insert_occupations
-
-from app.utils.skill_cleaner import clean_skill_csv
-from app.schemas.skill import SkillSchema
-from app.services.skill_service import insert_skills
-
-from app.utils.data_cleaner import clean_skillgroup_csv
-from app.schemas.skillgroup import SkillGroupSchema
-from app.services.skillgroup_service import insert_skillgroups
-
-from app.utils.skill_hierarchy_cleaner import clean_skill_hierarchy_csv
-from app.schemas.skill_hierarchy import SkillHierarchySchema
-from app.services.skill_hierarchy_service import insert_skill_hierarchies
-
-from app.utils.occupation_skill_relation_cleaner import clean_occupation_skill_relation_csv
-from app.schemas.occupation_skill_relation import OccupationSkillRelationCreate
-from app.services.occupation_skill_relation_service import insert_occupation_skill_relations
+from app.services import copy_loader
+from app.services.occupation_skill_relation_service import import_occupation_skill_relations_csv
+from app.services.skill_bucket_match_service import build_skill_bucket_matches
 
 
 class BulkImportService:
@@ -37,47 +19,24 @@ class BulkImportService:
     def import_all(db: Session) -> dict:
         results = {}
 
-        # ---------------- Occupations ----------------
-        df = pd.read_csv(BulkImportService.FILES["occupations"], dtype=str, keep_default_na=False)
-        cleaned_df = clean_occupation_csv(df)
-        occupations = [OccupationSchema(**row) for row in cleaned_df.to_dict(orient="records")]
-        inserted_occ = insert_occupations(db, occupations)
-        results["occupations"] = inserted_occ
-
-        # ---------------- Skills ----------------
-        df = pd.read_csv(BulkImportService.FILES["skills"], dtype=str, keep_default_na=False)
-        cleaned_df = clean_skill_csv(df)
-        skills = [SkillSchema(**row) for row in cleaned_df.to_dict(orient="records")]
-        inserted_skills = insert_skills(db, skills)
-        results["skills"] = inserted_skills
-
-        # ---------------- Skill Groups ----------------
-        df = pd.read_csv(BulkImportService.FILES["skill_groups"], dtype=str, keep_default_na=False)
-        cleaned_df = clean_skillgroup_csv(df)
-        skill_groups = [SkillGroupSchema(**row) for row in cleaned_df.to_dict(orient="records")]
-        inserted_groups = insert_skillgroups(db, skill_groups)
-        results["skill_groups"] = inserted_groups
-
-        # ---------------- Skill Hierarchy ----------------
-        df = pd.read_csv(BulkImportService.FILES["skill_hierarchy"], dtype=str, keep_default_na=False)
-        cleaned_df = clean_skill_hierarchy_csv(df)
-        hierarchies = [SkillHierarchySchema(**row) for row in cleaned_df.to_dict(orient="records")]
-        inserted_hierarchy = insert_skill_hierarchies(db, hierarchies)
-        results["skill_hierarchy"] = inserted_hierarchy
+        # ---------------- Occupations / Skills / Skill Groups / Skill Hierarchy ----------------
+        # Streamed straight into Postgres with COPY; see app/services/copy_loader.py
+        for entity in ("occupations", "skills", "skill_groups", "skill_hierarchy"):
+            results[entity] = copy_loader.load_csv(db, entity, BulkImportService.FILES[entity])
+            db.commit()
 
         # ---------------- Occupation-Skill Relations ----------------
-        df = pd.read_csv(BulkImportService.FILES["occupation_skill_relations"], dtype=str, keep_default_na=False)
-        cleaned_df = clean_occupation_skill_relation_csv(df)
-        relations = [
-            OccupationSkillRelationCreate(
-                occupationUri=row["occupationUri"],
-                relationType=row.get("relationType"),
-                skillType=row.get("skillType"),
-                skillUri=row["skillUri"]
-            )
-            for row in cleaned_df.to_dict(orient="records")
-        ]
-        inserted_relations = insert_occupation_skill_relations(db, relations)
-        results["occupation_skill_relations"] = inserted_relations
+        relations = import_occupation_skill_relations_csv(db, BulkImportService.FILES["occupation_skill_relations"])
+        results["occupation_skill_relations"] = relations.inserted
+        results["occupation_skill_relations_unresolved"] = {
+            "occupation_uris": relations.unresolved_occupations,
+            "skill_uris": relations.unresolved_skills,
+        }
+
+        # ---------------- Skill -> Bucket keyword matches ----------------
+        match_report = build_skill_bucket_matches(db)
+        match_report.pop("changed_skill_ids")
+        match_report.pop("changed_bucket_ids")
+        results["skill_bucket_matches"] = match_report
 
         return results
@@ -1,9 +1,41 @@
+import asyncio
 import json
+import os
+import uuid
 from datetime import timedelta
-from app.core.redis import r
+from typing import Any, Awaitable, Callable, Dict, Iterable
+
+from redis.exceptions import RedisError
+
+from app.core import pubsub
+from app.core.metrics import CACHE_LOOKUPS, REDIS_COMMAND_SECONDS
+from app.core.logger import get_logger
+from app.core.redis import r, sync_r
+
+logger = get_logger(__name__)
 
 CACHE_EXPIRY = 60 * 60 * 24  # 24 hours in seconds
 
+# Read-through cache for data-derived responses (scoring, search)
+RESPONSE_CACHE_TTL = int(os.getenv("RESPONSE_CACHE_TTL", 60 * 60))
+DATASET_VERSION_KEY = "cache:dataset_version"
+DATASET_VERSION_CHANNEL = "cache:dataset-version"
+LOCK_TTL_MS = 10_000          # cross-process single-flight lock lifetime
+LOCK_WAIT_SECONDS = 5.0       # how long a non-owner waits for the owner's result
+LOCK_POLL_SECONDS = 0.05
+
+# Delete the lock only if we still own it
+_RELEASE_LOCK = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+# In-process single-flight: cache key -> future of the value being computed
+_inflight: Dict[str, asyncio.Future] = {}
+
+
 class CacheService:
     @staticmethod
     def _build_key(video_id: str, language: str) -> str:
@@ -22,3 +54,112 @@ class CacheService:
         """Save transcript in Redis with 24h TTL."""
         key = CacheService._build_key(video_id, language)
         await r.set(key, json.dumps(transcript_data), ex=CACHE_EXPIRY)
+
+    # -------------------------------
+    # Dataset-versioned read-through cache
+    # -------------------------------
+
+    @staticmethod
+    async def dataset_version() -> int:
+        """Current dataset version; every response cache key embeds it."""
+        return int(await r.get(DATASET_VERSION_KEY) or 0)
+
+    @staticmethod
+    def bump_dataset_version_sync() -> int | None:
+        """
+        Invalidate every cached response at once (e.g. after a schema swap) by moving to a new
+        dataset version; old entries simply expire. Best-effort: returns None if Redis is down.
+        """
+        try:
+            version = sync_r.incr(DATASET_VERSION_KEY)
+            logger.info("Response cache dataset version bumped to %s", version)
+        except RedisError as e:
+            logger.warning("Could not bump response cache dataset version: %s", e)
+            return None
+        # Lets in-process derived data (e.g. the autocomplete index) refresh without polling
+        pubsub.publish(DATASET_VERSION_CHANNEL, {"version": version})
+        return version
+
+    @staticmethod
+    def _response_key(version: int, namespace: str, parts: Iterable[Any]) -> str:
+        return f"cache:v{version}:{namespace}:" + ":".join(str(p) for p in parts)
+
+    @staticmethod
+    async def get_or_compute(namespace: str, parts: Iterable[Any], compute: Callable[[], Awaitable[Any]],
+                             ttl: int = RESPONSE_CACHE_TTL) -> Any:
+        """
+        Return the cached JSON value for (dataset version, namespace, parts) or compute, store and
+        return it. Cold keys are computed once: concurrent callers in this process share one
+        computation, and across processes a Redis SET NX lock makes the others wait for the owner's
+        result. Redis errors degrade to computing directly; exceptions from compute are not cached.
+        """
+        cache = f"response:{namespace}"
+        try:
+            with REDIS_COMMAND_SECONDS.time(operation="response_cache_get"):
+                version = await CacheService.dataset_version()
+                key = CacheService._response_key(version, namespace, parts)
+                cached = await r.get(key)
+        except RedisError as e:
+            logger.warning("Response cache unavailable (%s); computing %s directly", e, namespace)
+            CACHE_LOOKUPS.inc(cache=cache, result="error")
+            return await compute()
+        if cached is not None:
+            CACHE_LOOKUPS.inc(cache=cache, result="hit")
+            return json.loads(cached)
+
+        inflight = _inflight.get(key)
+        if inflight is not None:
+            CACHE_LOOKUPS.inc(cache=cache, result="coalesced")
+            return await asyncio.shield(inflight)
+        CACHE_LOOKUPS.inc(cache=cache, result="miss")
+
+        future = asyncio.get_running_loop().create_future()
+        _inflight[key] = future
+        try:
+            value = await CacheService._compute_once(key, compute, ttl)
+            future.set_result(value)
+            return value
+        except BaseException as e:
+            future.set_exception(e)
+            future.exception()  # retrieved: avoid "never retrieved" warnings when nobody waited
+            raise
+        finally:
+            _inflight.pop(key, None)
+
+    @staticmethod
+    async def _compute_once(key: str, compute: Callable[[], Awaitable[Any]], ttl: int) -> Any:
+        """Cross-process single-flight around compute() for one cache key."""
+        lock_key = f"lock:{key}"
+        token = uuid.uuid4().hex
+        try:
+            owner = await r.set(lock_key, token, nx=True, px=LOCK_TTL_MS)
+        except RedisError as e:
+            logger.warning("Response cache lock unavailable (%s); computing %s without it", e, key)
+            owner = True
+
+        if not owner:
+            # Another process is computing this key: wait for its result, then fall back
+            deadline = asyncio.get_running_loop().time() + LOCK_WAIT_SECONDS
+            while asyncio.get_running_loop().time() < deadline:
+                await asyncio.sleep(LOCK_POLL_SECONDS)
+                try:
+                    cached = await r.get(key)
+                except RedisError:
+                    break
+                if cached is not None:
+                    return json.loads(cached)
+            logger.debug("Timed out waiting for %s; computing it here", key)
+
+        try:
+            value = await compute()
+            try:
+                await r.set(key, json.dumps(value, default=str), ex=ttl)
+            except RedisError as e:
+                logger.warning("Could not store %s in response cache: %s", key, e)
+            return value
+        finally:
+            if owner:
+                try:
+                    await r.eval(_RELEASE_LOCK, 1, lock_key, token)
+                except RedisError:
+                    pass
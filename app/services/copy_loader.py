@@ -0,0 +1,270 @@
+# app/services/copy_loader.py
+"""
+Streaming CSV -> Postgres loader built on COPY ... FROM STDIN.
+
+Files are read in bounded chunks (IMPORT_CHUNK_ROWS rows, fewer when a chunk would not fit
+IMPORT_MEMORY_LIMIT_MB while being cleaned) and each chunk is cleaned and validated with the
+EntitySpec rules of app/utils/cleaning.py, then rendered as COPY CSV on demand by a file-like
+adapter that psycopg2's copy_expert pulls from. No Pydantic models or ORM objects are built
+and at most one chunk is held at a time; the only state that grows with the file is the set
+of dedup key hashes already seen.
+
+Every chunk emits an ImportProgress event: logged, counted in import_rows_total and passed
+to the caller's on_progress callback, if any.
+
+load_csv() covers the entity tables. load_relations() COPYs the relations file into a temp
+staging table and resolves the occupation / skill URIs to ids with a single
+INSERT ... SELECT ... JOIN ... ON CONFLICT DO NOTHING, reporting rows whose URIs matched
+nothing. All of them run inside the session's transaction and leave the commit to the caller.
+"""
+import re
+import time
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Sequence
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.core.config import IMPORT_CHUNK_ROWS, IMPORT_MEMORY_LIMIT_MB
+from app.core.logger import get_logger
+from app.core.metrics import Counter
+from app.utils.cleaning import ENTITIES, CleanChunk, iter_clean_chunks
+
+logger = get_logger(__name__)
+
+IMPORT_ROWS = Counter(
+    "import_rows_total", "CSV import rows by entity and outcome (written, skipped, invalid)", ["entity", "outcome"]
+)
+
+COPY_CHUNK_BYTES = 256 * 1024
+_IDENTIFIER = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+# Target table per entity of app/utils/cleaning.ENTITIES
+TABLES: Dict[str, str] = {
+    "occupations": "occupations",
+    "skills": "skills",
+    "skill_groups": "skill_groups",
+    "skill_hierarchy": "skill_hierarchies",
+}
+RELATIONS_TABLE = "occupation_skill_relations"
+RELATION_PAIR_INDEX = "uq_occupation_skill_relations_pair"
+RELATION_STAGING = "relation_staging"
+RELATION_SOURCE_COLUMNS = ENTITIES["occupation_skill_relations"].columns
+
+
+def quote_ident(name: str) -> str:
+    """Double-quote a table/column/schema name; refuses anything but a plain identifier."""
+    if not _IDENTIFIER.match(name):
+        raise ValueError(f"Invalid SQL identifier: {name!r}")
+    return f'"{name}"'
+
+
+def qualified_table(table: str, schema: Optional[str] = None) -> str:
+    return f"{quote_ident(schema)}.{quote_ident(table)}" if schema else quote_ident(table)
+
+
+def _csv_field(value) -> str:
+    # Unquoted empty is NULL in COPY CSV; every real value is quoted so "" stays an empty string
+    if value is None:
+        return ""
+    return '"' + str(value).replace('"', '""') + '"'
+
+
+class CopyStream:
+    """Read-only file object rendering an iterable of row tuples as COPY CSV on demand."""
+
+    def __init__(self, rows: Iterable[Sequence]):
+        self._rows = iter(rows)
+        self.rows = 0
+
+    def read(self, size: int = -1) -> str:
+        lines = []
+        length = 0
+        for row in self._rows:
+            line = ",".join([_csv_field(v) for v in row]) + "\n"
+            lines.append(line)
+            length += len(line)
+            self.rows += 1
+            if 0 < size <= length:
+                break
+        return "".join(lines)
+
+
+def copy_rows(
+    db: Session, table: str, columns: Sequence[str], rows: Iterable[Sequence], schema: Optional[str] = None
+) -> int:
+    """COPY rows into table within the session's transaction; returns the number of rows sent."""
+    statement = "COPY {} ({}) FROM STDIN WITH (FORMAT csv)".format(
+        qualified_table(table, schema), ", ".join(quote_ident(c) for c in columns)
+    )
+    stream = CopyStream(rows)
+    raw = db.connection().connection.dbapi_connection
+    with raw.cursor() as cursor:
+        cursor.copy_expert(statement, stream, size=COPY_CHUNK_BYTES)
+    return stream.rows
+
+
+class ImportProgress(NamedTuple):
+    entity: str
+    chunk: int
+    rows_read: int          # totals so far
+    rows_written: int       # staged, for relations (resolved once the file is in)
+    rows_skipped: int       # blank, missing a required value, duplicate
+    rows_invalid: int
+    elapsed: float
+
+
+ProgressCallback = Callable[[ImportProgress], None]
+
+
+class _Tracker:
+    def __init__(self, entity: str, on_progress: Optional[ProgressCallback], outcome: str = "written"):
+        self.entity = entity
+        self.outcome = outcome
+        self.on_progress = on_progress
+        self.started = time.perf_counter()
+        self.progress = ImportProgress(entity, 0, 0, 0, 0, 0, 0.0)
+
+    def chunk(self, chunk: CleanChunk, written: int) -> None:
+        skipped = chunk.read - written - chunk.invalid
+        p = self.progress
+        self.progress = p = ImportProgress(
+            self.entity, p.chunk + 1, p.rows_read + chunk.read, p.rows_written + written,
+            p.rows_skipped + skipped, p.rows_invalid + chunk.invalid, time.perf_counter() - self.started,
+        )
+        IMPORT_ROWS.inc(written, entity=self.entity, outcome=self.outcome)
+        IMPORT_ROWS.inc(skipped, entity=self.entity, outcome="skipped")
+        IMPORT_ROWS.inc(chunk.invalid, entity=self.entity, outcome="invalid")
+        logger.info(
+            "Import %s chunk %s: %s rows read, %s written, %s skipped, %s invalid (%.1fs)",
+            self.entity, p.chunk, p.rows_read, p.rows_written, p.rows_skipped, p.rows_invalid, p.elapsed,
+        )
+        if self.on_progress is not None:
+            self.on_progress(p)
+
+    def done(self) -> int:
+        p = self.progress
+        logger.info(
+            "COPY %s: %s rows %s in %.2fs (%.0f rows/s)",
+            self.entity, p.rows_written, self.outcome, p.elapsed, p.rows_written / p.elapsed if p.elapsed else 0,
+        )
+        return p.rows_written
+
+
+def _chunks(path: str, entity: str):
+    return iter_clean_chunks(path, ENTITIES[entity], IMPORT_CHUNK_ROWS, IMPORT_MEMORY_LIMIT_MB * 2**20)
+
+
+def load_csv(
+    db: Session, entity: str, path: str, schema: Optional[str] = None, on_progress: Optional[ProgressCallback] = None
+) -> int:
+    """Stream one ESCO entity CSV (a key of TABLES) into its table; returns rows inserted."""
+    columns = ENTITIES[entity].columns
+    tracker = _Tracker(entity, on_progress)
+    for chunk in _chunks(path, entity):
+        rows = chunk.frame.itertuples(index=False, name=None)
+        tracker.chunk(chunk, copy_rows(db, TABLES[entity], columns, rows, schema))
+    return tracker.done()
+
+
+class RelationImport(NamedTuple):
+    inserted: int
+    existing: int                   # resolved pairs already in the table (or repeated in the file)
+    unresolved_occupations: int     # staged rows whose occupationUri matches no occupation
+    unresolved_skills: int          # staged rows whose skillUri matches no skill
+    touched: List[int]              # occupations that gained relations
+
+
+def ensure_relation_pair_index(db: Session, schema: Optional[str] = None) -> None:
+    """
+    Create the unique (occupation_id, skill_id) index ON CONFLICT resolves against, in schema
+    (default: search_path), first deleting duplicate pairs older loads may have left (the
+    lowest id of each pair is kept). No-op once the index exists; the caller commits.
+    """
+    if db.execute(text("SELECT to_regclass(:name)"), {"name": qualified_table(RELATION_PAIR_INDEX, schema)}).scalar():
+        return
+    table = qualified_table(RELATIONS_TABLE, schema)
+    removed = db.execute(text(f"""
+        DELETE FROM {table} a USING {table} b
+        WHERE a.occupation_id = b.occupation_id AND a.skill_id = b.skill_id AND a.id > b.id
+    """)).rowcount
+    if removed:
+        logger.warning("Removed %s duplicate occupation-skill pairs from %s", removed, table)
+    db.execute(text(
+        f"CREATE UNIQUE INDEX IF NOT EXISTS {quote_ident(RELATION_PAIR_INDEX)} ON {table} (occupation_id, skill_id)"
+    ))
+
+
+def _create_relation_staging(db: Session) -> None:
+    db.execute(text(f"DROP TABLE IF EXISTS {RELATION_STAGING}"))
+    db.execute(text(
+        f"CREATE TEMP TABLE {RELATION_STAGING} ("
+        + ", ".join(f"{quote_ident(c)} text" for c in RELATION_SOURCE_COLUMNS)
+        + ") ON COMMIT DROP"
+    ))
+
+
+def _resolve_relations(db: Session, schema: Optional[str]) -> RelationImport:
+    """Resolve the staged URIs to ids and insert the new pairs in one statement."""
+    ensure_relation_pair_index(db, schema)
+    db.execute(text(f"ANALYZE {RELATION_STAGING}"))
+    row = db.execute(text(f"""
+        WITH staged AS (
+            SELECT o.id AS occupation_id, s.id AS skill_id, st."relationType", st."skillType"
+            FROM {RELATION_STAGING} st
+            LEFT JOIN {qualified_table("occupations", schema)} o ON o."conceptUri" = st."occupationUri"
+            LEFT JOIN {qualified_table("skills", schema)} s ON s."conceptUri" = st."skillUri"
+        ),
+        inserted AS (
+            INSERT INTO {qualified_table(RELATIONS_TABLE, schema)} (occupation_id, skill_id, "relationType", "skillType")
+            SELECT occupation_id, skill_id, "relationType", "skillType"
+            FROM staged
+            WHERE occupation_id IS NOT NULL AND skill_id IS NOT NULL
+            ON CONFLICT (occupation_id, skill_id) DO NOTHING
+            RETURNING occupation_id
+        )
+        SELECT
+            (SELECT count(*) FROM inserted) AS inserted,
+            (SELECT count(*) FROM staged) AS staged,
+            (SELECT count(*) FROM staged WHERE occupation_id IS NOT NULL AND skill_id IS NOT NULL) AS resolved,
+            (SELECT count(*) FROM staged WHERE occupation_id IS NULL) AS unresolved_occupations,
+            (SELECT count(*) FROM staged WHERE skill_id IS NULL) AS unresolved_skills,
+            (SELECT coalesce(array_agg(DISTINCT occupation_id), '{{}}') FROM inserted) AS touched
+    """)).one()
+    db.execute(text(f"DROP TABLE {RELATION_STAGING}"))
+
+    result = RelationImport(
+        row.inserted, row.resolved - row.inserted, row.unresolved_occupations, row.unresolved_skills, list(row.touched)
+    )
+    entity = "occupation_skill_relations"
+    IMPORT_ROWS.inc(result.inserted, entity=entity, outcome="written")
+    IMPORT_ROWS.inc(result.existing, entity=entity, outcome="existing")
+    IMPORT_ROWS.inc(row.staged - row.resolved, entity=entity, outcome="unresolved")
+    logger.info(
+        "Resolved relations: %s inserted, %s already present, %s rows with an unknown occupation, %s with an unknown skill",
+        result.inserted, result.existing, result.unresolved_occupations, result.unresolved_skills,
+    )
+    return result
+
+
+def load_relations(
+    db: Session, path: str, schema: Optional[str] = None, on_progress: Optional[ProgressCallback] = None
+) -> RelationImport:
+    """
+    COPY the occupation-skill relations file into a temp staging table chunk by chunk, then
+    resolve URIs to ids and insert the new pairs inside the database (see _resolve_relations).
+    Progress events count staged rows as written.
+    """
+    tracker = _Tracker("occupation_skill_relations", on_progress, outcome="staged")
+    _create_relation_staging(db)
+    for chunk in _chunks(path, "occupation_skill_relations"):
+        rows = chunk.frame.itertuples(index=False, name=None)
+        tracker.chunk(chunk, copy_rows(db, RELATION_STAGING, RELATION_SOURCE_COLUMNS, rows))
+    tracker.done()
+    return _resolve_relations(db, schema)
+
+
+def insert_relation_rows(db: Session, rows: Iterable[Sequence], schema: Optional[str] = None) -> RelationImport:
+    """Same as load_relations for rows already in memory: (occupationUri, relationType, skillType, skillUri)."""
+    _create_relation_staging(db)
+    copy_rows(db, RELATION_STAGING, RELATION_SOURCE_COLUMNS, rows)
+    return _resolve_relations(db, schema)
@@ -24,10 +24,10 @@ def clean():
     
     # 2. Clean DataFrame
     occupations_cleaned_df = clean_occupation_csv(occupations_df)
-    skills_cleaned_df = clean_occupation_csv(skills_df)
-    skill_groups_cleaned_df = clean_occupation_csv(skill_groups_df)
-    skill_hierarchy_cleaned_df = clean_occupation_csv(skill_hierarchy_df)
-    occupation_skills_relation_cleaned_df = clean_occupation_csv(occupation_skills_selation_en_df)
+    skills_cleaned_df = clean_skill_csv(skills_df)
+    skill_groups_cleaned_df = clean_skillgroup_csv(skill_groups_df)
+    skill_hierarchy_cleaned_df = clean_skill_hierarchy_csv(skill_hierarchy_df)
+    occupation_skills_relation_cleaned_df = clean_occupation_skill_relation_csv(occupation_skills_selation_en_df)
 
     # 3. Convert rows to Pydantic schema objects
     occupations = [
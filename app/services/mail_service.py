@@ -0,0 +1,377 @@
+# app/services/mail_service.py
+"""
+Outbound mail queue.
+
+Request handlers only push a JSON job onto a Redis list (queue_email / queue_email_async)
+and return; a background worker delivers the mail:
+
+    mail:outbox      list of jobs waiting to be sent (LPUSH in, RPOP out)
+    mail:inflight    hash job -> claimed_at of jobs claimed by a worker; jobs whose worker
+                     died are put back on the outbox after MAIL_INFLIGHT_TIMEOUT seconds
+    mail:retry       sorted set of jobs waiting for their next attempt (score = due time)
+    mail:dead        list of jobs that failed permanently or MAIL_MAX_ATTEMPTS times
+
+The worker takes up to MAIL_BATCH_SIZE jobs at a time and sends them over one SMTP session
+that it keeps open between batches (closed after MAIL_SMTP_IDLE_SECONDS without mail), so
+connect / STARTTLS / login happen once per burst instead of once per message. Temporary
+failures are retried with exponential backoff; 5xx answers go straight to mail:dead.
+
+Every move between these keys (claim, settle, retry promotion, recovery) is one Lua script or
+MULTI, so a job is always in exactly one of them. Delivery is at-least-once: a worker that
+dies after sending but before acknowledging a job causes it to be sent again. If Redis is
+unreachable when queueing, the mail is sent directly.
+
+Runs inside each API process (MAIL_WORKER_ENABLED) or standalone:
+    python -m app.services.mail_service
+
+Local testing against an aiosmtpd stand-in (plain SMTP, no login):
+    python -m aiosmtpd -n -l localhost:8025
+    SMTP_HOST=localhost SMTP_PORT=8025 SMTP_STARTTLS=false SMTP_USER= uvicorn app.main:app
+"""
+import asyncio
+import json
+import os
+import random
+import smtplib
+import time
+import uuid
+from typing import Dict, List, Optional, Tuple
+
+from redis.exceptions import RedisError
+
+from app.core.logger import get_logger
+from app.core.metrics import Counter, Histogram
+from app.core.redis import r, sync_r
+from app.utils.email import build_message, open_smtp_session, send_email
+
+logger = get_logger(__name__)
+
+OUTBOX_KEY = "mail:outbox"
+INFLIGHT_KEY = "mail:inflight"
+RETRY_KEY = "mail:retry"
+DEAD_KEY = "mail:dead"
+
+MAIL_WORKER_ENABLED = os.getenv("MAIL_WORKER_ENABLED", "true").lower() in ("1", "true", "yes")
+MAIL_BATCH_SIZE = int(os.getenv("MAIL_BATCH_SIZE", 20))
+MAIL_MAX_ATTEMPTS = int(os.getenv("MAIL_MAX_ATTEMPTS", 6))
+MAIL_RETRY_BASE_SECONDS = float(os.getenv("MAIL_RETRY_BASE_SECONDS", 30))
+MAIL_RETRY_MAX_SECONDS = float(os.getenv("MAIL_RETRY_MAX_SECONDS", 3600))
+MAIL_SMTP_IDLE_SECONDS = float(os.getenv("MAIL_SMTP_IDLE_SECONDS", 30))
+MAIL_INFLIGHT_TIMEOUT = float(os.getenv("MAIL_INFLIGHT_TIMEOUT", 300))
+POLL_SECONDS = 1
+RECOVER_EVERY_SECONDS = 60
+
+MAIL_JOBS = Counter("mail_jobs_total", "Outbound mail jobs by outcome (queued, direct, sent, retry, dead)", ["result"])
+MAIL_SEND_SECONDS = Histogram("mail_send_duration_seconds", "SMTP time per batch, including (re)connects")
+
+_worker_task: Optional[asyncio.Task] = None
+
+# Jobs are moved between keys as the exact JSON string queued, so no script has to parse it.
+
+# KEYS outbox, inflight; ARGV count, now. Pop up to count jobs and record them as in flight.
+_CLAIM = """
+local jobs = redis.call('rpop', KEYS[1], ARGV[1])
+if not jobs then
+    return {}
+end
+for _, job in ipairs(jobs) do
+    redis.call('hset', KEYS[2], job, ARGV[2])
+end
+return jobs
+"""
+
+# KEYS retry, outbox; ARGV now, count. Move due retries back to the outbox.
+_PROMOTE = """
+local due = redis.call('zrangebyscore', KEYS[1], '-inf', ARGV[1], 'LIMIT', 0, ARGV[2])
+for _, job in ipairs(due) do
+    redis.call('zrem', KEYS[1], job)
+    redis.call('lpush', KEYS[2], job)
+end
+return #due
+"""
+
+# KEYS inflight, outbox, dead; ARGV cutoff. Re-queue jobs claimed before cutoff; entries
+# without a claim time (malformed, or id -> job from an older version) go to dead as stored.
+_RECOVER = """
+local entries = redis.call('hgetall', KEYS[1])
+local moved, dead = 0, 0
+for i = 1, #entries, 2 do
+    local claimed_at = tonumber(entries[i + 1])
+    if not claimed_at then
+        redis.call('hdel', KEYS[1], entries[i])
+        redis.call('lpush', KEYS[3], entries[i + 1])
+        dead = dead + 1
+    elseif claimed_at < tonumber(ARGV[1]) then
+        redis.call('hdel', KEYS[1], entries[i])
+        redis.call('lpush', KEYS[2], entries[i])
+        moved = moved + 1
+    end
+end
+return {moved, dead}
+"""
+
+_claim = r.register_script(_CLAIM)
+_promote = r.register_script(_PROMOTE)
+_recover = r.register_script(_RECOVER)
+
+
+# -------------------------------
+# Producers
+# -------------------------------
+
+def _job(to_email: str, subject: str, html_body: str, text_body: Optional[str]) -> Dict:
+    return {
+        "id": uuid.uuid4().hex, "to": to_email, "subject": subject,
+        "html": html_body, "text": text_body, "attempts": 0, "queued_at": time.time(),
+    }
+
+
+def queue_email(to_email: str, subject: str, html_body: str, text_body: Optional[str] = None) -> None:
+    """Queue a message from sync code (falls back to sending it directly without Redis)."""
+    job = _job(to_email, subject, html_body, text_body)
+    try:
+        sync_r.lpush(OUTBOX_KEY, json.dumps(job))
+        MAIL_JOBS.inc(result="queued")
+    except RedisError as e:
+        logger.warning("Mail queue unavailable (%s); sending to %s directly", e, to_email)
+        send_email(to_email, subject, html_body, text_body=text_body)
+        MAIL_JOBS.inc(result="direct")
+
+
+async def queue_email_async(to_email: str, subject: str, html_body: str, text_body: Optional[str] = None) -> None:
+    """queue_email() for code running on the event loop."""
+    job = _job(to_email, subject, html_body, text_body)
+    try:
+        await r.lpush(OUTBOX_KEY, json.dumps(job))
+        MAIL_JOBS.inc(result="queued")
+    except RedisError as e:
+        logger.warning("Mail queue unavailable (%s); sending to %s directly", e, to_email)
+        await asyncio.to_thread(send_email, to_email, subject, html_body, text_body)
+        MAIL_JOBS.inc(result="direct")
+
+
+# -------------------------------
+# SMTP session reuse
+# -------------------------------
+
+class SmtpSession:
+    """One SMTP connection reused across batches; reconnects when the server drops it."""
+
+    def __init__(self):
+        self._server: Optional[smtplib.SMTP] = None
+        self._last_used = 0.0
+
+    def _connected(self) -> smtplib.SMTP:
+        if self._server is None:
+            self._server = open_smtp_session()
+        return self._server
+
+    def close(self) -> None:
+        if self._server is not None:
+            try:
+                self._server.quit()
+            except (smtplib.SMTPException, OSError):
+                self._server.close()
+            self._server = None
+
+    def close_if_idle(self) -> None:
+        if self._server is not None and time.monotonic() - self._last_used > MAIL_SMTP_IDLE_SECONDS:
+            self.close()
+
+    def send_batch(self, jobs: List[Dict]) -> List[Optional[Exception]]:
+        """Send each job; returns None or the exception per job, in order."""
+        results: List[Optional[Exception]] = []
+        for job in jobs:
+            try:
+                message = build_message(job["to"], job["subject"], job["html"], job.get("text"))
+            except Exception as e:
+                results.append(e)
+                continue
+            for attempt in (1, 2):
+                try:
+                    server = self._connected()
+                except (smtplib.SMTPException, OSError) as e:
+                    # Cannot connect or log in: not the messages' fault, retry the rest later
+                    error = ConnectionError(f"SMTP connect failed: {e}")
+                    results.extend(error for _ in range(len(jobs) - len(results)))
+                    self._last_used = time.monotonic()
+                    return results
+                try:
+                    server.send_message(message)
+                    results.append(None)
+                    break
+                except (smtplib.SMTPServerDisconnected, ConnectionError) as e:
+                    # Stale pooled connection: reconnect once before counting it as a failure
+                    self.close()
+                    if attempt == 2:
+                        results.append(e)
+                except (smtplib.SMTPRecipientsRefused, smtplib.SMTPResponseException) as e:
+                    # The server answered; the session is still usable for the next message
+                    results.append(e)
+                    break
+                except (smtplib.SMTPException, OSError) as e:
+                    self.close()
+                    results.append(e)
+                    break
+        self._last_used = time.monotonic()
+        return results
+
+
+def is_permanent(error: Exception) -> bool:
+    """5xx answers (bad address, rejected content) and unbuildable messages will not succeed on retry."""
+    if not isinstance(error, (smtplib.SMTPException, OSError)):
+        return True
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return all(code >= 500 for code, _ in error.recipients.values())
+    if isinstance(error, smtplib.SMTPResponseException):
+        return error.smtp_code >= 500
+    return False
+
+
+def retry_delay(attempts: int) -> float:
+    """Exponential backoff with jitter: base * 2^(attempts-1), capped."""
+    delay = min(MAIL_RETRY_MAX_SECONDS, MAIL_RETRY_BASE_SECONDS * 2 ** max(0, attempts - 1))
+    return delay * random.uniform(0.8, 1.2)
+
+
+# -------------------------------
+# Worker
+# -------------------------------
+
+async def _claim_batch() -> List[Tuple[str, Dict]]:
+    """Block up to POLL_SECONDS for a job, then claim up to MAIL_BATCH_SIZE; (raw, job) pairs."""
+    # BLMOVE onto the same end of the same list only waits: the job stays on the outbox until
+    # the claim script moves it to mail:inflight
+    if await r.blmove(OUTBOX_KEY, OUTBOX_KEY, POLL_SECONDS, "RIGHT", "RIGHT") is None:
+        return []
+    claimed = []
+    for raw in await _claim(keys=[OUTBOX_KEY, INFLIGHT_KEY], args=[MAIL_BATCH_SIZE, time.time()]):
+        try:
+            job = json.loads(raw)
+            job["to"], job["subject"], job["html"]
+        except (ValueError, TypeError, KeyError):
+            logger.error("Moving malformed mail job to %s: %r", DEAD_KEY, raw[:200])
+            await r.pipeline(transaction=True).hdel(INFLIGHT_KEY, raw).lpush(DEAD_KEY, raw).execute()
+            MAIL_JOBS.inc(result="dead")
+            continue
+        claimed.append((raw, job))
+    return claimed
+
+
+async def _settle(claimed: List[Tuple[str, Dict]], results: List[Optional[Exception]]) -> None:
+    # MULTI: each job leaves mail:inflight in the same step it lands in mail:retry / mail:dead
+    pipe = r.pipeline(transaction=True)
+    now = time.time()
+    for (raw, job), error in zip(claimed, results):
+        pipe.hdel(INFLIGHT_KEY, raw)
+        if error is None:
+            MAIL_JOBS.inc(result="sent")
+            continue
+        job["attempts"] = job.get("attempts", 0) + 1
+        job["last_error"] = str(error)[:500]
+        if is_permanent(error) or job["attempts"] >= MAIL_MAX_ATTEMPTS:
+            logger.error("Giving up on mail %s to %s after %s attempts: %s", job.get("id"), job["to"], job["attempts"], error)
+            pipe.lpush(DEAD_KEY, json.dumps(job))
+            MAIL_JOBS.inc(result="dead")
+        else:
+            delay = retry_delay(job["attempts"])
+            logger.warning("Mail %s to %s failed (%s); retrying in %.0fs", job.get("id"), job["to"], error, delay)
+            pipe.zadd(RETRY_KEY, {json.dumps(job): now + delay})
+            MAIL_JOBS.inc(result="retry")
+    await pipe.execute()
+
+
+async def _promote_due_retries() -> None:
+    await _promote(keys=[RETRY_KEY, OUTBOX_KEY], args=[time.time(), MAIL_BATCH_SIZE])
+
+
+async def _recover_stale_inflight() -> None:
+    """Re-queue jobs claimed by a worker that has not settled them in MAIL_INFLIGHT_TIMEOUT."""
+    moved, dead = await _recover(keys=[INFLIGHT_KEY, OUTBOX_KEY, DEAD_KEY], args=[time.time() - MAIL_INFLIGHT_TIMEOUT])
+    if moved:
+        logger.warning("Re-queued %s mail jobs abandoned by their worker", moved)
+    if dead:
+        logger.error("Moved %s malformed in-flight mail entries to %s", dead, DEAD_KEY)
+
+
+async def run_worker(stop: Optional[asyncio.Event] = None) -> None:
+    """Deliver queued mail until cancelled (or until stop is set)."""
+    session = SmtpSession()
+    recovered_at = 0.0
+    backoff = 1
+    logger.info("Mail worker started (batch %s, max attempts %s)", MAIL_BATCH_SIZE, MAIL_MAX_ATTEMPTS)
+    try:
+        while stop is None or not stop.is_set():
+            try:
+                if time.monotonic() - recovered_at > RECOVER_EVERY_SECONDS:
+                    await _recover_stale_inflight()
+                    recovered_at = time.monotonic()
+                await _promote_due_retries()
+                claimed = await _claim_batch()
+                if not claimed:
+                    await asyncio.to_thread(session.close_if_idle)
+                    continue
+                with MAIL_SEND_SECONDS.time():
+                    results = await asyncio.to_thread(session.send_batch, [job for _, job in claimed])
+                await _settle(claimed, results)
+                backoff = 1
+            except asyncio.CancelledError:
+                raise
+            except RedisError as e:
+                logger.warning("Mail worker lost Redis (%s); retrying in %ss", e, backoff)
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 30)
+            except Exception:
+                # Anything else must not end the task: claimed jobs stay in mail:inflight and are
+                # re-queued by _recover_stale_inflight once MAIL_INFLIGHT_TIMEOUT has passed
+                logger.error("Mail worker error; retrying in %ss", backoff, exc_info=True)
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 30)
+    finally:
+        await asyncio.to_thread(session.close)
+
+
+def start_worker() -> None:
+    """Start the delivery worker on the running event loop (no-op if disabled or running)."""
+    global _worker_task
+    if MAIL_WORKER_ENABLED and _worker_task is None:
+        _worker_task = asyncio.get_running_loop().create_task(run_worker())
+
+
+async def stop_worker() -> None:
+    global _worker_task
+    if _worker_task is not None:
+        _worker_task.cancel()
+        try:
+            await _worker_task
+        except asyncio.CancelledError:
+            pass
+        _worker_task = None
+
+
+def queue_stats() -> Dict[str, int]:
+    pipe = sync_r.pipeline(transaction=False)
+    pipe.llen(OUTBOX_KEY)
+    pipe.hlen(INFLIGHT_KEY)
+    pipe.zcard(RETRY_KEY)
+    pipe.llen(DEAD_KEY)
+    outbox, inflight, retry, dead = pipe.execute()
+    return {"outbox": outbox, "inflight": inflight, "retry": retry, "dead": dead}
+
+
+def requeue_dead(limit: int = 1000) -> int:
+    """Move up to limit dead jobs back to the outbox with a fresh attempt count (malformed ones stay)."""
+    moved = 0
+    for item in sync_r.lrange(DEAD_KEY, -limit, -1):
+        try:
+            job = json.loads(item)
+            job["attempts"] = 0
+        except (ValueError, TypeError):
+            continue
+        sync_r.pipeline(transaction=True).lrem(DEAD_KEY, 1, item).lpush(OUTBOX_KEY, json.dumps(job)).execute()
+        moved += 1
+    return moved
+
+
+if __name__ == "__main__":
+    asyncio.run(run_worker())
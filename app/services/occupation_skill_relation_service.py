@@ -1,51 +1,46 @@
 from sqlalchemy.orm import Session
-from app.models.occupation_skill_relation import OccupationSkillRelation
-from app.models.occupation import Occupation
-from app.models.skill import Skill
 from app.schemas.occupation_skill_relation import OccupationSkillRelationCreate
+from app.scoring.repository import delete_materialized_scores
+from app.services import copy_loader
+from app.services.cache_service import CacheService
+from app.core.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+def ensure_relation_index(db: Session) -> None:
+    """Startup: dedup relations and add the unique pair index; logs and carries on if that fails."""
+    try:
+        copy_loader.ensure_relation_pair_index(db)
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        logger.warning("Could not create the occupation-skill pair index: %s", e)
+
+
+def _invalidate(db: Session, result: copy_loader.RelationImport) -> None:
+    if result.inserted:
+        # Stored risk scores of touched occupations are stale; they are recomputed on next read
+        delete_materialized_scores(db, result.touched)
+    db.commit()
+    if result.inserted:
+        CacheService.bump_dataset_version_sync()
+
 
 def insert_occupation_skill_relations(db: Session, relations: list[OccupationSkillRelationCreate]) -> int:
-    inserted = 0
-
-    # 1. Get all occupations and skills into dicts
-    occupation_map = {
-        o.conceptUri: o.id for o in db.query(Occupation).all()
-    }
-    skill_map = {
-        s.conceptUri: s.id for s in db.query(Skill).all()
-    }
-
-    # 2. Existing relations (to avoid duplicates)
-    existing_relations = set(
-        (r.occupation_id, r.skill_id)
-        for r in db.query(OccupationSkillRelation).all()
+    """
+    Insert relations given by URI. URIs are resolved to ids and existing pairs skipped inside
+    the database (see copy_loader.insert_relation_rows); returns the number inserted.
+    """
+    result = copy_loader.insert_relation_rows(
+        db, ((rel.occupationUri, rel.relationType, rel.skillType, rel.skillUri) for rel in relations)
     )
+    _invalidate(db, result)
+    return result.inserted
 
-    # 3. Prepare objects to add
-    to_add = []
-    for rel in relations:
-        occ_id = occupation_map.get(rel.occupationUri)
-        skill_id = skill_map.get(rel.skillUri)
-        if not occ_id or not skill_id:
-            continue
-
-        if (occ_id, skill_id) in existing_relations:
-            continue
-
-        to_add.append(
-            OccupationSkillRelation(
-                occupation_id=occ_id,
-                skill_id=skill_id,
-                relationType=rel.relationType,
-                skillType=rel.skillType
-            )
-        )
-        existing_relations.add((occ_id, skill_id))
-        inserted += 1
-
-    # 4. Bulk insert
-    if to_add:
-        db.bulk_save_objects(to_add)
-        db.commit()
 
-    return inserted
+def import_occupation_skill_relations_csv(db: Session, path: str) -> copy_loader.RelationImport:
+    """Stream a relations CSV in through a COPY staging table (see app/services/copy_loader.py)."""
+    result = copy_loader.load_relations(db, path)
+    _invalidate(db, result)
+    return result
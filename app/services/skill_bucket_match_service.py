@@ -0,0 +1,160 @@
+# app/services/skill_bucket_match_service.py
+import hashlib
+from typing import Any, Dict, List, Set, Tuple
+
+from sqlalchemy import insert, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from app.core.logger import logger
+from app.models.skill_bucket_match import SkillBucketMatch, SkillMatchSource, SkillMatchKeyword
+from app.scoring import repository as scoring_repo
+from app.scoring.matcher import BucketKeywordMatcher
+from app.scoring.service import group_bucket_keywords
+
+INSERT_CHUNK = 5000
+
+
+def _text_hash(label: str | None, definition: str | None) -> str:
+    """Fingerprint of the skill text that keyword matching depends on."""
+    return hashlib.md5(f"{label or ''}\x1f{definition or ''}".encode("utf-8")).hexdigest()
+
+
+def _matcher_for(keywords: Set[Tuple[int, str]]) -> BucketKeywordMatcher:
+    """Compile a matcher over a subset of (bucket_id, keyword) pairs."""
+    buckets: Dict[int, Dict[str, Any]] = {}
+    for bucket_id, keyword in keywords:
+        buckets.setdefault(bucket_id, {"keywords": set()})["keywords"].add(keyword)
+    return BucketKeywordMatcher(buckets)
+
+
+def _skill_matches(matcher: BucketKeywordMatcher, skill_id: int, label: str | None,
+                   definition: str | None) -> List[Dict[str, Any]]:
+    """Match rows (with provenance) for one skill."""
+    rows = []
+    for field, value in (("label", label), ("definition", definition)):
+        for m in matcher.finditer(value or ""):
+            rows.append({
+                "skill_id": skill_id,
+                "bucket_id": m.bucket_id,
+                "keyword": m.keyword,
+                "field": field,
+                "position": m.position,
+            })
+    return rows
+
+
+def build_skill_bucket_matches(db: Session, full: bool = False) -> Dict[str, Any]:
+    """
+    Import-time stage: compute skill -> bucket keyword matches into skill_bucket_matches.
+
+    Incremental by default:
+      - skills whose label/definition hash changed (or are new) are re-matched against all keywords
+      - keywords added since the last build are matched against the unchanged skills only
+      - matches of removed keywords are deleted
+    With full=True everything is dropped and rebuilt.
+
+    The returned report includes `changed_skill_ids` and `changed_bucket_ids` so callers can
+    refresh dependent data (e.g. materialized risk scores).
+    """
+    buckets = group_bucket_keywords(scoring_repo.get_bucket_keywords(db))
+    current = {(bucket_id, kw) for bucket_id, meta in buckets.items() for kw in meta["keywords"]}
+
+    if full:
+        db.execute(text("DELETE FROM skill_bucket_matches"))
+        db.execute(text("DELETE FROM skill_match_sources"))
+        db.execute(text("DELETE FROM skill_match_keywords"))
+        previous: Set[Tuple[int, str]] = set()
+        known_hashes: Dict[int, str] = {}
+    else:
+        previous = {(r[0], r[1]) for r in db.execute(text("SELECT bucket_id, keyword FROM skill_match_keywords"))}
+        known_hashes = dict(db.execute(text("SELECT skill_id, text_hash FROM skill_match_sources")).all())
+
+    added = current - previous
+    removed = previous - current
+    changed_skills: Set[int] = set()
+
+    # 1. Matches of keywords that no longer exist
+    if removed:
+        removed_list = sorted(removed)
+        rows = db.execute(
+            text("""
+                DELETE FROM skill_bucket_matches m
+                USING unnest(CAST(:bucket_ids AS int[]), CAST(:keywords AS text[])) AS r(bucket_id, keyword)
+                WHERE m.bucket_id = r.bucket_id AND m.keyword = r.keyword
+                RETURNING m.skill_id
+            """),
+            {"bucket_ids": [b for b, _ in removed_list], "keywords": [k for _, k in removed_list]}
+        ).all()
+        changed_skills.update(r[0] for r in rows)
+
+    # 2. Scan skills: full re-match for new/edited text, added keywords only for the rest
+    full_matcher = BucketKeywordMatcher(buckets)
+    added_matcher = _matcher_for(added) if added else None
+
+    skills = db.execute(text('SELECT id, "preferredLabel", definition FROM skills')).all()
+    new_matches: List[Dict[str, Any]] = []
+    sources: List[Dict[str, Any]] = []
+    edited: List[int] = []
+    for skill_id, label, definition in skills:
+        text_hash = _text_hash(label, definition)
+        if known_hashes.get(skill_id) != text_hash:
+            if skill_id in known_hashes:
+                edited.append(skill_id)
+                changed_skills.add(skill_id)
+            sources.append({"skill_id": skill_id, "text_hash": text_hash})
+            rows = _skill_matches(full_matcher, skill_id, label, definition)
+        elif added_matcher is not None:
+            rows = _skill_matches(added_matcher, skill_id, label, definition)
+        else:
+            continue
+        if rows:
+            changed_skills.add(skill_id)
+            new_matches.extend(rows)
+
+    if edited:
+        db.execute(text("DELETE FROM skill_bucket_matches WHERE skill_id = ANY(:skill_ids)"), {"skill_ids": edited})
+
+    for start in range(0, len(new_matches), INSERT_CHUNK):
+        db.execute(insert(SkillBucketMatch.__table__), new_matches[start:start + INSERT_CHUNK])
+
+    for start in range(0, len(sources), INSERT_CHUNK):
+        stmt = pg_insert(SkillMatchSource.__table__).values(sources[start:start + INSERT_CHUNK])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["skill_id"],
+            set_={"text_hash": stmt.excluded.text_hash, "matched_at": text("now()")},
+        )
+        db.execute(stmt)
+
+    # 3. Keyword snapshot for the next incremental run
+    if removed:
+        removed_list = sorted(removed)
+        db.execute(
+            text("""
+                DELETE FROM skill_match_keywords k
+                USING unnest(CAST(:bucket_ids AS int[]), CAST(:keywords AS text[])) AS r(bucket_id, keyword)
+                WHERE k.bucket_id = r.bucket_id AND k.keyword = r.keyword
+            """),
+            {"bucket_ids": [b for b, _ in removed_list], "keywords": [k for _, k in removed_list]}
+        )
+    if added:
+        db.execute(insert(SkillMatchKeyword.__table__), [{"bucket_id": b, "keyword": k} for b, k in sorted(added)])
+
+    db.commit()
+
+    report = {
+        "mode": "full" if full else "incremental",
+        "skills_scanned": len(skills),
+        "skills_rematched": len(sources),
+        "keywords_added": len(added),
+        "keywords_removed": len(removed),
+        "matches_inserted": len(new_matches),
+        "changed_skill_ids": sorted(changed_skills),
+        "changed_bucket_ids": sorted({b for b, _ in added | removed}),
+    }
+    logger.info(
+        f"Skill bucket matches built ({report['mode']}): {report['skills_rematched']} skills re-matched, "
+        f"{report['keywords_added']} keywords added, {report['keywords_removed']} removed, "
+        f"{report['matches_inserted']} matches inserted"
+    )
+    return report
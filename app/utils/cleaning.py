@@ -0,0 +1,187 @@
+# app/utils/cleaning.py
+"""
+Declarative cleaning for the ESCO CSVs.
+
+Each entity is described once by an EntitySpec (output columns and the CSV headers feeding
+them, dedup key, required columns, which columns store "" as None, date columns that must
+parse). The same spec drives:
+    clean_frame()        a DataFrame, column-wise: .str.strip() per column (pyarrow string
+                         compute on pandas' Arrow-backed strings) instead of a Python call per cell
+    iter_clean_chunks()  a CSV file read in bounded chunks, for the streaming COPY loader;
+                         duplicates are dropped across chunks via 64-bit hashes of the key
+"""
+from typing import Dict, Iterator, NamedTuple, Set, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Cleaning holds a few copies of a chunk at once (raw, stripped, masks, rendered COPY text)
+_WORKING_SET_FACTOR = 4
+_PROBE_ROWS = 1000
+
+
+class EntitySpec(NamedTuple):
+    columns: Tuple[str, ...]            # output columns, in order
+    headers: Tuple[str, ...] = ()       # CSV header feeding each column (same order); () = columns
+    key: Tuple[str, ...] = ()           # dedup on these columns; () keeps every row
+    required: Tuple[str, ...] = ()      # rows with an empty value in any of these are dropped
+    null_empty: Tuple[str, ...] = ()    # columns where "" is stored as None
+    strict: bool = False                # a missing header raises instead of reading as None
+    dates: Tuple[str, ...] = ()         # rows whose value here is set but not a date are invalid
+
+    @property
+    def sources(self) -> Tuple[str, ...]:
+        return self.headers or self.columns
+
+
+_OCCUPATION_COLUMNS = (
+    "conceptType", "conceptUri", "iscoGroup", "preferredLabel", "altLabels",
+    "hiddenLabels", "status", "modifiedDate", "regulatedProfessionNote",
+    "scopeNote", "definition", "inScheme", "description", "code",
+)
+_SKILL_COLUMNS = (
+    "conceptType", "conceptUri", "skillType", "reuseLevel", "preferredLabel",
+    "altLabels", "hiddenLabels", "status", "modifiedDate", "scopeNote",
+    "definition", "inScheme", "description",
+)
+_SKILL_GROUP_COLUMNS = (
+    "conceptType", "conceptUri", "preferredLabel", "altLabels", "hiddenLabels",
+    "status", "modifiedDate", "scopeNote", "inScheme", "description", "code",
+)
+_SKILL_HIERARCHY_COLUMNS = (
+    "level_0_uri", "level_0_preferred_term", "level_1_uri", "level_1_preferred_term",
+    "level_2_uri", "level_2_preferred_term", "level_3_uri", "level_3_preferred_term",
+    "description", "scope_note", "level_0_code", "level_1_code", "level_2_code", "level_3_code",
+)
+_SKILL_HIERARCHY_HEADERS = (
+    "Level 0 URI", "Level 0 preferred term", "Level 1 URI", "Level 1 preferred term",
+    "Level 2 URI", "Level 2 preferred term", "Level 3 URI", "Level 3 preferred term",
+    "Description", "Scope note", "Level 0 code", "Level 1 code", "Level 2 code", "Level 3 code",
+)
+_RELATION_COLUMNS = ("occupationUri", "relationType", "skillType", "skillUri")
+
+# Occupations and skills keep "" for empty text; skill groups and the hierarchy store None.
+# A date column never holds "".
+ENTITIES: Dict[str, EntitySpec] = {
+    "occupations": EntitySpec(
+        _OCCUPATION_COLUMNS, key=("conceptUri",), required=("conceptUri",), null_empty=("modifiedDate",),
+        dates=("modifiedDate",),
+    ),
+    "skills": EntitySpec(
+        _SKILL_COLUMNS, key=("conceptUri",), required=("conceptUri",), null_empty=("modifiedDate",),
+        dates=("modifiedDate",),
+    ),
+    "skill_groups": EntitySpec(
+        _SKILL_GROUP_COLUMNS, key=("conceptUri",), required=("conceptUri",), null_empty=_SKILL_GROUP_COLUMNS,
+        dates=("modifiedDate",),
+    ),
+    "skill_hierarchy": EntitySpec(
+        _SKILL_HIERARCHY_COLUMNS, headers=_SKILL_HIERARCHY_HEADERS,
+        key=_SKILL_HIERARCHY_COLUMNS, null_empty=_SKILL_HIERARCHY_COLUMNS,
+    ),
+    "occupation_skill_relations": EntitySpec(
+        _RELATION_COLUMNS, key=_RELATION_COLUMNS, required=("occupationUri", "skillUri"), strict=True,
+    ),
+}
+
+
+def _missing_headers(spec: EntitySpec, available) -> list:
+    missing = [h for h in spec.sources if h not in available]
+    if missing and spec.strict:
+        raise ValueError(f"Missing expected columns: {missing}")
+    return missing
+
+
+def _stripped(series: pd.Series) -> pd.Series:
+    if pd.api.types.is_string_dtype(series) or series.dtype == object:
+        return series.str.strip()
+    return series
+
+
+def clean_frame(df: pd.DataFrame, spec: EntitySpec) -> pd.DataFrame:
+    """
+    Return a cleaned copy of df with exactly spec.columns: values stripped, blank rows and rows
+    missing a required value dropped, "" -> None where asked, deduplicated on spec.key.
+    Missing cells come back as None, never NaN.
+    """
+    df = df.rename(columns=lambda c: c.strip() if isinstance(c, str) else c)
+    missing = _missing_headers(spec, df.columns)
+
+    out = pd.DataFrame(
+        {
+            column: pd.Series(None, index=df.index, dtype=object) if header in missing else _stripped(df[header])
+            for column, header in zip(spec.columns, spec.sources)
+        },
+        index=df.index,
+    )
+
+    empty = out.isna() | (out == "")
+    keep = ~empty.all(axis=1)
+    if spec.required:
+        keep &= ~empty[list(spec.required)].any(axis=1)
+    out = out[keep]
+
+    for column in spec.null_empty:
+        out[column] = out[column].mask(out[column] == "")
+    if spec.key:
+        out = out.drop_duplicates(subset=list(spec.key))
+
+    # Only columns that actually hold missing values pay for the object conversion
+    for column in out.columns:
+        if out[column].hasnans:
+            out[column] = out[column].astype(object).where(out[column].notna(), None)
+    return out
+
+
+class CleanChunk(NamedTuple):
+    frame: pd.DataFrame     # cleaned rows not already yielded by an earlier chunk
+    read: int               # raw rows in the chunk
+    skipped: int            # blank, missing a required value, or a duplicate
+    invalid: int            # failed validation (unparseable date)
+
+
+def read_csv_chunks(path: str, chunk_rows: int, memory_limit_bytes: int) -> Iterator[pd.DataFrame]:
+    """
+    Read a CSV as strings in chunks of at most chunk_rows, shrinking the chunk when the rows
+    measured so far would not fit memory_limit_bytes while being cleaned.
+    """
+    with pd.read_csv(path, dtype=str, keep_default_na=False, iterator=True) as reader:
+        size = min(chunk_rows, _PROBE_ROWS)
+        while True:
+            try:
+                chunk = reader.get_chunk(size)
+            except StopIteration:
+                return
+            yield chunk
+            row_bytes = chunk.memory_usage(deep=True).sum() / max(1, len(chunk))
+            size = int(max(1, min(chunk_rows, memory_limit_bytes // (row_bytes * _WORKING_SET_FACTOR))))
+
+
+def invalid_rows(df: pd.DataFrame, spec: EntitySpec) -> pd.Series:
+    """Boolean mask of cleaned rows failing validation: a set date column that does not parse."""
+    invalid = pd.Series(False, index=df.index)
+    for column in spec.dates:
+        values = df[column]
+        parsed = pd.to_datetime(values, errors="coerce", format="ISO8601", utc=True)
+        invalid |= values.notna() & parsed.isna()
+    return invalid
+
+
+def iter_clean_chunks(path: str, spec: EntitySpec, chunk_rows: int, memory_limit_bytes: int) -> Iterator[CleanChunk]:
+    """
+    Clean a CSV chunk by chunk with clean_frame(); rows failing validation are dropped, and so
+    are rows whose key an earlier chunk already produced (only the key hashes are kept).
+    """
+    key = list(spec.key)
+    seen: Set[int] = set()
+    for chunk in read_csv_chunks(path, chunk_rows, memory_limit_bytes):
+        frame = clean_frame(chunk, spec)
+        invalid = invalid_rows(frame, spec)
+        frame = frame[~invalid]
+        if key and len(frame):
+            hashes = pd.util.hash_pandas_object(frame[key], index=False).to_numpy()
+            fresh = np.fromiter((h not in seen for h in hashes.tolist()), dtype=bool, count=len(hashes))
+            seen.update(hashes[fresh].tolist())
+            frame = frame[fresh]
+        invalid_count = int(invalid.sum())
+        yield CleanChunk(frame, len(chunk), len(chunk) - len(frame) - invalid_count, invalid_count)
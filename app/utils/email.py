@@ -10,25 +10,42 @@ SMTP_PORT = int(os.getenv("SMTP_PORT", "587"))
 SMTP_USER = os.getenv("SMTP_USER")
 SMTP_PASSWORD = os.getenv("SMTP_PASSWORD")
 EMAIL_FROM = os.getenv("EMAIL_FROM", SMTP_USER or "no-reply@example.com")
+# Off for local stand-ins (e.g. aiosmtpd) that speak plain SMTP
+SMTP_STARTTLS = os.getenv("SMTP_STARTTLS", "true").lower() in ("1", "true", "yes")
+SMTP_TIMEOUT = float(os.getenv("SMTP_TIMEOUT", "30"))
 CODE_TTL_MINUTES = 15
 DISPOSABLE_DOMAINS = {"mailinator.com", "10minutemail.com"}
 
 
-def send_email(to_email: str, subject: str, html_body: str, text_body: str | None = None):
+def build_message(to_email: str, subject: str, html_body: str, text_body: str | None = None) -> EmailMessage:
     msg = EmailMessage()
     msg["Subject"] = subject
     msg["From"] = EMAIL_FROM
     msg["To"] = to_email
     if text_body:
-        logger.info("Sending email with both HTML and plain text parts")
         msg.set_content(text_body)
     msg.add_alternative(html_body, subtype="html")
+    return msg
+
+
+def open_smtp_session() -> smtplib.SMTP:
+    """Connected, STARTTLS-upgraded (unless disabled) and logged-in (if configured) SMTP session."""
+    server = smtplib.SMTP(SMTP_HOST, SMTP_PORT, timeout=SMTP_TIMEOUT)
+    try:
+        if SMTP_STARTTLS:
+            server.starttls(context=ssl.create_default_context())
+        if SMTP_USER:
+            server.login(SMTP_USER, SMTP_PASSWORD)
+    except Exception:
+        server.close()
+        raise
+    return server
+
 
-    context = ssl.create_default_context()
-    with smtplib.SMTP(SMTP_HOST, SMTP_PORT) as server:
-        server.starttls(context=context)
-        server.login(SMTP_USER, SMTP_PASSWORD)
-        server.send_message(msg)
+def send_email(to_email: str, subject: str, html_body: str, text_body: str | None = None):
+    """Send one message on its own connection. Request handlers queue mail via app.services.mail_service."""
+    with open_smtp_session() as server:
+        server.send_message(build_message(to_email, subject, html_body, text_body))
 
 def validate_and_normalize_email(email: str) -> str:
     """
@@ -0,0 +1,39 @@
+# benchmarks/_timing.py
+"""Small helpers shared by the benchmark scripts."""
+import statistics
+import time
+from typing import Callable, Dict, List
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """Nearest-rank percentile of a list of samples."""
+    ordered = sorted(samples)
+    if not ordered:
+        return 0.0
+    rank = max(0, min(len(ordered) - 1, int(round(pct / 100.0 * len(ordered))) - 1))
+    return ordered[rank]
+
+
+def summarize(samples_ms: List[float]) -> Dict[str, float]:
+    """p50 / p99 / mean / max of a list of millisecond timings."""
+    return {
+        "n": len(samples_ms),
+        "p50_ms": round(percentile(samples_ms, 50), 3),
+        "p99_ms": round(percentile(samples_ms, 99), 3),
+        "mean_ms": round(statistics.fmean(samples_ms), 3) if samples_ms else 0.0,
+        "max_ms": round(max(samples_ms), 3) if samples_ms else 0.0,
+    }
+
+
+def time_call(fn: Callable[[], object]) -> float:
+    """Run fn once and return the elapsed time in milliseconds."""
+    start = time.perf_counter()
+    fn()
+    return (time.perf_counter() - start) * 1000.0
+
+
+def print_table(rows: Dict[str, Dict[str, float]]) -> None:
+    """Print one line per variant with its timing summary."""
+    for name, stats in rows.items():
+        cols = "  ".join(f"{k}={v}" for k, v in stats.items())
+        print(f"{name:<28} {cols}")
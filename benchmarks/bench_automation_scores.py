@@ -0,0 +1,103 @@
+# benchmarks/bench_automation_scores.py
+"""
+Compare the legacy whole-table automation-score CTE with the filtered one in
+app/scoring/repository.py::get_skill_automation_scores.
+
+Usage (against a database with the ESCO import loaded):
+    python -m benchmarks.bench_automation_scores --samples 200
+"""
+import argparse
+import random
+
+from sqlalchemy import text
+
+from app.core.database import SessionLocal
+from app.scoring import repository as repo
+from benchmarks._timing import print_table, summarize, time_call
+
+# The query as it was before the skill-id filter was pushed into each branch.
+LEGACY_QUERY = text("""
+    WITH bucket_based AS (
+        SELECT sbm.skill_id,
+               AVG(COALESCE(sbm.weight_override, sb.default_weight)) AS bucket_weight
+        FROM skill_bucket_map sbm
+        JOIN scoring_buckets sb ON sb.id = sbm.bucket_id
+        GROUP BY sbm.skill_id
+    ),
+    metadata_based AS (
+        SELECT s.id AS skill_id,
+               (
+                   CASE
+                       WHEN s."skillType" ILIKE '%competence%' THEN 10
+                       WHEN s."skillType" ILIKE '%knowledge%' THEN -10
+                       ELSE 0
+                   END
+                   +
+                   CASE
+                       WHEN s."reuseLevel" ILIKE '%cross%' THEN -5
+                       ELSE 0
+                   END
+               )
+               *
+               (
+                   CASE
+                       WHEN osr."relationType" = 'essential' THEN 1.2
+                       WHEN osr."relationType" = 'optional' THEN 0.8
+                       ELSE 1
+                   END
+               )
+               * COALESCE(osr.importance, 1.0)
+               AS metadata_weight
+        FROM occupation_skill_relations osr
+        JOIN skills s ON s.id = osr.skill_id
+    ),
+    combined AS (
+        SELECT s.id AS skill_id,
+               COALESCE(sas.automation_score,
+                        bucket_based.bucket_weight,
+                        metadata_based.metadata_weight,
+                        0) AS final_score
+        FROM skills s
+        LEFT JOIN skill_automation_scores sas ON sas.skill_id = s.id
+        LEFT JOIN bucket_based ON bucket_based.skill_id = s.id
+        LEFT JOIN metadata_based ON metadata_based.skill_id = s.id
+    )
+    SELECT skill_id,
+           ROUND(50 + (final_score * 100), 2) AS normalized_score
+    FROM combined
+    WHERE skill_id = ANY(:skill_ids)
+""")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--samples", type=int, default=100, help="Number of occupations to time")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        occupation_ids = repo.get_all_occupation_ids(db)
+        random.Random(args.seed).shuffle(occupation_ids)
+
+        cases = []
+        for occupation_id in occupation_ids:
+            skill_ids = [s["skill_id"] for s in repo.get_skills_for_occupation(db, occupation_id)]
+            if skill_ids:
+                cases.append((occupation_id, skill_ids))
+            if len(cases) >= args.samples:
+                break
+
+        legacy, filtered = [], []
+        for occupation_id, skill_ids in cases:
+            legacy.append(time_call(lambda: db.execute(LEGACY_QUERY, {"skill_ids": skill_ids}).all()))
+            filtered.append(time_call(lambda: repo.get_skill_automation_scores(db, skill_ids, occupation_id)))
+
+        print(f"{len(cases)} occupations, avg {sum(len(c[1]) for c in cases) / max(len(cases), 1):.1f} skills each")
+        print_table({"legacy whole-table CTE": summarize(legacy), "filtered per-branch CTE": summarize(filtered)})
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
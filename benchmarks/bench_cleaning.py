@@ -0,0 +1,103 @@
+# benchmarks/bench_cleaning.py
+"""
+CSV cleaning cost: the previous per-cell DataFrame.applymap cleaners vs. the column-wise
+EntitySpec engine in app/utils/cleaning.py. Reports best-of-N wall time and the tracemalloc
+peak of one cleaning call (the CSV is read beforehand and not counted).
+
+Without --skills, an ESCO-sized skills file is generated (see bench_copy_loader).
+
+Usage:
+    python -m benchmarks.bench_cleaning --occupations app/esco_data/occupations_en.csv --repeat 5
+"""
+import argparse
+import tempfile
+import time
+import tracemalloc
+from typing import Callable, Dict
+
+import pandas as pd
+
+from app.utils.data_cleaner import clean_occupation_csv, clean_skill_csv
+from benchmarks._timing import print_table
+from benchmarks.bench_copy_loader import write_synthetic_files
+
+# pandas 3 removed applymap; DataFrame.map is the same per-cell call
+_applymap = getattr(pd.DataFrame, "applymap", pd.DataFrame.map)
+
+_OCCUPATION_COLUMNS = [
+    "conceptType", "conceptUri", "iscoGroup", "preferredLabel", "altLabels",
+    "hiddenLabels", "status", "modifiedDate", "regulatedProfessionNote",
+    "scopeNote", "definition", "inScheme", "description", "code",
+]
+_SKILL_COLUMNS = [
+    "conceptType", "conceptUri", "skillType", "reuseLevel", "preferredLabel",
+    "altLabels", "hiddenLabels", "status", "modifiedDate", "scopeNote",
+    "definition", "inScheme", "description",
+]
+
+
+def _legacy_clean(df: pd.DataFrame, expected_cols) -> pd.DataFrame:
+    """clean_occupation_csv / clean_skill_csv as they were."""
+    df.columns = df.columns.str.strip()
+    for col in expected_cols:
+        if col not in df.columns:
+            df[col] = None
+    df.dropna(how="all", inplace=True)
+    df = _applymap(df, lambda x: x.strip() if isinstance(x, str) else x)
+    df.drop_duplicates(subset=["conceptUri"], inplace=True)
+    return df[expected_cols]
+
+
+CLEANERS: Dict[str, Dict[str, Callable[[pd.DataFrame], pd.DataFrame]]] = {
+    "occupations": {
+        "applymap": lambda df: _legacy_clean(df, _OCCUPATION_COLUMNS),
+        "vectorized": clean_occupation_csv,
+    },
+    "skills": {
+        "applymap": lambda df: _legacy_clean(df, _SKILL_COLUMNS),
+        "vectorized": clean_skill_csv,
+    },
+}
+
+
+def measure(clean: Callable[[pd.DataFrame], pd.DataFrame], df: pd.DataFrame, repeat: int) -> Dict[str, float]:
+    best = float("inf")
+    for _ in range(repeat):
+        frame = df.copy()
+        started = time.perf_counter()
+        rows = len(clean(frame))
+        best = min(best, time.perf_counter() - started)
+
+    frame = df.copy()
+    tracemalloc.start()
+    clean(frame)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"rows": rows, "best_ms": round(best * 1000.0, 1), "peak_mib": round(peak / 2**20, 1)}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--occupations", default="app/esco_data/occupations_en.csv")
+    parser.add_argument("--skills", help="skills CSV (generated when omitted)")
+    parser.add_argument("--skills-count", type=int, default=14000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        skills_path = args.skills or write_synthetic_files(args.occupations, directory, args.skills_count, 0, 42)[0]
+        frames = {
+            "occupations": pd.read_csv(args.occupations, dtype=str, keep_default_na=False),
+            "skills": pd.read_csv(skills_path, dtype=str, keep_default_na=False),
+        }
+
+    rows = {}
+    for entity, df in frames.items():
+        for variant, clean in CLEANERS[entity].items():
+            rows[f"{entity}:{variant}"] = measure(clean, df, args.repeat)
+    print(f"pandas {pd.__version__}; best of {args.repeat}")
+    print_table(rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,209 @@
+# benchmarks/bench_copy_loader.py
+"""
+ESCO import throughput: the previous pandas -> clean_* -> Pydantic -> ORM -> bulk_save_objects
+path vs. streaming COPY (app/services/copy_loader.py).
+
+Each variant loads into fresh tables in a scratch schema (created and dropped here), so the
+database's own data is never touched:
+  occupations   occupations_en.csv
+  relations     the occupation-skill relations file (skills are loaded first, untimed)
+
+Without --relations/--skills, an ESCO-sized pair of files is generated from the occupations
+file (--skills-count skills, --per-occupation relations each; ESCO v1 has ~14k skills and
+~126k relations).
+
+Usage (against any Postgres reachable with the app's settings):
+    python -m benchmarks.bench_copy_loader --occupations app/esco_data/occupations_en.csv --repeat 3
+"""
+import argparse
+import csv
+import os
+import random
+import tempfile
+import time
+import uuid
+from typing import Callable, Dict, List, Tuple
+
+import pandas as pd
+from sqlalchemy import text
+
+from app.core.database import Base, SessionLocal, engine
+from app.models.occupation import Occupation
+from app.models.occupation_skill_relation import OccupationSkillRelation
+from app.models.skill import Skill
+from app.schemas.occupation import OccupationSchema
+from app.schemas.occupation_skill_relation import OccupationSkillRelationCreate
+from app.services import copy_loader
+from app.services.occupation_service import insert_occupations
+from app.utils.cleaning import ENTITIES
+from app.utils.data_cleaner import clean_occupation_csv
+from app.utils.occupation_skill_relation_cleaner import clean_occupation_skill_relation_csv
+from benchmarks._timing import print_table
+
+TABLES = [Occupation.__table__, Skill.__table__, OccupationSkillRelation.__table__]
+
+
+def legacy_occupations(db, path: str) -> int:
+    df = pd.read_csv(path, dtype=str, keep_default_na=False)
+    cleaned_df = clean_occupation_csv(df)
+    occupations = [OccupationSchema(**row) for row in cleaned_df.to_dict(orient="records")]
+    insert_occupations(db, occupations)
+    return len(occupations)
+
+
+def legacy_relations(db, path: str) -> int:
+    """insert_occupation_skill_relations as it was, minus the score / cache invalidation."""
+    df = pd.read_csv(path, dtype=str, keep_default_na=False)
+    cleaned_df = clean_occupation_skill_relation_csv(df)
+    relations = [
+        OccupationSkillRelationCreate(
+            occupationUri=row["occupationUri"], relationType=row.get("relationType"),
+            skillType=row.get("skillType"), skillUri=row["skillUri"],
+        )
+        for row in cleaned_df.to_dict(orient="records")
+    ]
+    occupation_map = {o.conceptUri: o.id for o in db.query(Occupation).all()}
+    skill_map = {s.conceptUri: s.id for s in db.query(Skill).all()}
+    existing = set((r.occupation_id, r.skill_id) for r in db.query(OccupationSkillRelation).all())
+    to_add = []
+    for rel in relations:
+        pair = (occupation_map.get(rel.occupationUri), skill_map.get(rel.skillUri))
+        if None in pair or pair in existing:
+            continue
+        to_add.append(OccupationSkillRelation(
+            occupation_id=pair[0], skill_id=pair[1], relationType=rel.relationType, skillType=rel.skillType
+        ))
+        existing.add(pair)
+    db.bulk_save_objects(to_add)
+    db.commit()
+    return len(to_add)
+
+
+def copy_occupations(db, path: str, schema: str) -> int:
+    count = copy_loader.load_csv(db, "occupations", path, schema=schema)
+    db.commit()
+    return count
+
+
+def copy_relations(db, path: str, schema: str) -> int:
+    result = copy_loader.load_relations(db, path, schema=schema)
+    db.commit()
+    return result.inserted
+
+
+def write_synthetic_files(occupations_path: str, directory: str, skills: int, per_occupation: int,
+                          seed: int) -> Tuple[str, str]:
+    rng = random.Random(seed)
+    with open(occupations_path, newline="", encoding="utf-8") as f:
+        occupation_uris = list(dict.fromkeys(row["conceptUri"] for row in csv.DictReader(f)))
+
+    skills_path = os.path.join(directory, "skills_en.csv")
+    skill_uris = [f"http://data.europa.eu/esco/skill/{uuid.UUID(int=rng.getrandbits(128))}" for _ in range(skills)]
+    with open(skills_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(ENTITIES["skills"].columns)
+        for i, uri in enumerate(skill_uris):
+            writer.writerow([
+                "KnowledgeSkillCompetence", uri, "skill/competence", "sector-specific", f"skill {i}",
+                f"skill {i} alt\nskill {i} other", "", "released", "2023-12-20T13:59:41Z", "",
+                f"Definition of skill {i}, with \"quotes\" and, commas.", "http://data.europa.eu/esco/concept-scheme/skills",
+                f"Description of skill {i}. " * 8,
+            ])
+
+    relations_path = os.path.join(directory, "occupationSkillRelations_en.csv")
+    with open(relations_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["occupationUri", "relationType", "skillType", "skillUri"])
+        for occupation_uri in occupation_uris:
+            for skill_uri in rng.sample(skill_uris, min(per_occupation, len(skill_uris))):
+                relation_type = "essential" if rng.random() < 0.5 else "optional"
+                writer.writerow([occupation_uri, relation_type, "skill/competence", skill_uri])
+    return skills_path, relations_path
+
+
+def reset_tables(schema: str) -> None:
+    with engine.begin() as conn:
+        conn.execute(text(
+            f"TRUNCATE {schema}.occupation_skill_relations, {schema}.skills, {schema}.occupations RESTART IDENTITY"
+        ))
+
+
+def timed(fn: Callable[[], int]) -> Tuple[int, float]:
+    started = time.perf_counter()
+    rows = fn()
+    return rows, time.perf_counter() - started
+
+
+def run_variant(variant: str, schema: str, files: Dict[str, str], repeat: int) -> Dict[str, Dict[str, float]]:
+    results: Dict[str, List[Tuple[int, float]]] = {"occupations": [], "relations": []}
+    for _ in range(repeat):
+        reset_tables(schema)
+        db = SessionLocal()
+        try:
+            db.execute(text(f"SET search_path TO {schema}"))
+            if variant == "legacy":
+                results["occupations"].append(timed(lambda: legacy_occupations(db, files["occupations"])))
+                copy_loader.load_csv(db, "skills", files["skills"], schema=schema)
+                db.commit()
+                db.execute(text(f"SET search_path TO {schema}"))
+                results["relations"].append(timed(lambda: legacy_relations(db, files["relations"])))
+            else:
+                results["occupations"].append(timed(lambda: copy_occupations(db, files["occupations"], schema)))
+                copy_loader.load_csv(db, "skills", files["skills"], schema=schema)
+                db.commit()
+                results["relations"].append(timed(lambda: copy_relations(db, files["relations"], schema)))
+            db.execute(text("SET search_path TO public"))
+            db.commit()
+        finally:
+            db.close()
+
+    rows = {}
+    for name, runs in results.items():
+        count, best = min(runs, key=lambda run: run[1])
+        rows[f"{variant}:{name}"] = {
+            "rows": count, "best_s": round(best, 3), "rows_per_s": round(count / best) if best else 0,
+        }
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--occupations", default="app/esco_data/occupations_en.csv")
+    parser.add_argument("--skills", help="skills CSV matching --relations")
+    parser.add_argument("--relations", help="occupation-skill relations CSV")
+    parser.add_argument("--skills-count", type=int, default=14000)
+    parser.add_argument("--per-occupation", type=int, default=42)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--variants", default="legacy,copy")
+    args = parser.parse_args()
+
+    schema = f"bench_copy_{uuid.uuid4().hex[:8]}"
+    with tempfile.TemporaryDirectory() as directory:
+        if args.relations and args.skills:
+            skills_path, relations_path = args.skills, args.relations
+        else:
+            skills_path, relations_path = write_synthetic_files(
+                args.occupations, directory, args.skills_count, args.per_occupation, args.seed
+            )
+        files = {"occupations": args.occupations, "skills": skills_path, "relations": relations_path}
+
+        with engine.begin() as conn:
+            conn.execute(text(f"CREATE SCHEMA {schema}"))
+        try:
+            Base.metadata.create_all(
+                engine.execution_options(schema_translate_map={None: schema}), tables=TABLES
+            )
+            rows = {}
+            for variant in args.variants.split(","):
+                rows.update(run_variant(variant, schema, files, args.repeat))
+        finally:
+            with engine.begin() as conn:
+                conn.execute(text(f"DROP SCHEMA {schema} CASCADE"))
+
+    print(f"best of {args.repeat}; relations file {os.path.basename(relations_path)}")
+    print_table(rows)
+
+
+if __name__ == "__main__":
+    main()
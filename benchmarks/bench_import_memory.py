@@ -0,0 +1,138 @@
+# benchmarks/bench_import_memory.py
+"""
+Peak memory of an occupations import: the previous whole-file pandas -> Pydantic -> ORM ->
+bulk_save_objects path vs. the chunked COPY loader (app/services/copy_loader.py).
+
+A large file is generated from occupations_en.csv by repeating it --copies times with fresh
+concept URIs (the multilingual ESCO dump is ~28 files of this shape). Each variant runs in its
+own process, loads into an emptied table in a scratch schema, and reports its peak RSS
+(ru_maxrss) next to the RSS it started from.
+
+Usage:
+    python -m benchmarks.bench_import_memory --copies 40 --memory-limit-mb 64
+"""
+import argparse
+import csv
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+
+from sqlalchemy import text
+
+VARIANTS = ("legacy", "chunked")
+
+
+def _rss_mib() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0
+
+
+def write_large_file(source: str, path: str, copies: int) -> int:
+    rows = 0
+    with open(source, newline="", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        records = list(reader)
+    uri = header.index("conceptUri")
+    with open(path, "w", newline="", encoding="utf-8") as out:
+        writer = csv.writer(out)
+        writer.writerow(header)
+        for copy in range(copies):
+            for record in records:
+                record = list(record)
+                record[uri] = f"{record[uri]}-{copy}"
+                writer.writerow(record)
+                rows += 1
+    return rows
+
+
+def child(variant: str, path: str, schema: str) -> None:
+    from app.core.database import SessionLocal
+    from app.models import occupation_skill_relation, skill  # noqa: F401  (mapper relationships)
+    from app.schemas.occupation import OccupationSchema
+    from app.services import copy_loader
+    from app.services.occupation_service import insert_occupations
+    from app.utils.data_cleaner import clean_occupation_csv
+    import pandas as pd
+
+    baseline = _rss_mib()
+    db = SessionLocal()
+    started = time.perf_counter()
+    try:
+        if variant == "legacy":
+            db.execute(text(f"SET search_path TO {schema}"))
+            df = pd.read_csv(path, dtype=str, keep_default_na=False)
+            cleaned_df = clean_occupation_csv(df)
+            occupations = [OccupationSchema(**row) for row in cleaned_df.to_dict(orient="records")]
+            insert_occupations(db, occupations)
+            rows = len(occupations)
+        else:
+            rows = copy_loader.load_csv(db, "occupations", path, schema=schema)
+            db.commit()
+        elapsed = time.perf_counter() - started
+    finally:
+        db.close()
+    print(json.dumps({
+        "rows": rows, "seconds": round(elapsed, 1),
+        "baseline_rss_mib": round(baseline, 1), "peak_rss_mib": round(_rss_mib(), 1),
+    }))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--occupations", default="app/esco_data/occupations_en.csv")
+    parser.add_argument("--copies", type=int, default=40)
+    parser.add_argument("--memory-limit-mb", type=int, default=64, help="IMPORT_MEMORY_LIMIT_MB for the chunked run")
+    parser.add_argument("--variants", default=",".join(VARIANTS))
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    parser.add_argument("--file", help=argparse.SUPPRESS)
+    parser.add_argument("--schema", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.child, args.file, args.schema)
+        return
+
+    from app.core.database import Base, engine
+    from app.models.occupation import Occupation
+    from benchmarks._timing import print_table
+
+    schema = f"bench_mem_{uuid.uuid4().hex[:8]}"
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "occupations_all.csv")
+        rows = write_large_file(args.occupations, path, args.copies)
+        print(f"{rows} rows, {os.path.getsize(path) / 2**20:.0f} MiB; chunked run with "
+              f"IMPORT_MEMORY_LIMIT_MB={args.memory_limit_mb}")
+
+        with engine.begin() as conn:
+            conn.execute(text(f"CREATE SCHEMA {schema}"))
+        try:
+            Base.metadata.create_all(
+                engine.execution_options(schema_translate_map={None: schema}), tables=[Occupation.__table__]
+            )
+            results = {}
+            env = dict(os.environ, IMPORT_MEMORY_LIMIT_MB=str(args.memory_limit_mb))
+            for variant in args.variants.split(","):
+                with engine.begin() as conn:
+                    conn.execute(text(f"TRUNCATE {schema}.occupations"))
+                out = subprocess.run(
+                    [sys.executable, "-m", "benchmarks.bench_import_memory",
+                     "--child", variant, "--file", path, "--schema", schema],
+                    env=env, capture_output=True, text=True,
+                )
+                if out.returncode:
+                    raise SystemExit(f"{variant} run failed:\n{out.stderr}")
+                results[variant] = json.loads(out.stdout.strip().splitlines()[-1])
+        finally:
+            with engine.begin() as conn:
+                conn.execute(text(f"DROP SCHEMA {schema} CASCADE"))
+
+    print_table(results)
+
+
+if __name__ == "__main__":
+    main()
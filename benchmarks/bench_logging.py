@@ -0,0 +1,70 @@
+# benchmarks/bench_logging.py
+"""
+Caller-side cost of one log call: handlers attached directly (the old setup, formatting and
+file writes on the calling thread) vs. the queue pipeline in app/core/logger.py, plus the cost
+of a disabled DEBUG call with an f-string vs. %-style arguments.
+
+Usage:
+    python -m benchmarks.bench_logging --iterations 50000
+"""
+import argparse
+import logging
+import os
+import tempfile
+import time
+from logging.handlers import RotatingFileHandler
+
+from app.core import logger as app_logging
+from benchmarks._timing import print_table
+
+ROW = {"id": 1234, "preferredLabel": "software developer", "code": "2512.4", "description": "x" * 200}
+
+
+def _logger(name: str, directory: str) -> logging.Logger:
+    log = logging.getLogger(f"bench.{name}")
+    log.propagate = False
+    log.setLevel(logging.INFO)
+    formatter = logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    handler = RotatingFileHandler(os.path.join(directory, f"{name}.log"), maxBytes=50 * 1024 * 1024, backupCount=1)
+    handler.setFormatter(formatter)
+    log.addHandler(handler)
+    return log
+
+
+def _per_call_us(fn, iterations: int) -> float:
+    started = time.perf_counter()
+    for i in range(iterations):
+        fn(i)
+    return (time.perf_counter() - started) / iterations * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=50_000)
+    args = parser.parse_args()
+    n = args.iterations
+
+    with tempfile.TemporaryDirectory() as directory:
+        direct = _logger("direct", directory)
+        queued = _logger("queued", directory)
+        app_logging.route_to_queue(queued)
+
+        rows = {
+            "info_direct": {"us_per_call": round(_per_call_us(
+                lambda i: direct.info("Scoring occupation id=%s", i), n), 2)},
+            "info_queued": {"us_per_call": round(_per_call_us(
+                lambda i: queued.info("Scoring occupation id=%s", i), n), 2)},
+            "debug_off_fstring": {"us_per_call": round(_per_call_us(
+                lambda i: queued.debug(f"Occupation found: {dict(ROW)}"), n), 2)},
+            "debug_off_lazy": {"us_per_call": round(_per_call_us(
+                lambda i: queued.debug("Occupation found: %s", ROW), n), 2)},
+        }
+        app_logging.stop_logging()
+        for log in (direct, queued):
+            for handler in log.handlers:
+                handler.close()
+    print_table(rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+# benchmarks/bench_login.py
+"""
+Login throughput under a burst: concurrent clients each verifying a bcrypt password, with a
+probe coroutine standing in for every other route (it wakes every 10 ms and records how late
+it woke, i.e. event-loop lag).
+
+Variants:
+    inline      verify on the event loop (what reset_password did with hash_password)
+    threadpool  run_in_threadpool, i.e. a sync route on FastAPI's shared request threadpool
+    bounded     app.core.password_hasher (dedicated workers, bounded queue, 429 beyond it)
+
+Usage:
+    python -m benchmarks.bench_login --clients 50 --seconds 10 --rounds 12
+"""
+import argparse
+import asyncio
+import time
+from typing import Dict, List
+
+from fastapi import HTTPException
+from fastapi.concurrency import run_in_threadpool
+
+from app.core.password_hasher import password_hasher
+from app.utils.security import pwd_context, verify_password
+from benchmarks._timing import percentile, print_table, summarize
+
+VARIANTS = ("inline", "threadpool", "bounded")
+PASSWORD = "correct horse battery staple"
+PROBE_INTERVAL = 0.01
+
+
+async def _verify(variant: str, hashed: str) -> bool:
+    if variant == "inline":
+        return verify_password(PASSWORD, hashed)
+    if variant == "threadpool":
+        return await run_in_threadpool(verify_password, PASSWORD, hashed)
+    return await password_hasher.verify_async(PASSWORD, hashed)
+
+
+async def run_variant(variant: str, hashed: str, clients: int, seconds: float) -> Dict[str, float]:
+    samples: List[float] = []
+    lags: List[float] = []
+    rejected = 0
+    deadline = time.perf_counter() + seconds
+
+    async def client() -> None:
+        nonlocal rejected
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            try:
+                await _verify(variant, hashed)
+                samples.append((time.perf_counter() - started) * 1000.0)
+            except HTTPException:
+                rejected += 1
+                await asyncio.sleep(0.05)   # client honouring a short Retry-After
+
+    async def probe() -> None:
+        while time.perf_counter() < deadline:
+            expected = time.perf_counter() + PROBE_INTERVAL
+            await asyncio.sleep(PROBE_INTERVAL)
+            lags.append(max(0.0, time.perf_counter() - expected) * 1000.0)
+
+    started = time.perf_counter()
+    await asyncio.gather(probe(), *[client() for _ in range(clients)])
+    elapsed = time.perf_counter() - started
+    stats = summarize(samples)
+    stats["logins_per_s"] = round(len(samples) / elapsed, 1)
+    stats["rejected"] = rejected
+    stats["loop_lag_p99_ms"] = round(percentile(lags, 99), 1)
+    return stats
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=50)
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--rounds", type=int, default=12, help="bcrypt cost of the stored hash")
+    parser.add_argument("--variants", default=",".join(VARIANTS))
+    args = parser.parse_args()
+
+    hashed = pwd_context.copy(bcrypt__rounds=args.rounds).hash(PASSWORD)
+    print(f"{args.clients} clients x {args.seconds}s, bcrypt rounds {args.rounds}, "
+          f"{password_hasher.workers} hash workers, queue limit {password_hasher.queue_limit}")
+    rows = {v: asyncio.run(run_variant(v, hashed, args.clients, args.seconds)) for v in args.variants.split(",")}
+    print_table(rows)
+
+
+if __name__ == "__main__":
+    main()
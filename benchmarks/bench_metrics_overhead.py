@@ -0,0 +1,71 @@
+# benchmarks/bench_metrics_overhead.py
+"""
+Per-request cost of the metrics instrumentation (app/core/metrics.py): the request
+middleware around a no-op ASGI app, plus the per-call cost of the helpers a scoring
+request goes through (timed_query, cache counters, Redis timers).
+
+Usage:
+    python -m benchmarks.bench_metrics_overhead --iterations 100000
+"""
+import argparse
+import asyncio
+import time
+
+from app.core import metrics
+from benchmarks._timing import print_table
+
+
+class _Route:
+    path = "/scoring/occupation/{occupation_id}"
+
+
+async def _noop_app(scope, receive, send):
+    scope["route"] = _Route
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"{}"})
+
+
+async def _send(message):
+    pass
+
+
+async def _per_request_us(app, iterations: int) -> float:
+    started = time.perf_counter()
+    for _ in range(iterations):
+        await app({"type": "http", "method": "GET"}, None, _send)
+    return (time.perf_counter() - started) / iterations * 1e6
+
+
+def _per_call_us(fn, iterations: int) -> float:
+    started = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - started) / iterations * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=100_000)
+    args = parser.parse_args()
+    n = args.iterations
+
+    bare = asyncio.run(_per_request_us(_noop_app, n))
+    wrapped = asyncio.run(_per_request_us(metrics.RequestMetricsMiddleware(_noop_app), n))
+    timed = metrics.timed_query(lambda: None)
+
+    def redis_timer():
+        with metrics.REDIS_COMMAND_SECONDS.time(operation="bench"):
+            pass
+
+    rows = {
+        "middleware": {"us_per_request": round(wrapped - bare, 2)},
+        "timed_query": {"us_per_call": round(_per_call_us(timed, n) - _per_call_us(lambda: None, n), 2)},
+        "cache_counter": {"us_per_call": round(_per_call_us(
+            lambda: metrics.CACHE_LOOKUPS.inc(cache="bench", result="hit"), n), 2)},
+        "redis_timer": {"us_per_call": round(_per_call_us(redis_timer, n), 2)},
+    }
+    print_table(rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+# benchmarks/bench_rate_limit.py
+"""
+Guest rate limiter under concurrent load: the previous GET / TTL / INCR+EXPIRE sequence vs. the
+single-script policies in app/core/rate_limit.py.
+
+Two scenarios per variant:
+  burst   --burst concurrent requests from ONE guest against a limit of --limit; an atomic
+          limiter admits exactly --limit, the old sequence admits more (check-then-act race)
+  load    --clients concurrent guests (distinct identifiers) issuing checks for --seconds;
+          reports per-check latency and checks/s
+
+Usage (needs a Redis server; uses REDIS_URL):
+    python -m benchmarks.bench_rate_limit --clients 200 --seconds 10 --burst 200 --limit 3
+"""
+import argparse
+import asyncio
+import time
+import uuid
+from typing import Dict, List
+
+from app.core.rate_limit import RateLimiter, parse_policy
+from app.core.redis import r
+from benchmarks._timing import print_table, summarize
+
+DAY_SECONDS = 86400
+
+
+async def legacy_check(key: str, limit: int) -> bool:
+    """The limiter as it was: GET, TTL when over the limit, then an INCR + EXPIRE NX pipeline."""
+    count = await r.get(key)
+    if count and int(count) >= limit:
+        await r.ttl(key)
+        return False
+    pipe = r.pipeline()
+    pipe.incr(key, 1)
+    pipe.expire(key, DAY_SECONDS, nx=True)
+    await pipe.execute()
+    return True
+
+
+def _checker(variant: str, limit: int, run: str):
+    if variant == "legacy":
+        return lambda guest: legacy_check(f"bench:{run}:quota:{guest}", limit)
+    limiter = RateLimiter(parse_policy(f"{variant}:{limit}/{DAY_SECONDS}"))
+
+    async def check(guest: str) -> bool:
+        decision = await limiter.hit("/bench", f"{run}:{guest}")
+        return decision is not None and decision.allowed
+
+    return check
+
+
+async def burst(variant: str, requests: int, limit: int) -> int:
+    check = _checker(variant, limit, uuid.uuid4().hex)
+    admitted = await asyncio.gather(*[check("guest") for _ in range(requests)])
+    return sum(admitted)
+
+
+async def load(variant: str, clients: int, seconds: float, limit: int) -> Dict[str, float]:
+    check = _checker(variant, limit, uuid.uuid4().hex)
+    samples: List[float] = []
+    deadline = time.perf_counter() + seconds
+
+    async def client(guest: str) -> None:
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            await check(guest)
+            samples.append((time.perf_counter() - started) * 1000.0)
+
+    started = time.perf_counter()
+    await asyncio.gather(*[client(f"guest-{i}") for i in range(clients)])
+    stats = summarize(samples)
+    stats["checks_per_s"] = round(len(samples) / (time.perf_counter() - started), 1)
+    return stats
+
+
+async def run(args) -> None:
+    rows: Dict[str, Dict[str, float]] = {}
+    for variant in args.variants.split(","):
+        stats = {"burst_admitted": await burst(variant, args.burst, args.limit)}
+        stats.update(await load(variant, args.clients, args.seconds, args.limit))
+        rows[variant] = stats
+    await r.aclose()
+    print(f"limit {args.limit}; burst of {args.burst} from one guest; {args.clients} guests x {args.seconds}s")
+    print_table(rows)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=200)
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--burst", type=int, default=200)
+    parser.add_argument("--limit", type=int, default=3)
+    parser.add_argument("--variants", default="legacy,fixed_window,sliding_window,token_bucket")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
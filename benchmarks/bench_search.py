@@ -0,0 +1,95 @@
+# benchmarks/bench_search.py
+"""
+Per-keystroke latency of /scoring/search: the legacy three-ILIKE query vs. the indexed,
+ranked SQL search in app/scoring/service.py::search_occupations vs. the in-process
+autocomplete index (app/scoring/autocomplete.py).
+
+Each sampled occupation label is "typed" one character at a time (up to --max-chars) and
+every prefix is searched, like the analyzer autocomplete does.
+
+Usage (against a database with the full ESCO occupation set loaded):
+    python -m benchmarks.bench_search --samples 50
+"""
+import argparse
+import random
+
+from sqlalchemy import text
+
+from app.core.database import SessionLocal
+from app.scoring import repository as repo
+from app.scoring.autocomplete import AutocompleteIndex
+from app.scoring.service import search_occupations
+from benchmarks._timing import print_table, summarize, time_call
+
+# The query as it was before the pg_trgm / tsvector search.
+LEGACY_QUERY = text("""
+    SELECT id, "preferredLabel" AS label
+    FROM occupations
+    WHERE "preferredLabel" ILIKE :prefix_query
+       OR "preferredLabel" ILIKE :contains_query
+       OR "altLabels" ILIKE :contains_query
+    ORDER BY
+        CASE
+            WHEN "preferredLabel" ILIKE :prefix_query THEN 1
+            WHEN "preferredLabel" ILIKE :contains_query THEN 2
+            ELSE 3
+        END,
+        "preferredLabel"
+    LIMIT :limit
+""")
+
+
+def legacy_search(db, query: str, limit: int = 20):
+    return db.execute(LEGACY_QUERY, {
+        "prefix_query": f"{query}%", "contains_query": f"%{query}%", "limit": limit
+    }).all()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--samples", type=int, default=50, help="Number of occupation labels to type")
+    parser.add_argument("--max-chars", type=int, default=12)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        repo.ensure_search_indexes(db)
+        labels = [r[0] for r in db.execute(text('SELECT "preferredLabel" FROM occupations')).all() if r[0]]
+        sample = random.Random(args.seed).sample(labels, min(args.samples, len(labels)))
+        keystrokes = [label[:n] for label in sample for n in range(1, min(len(label), args.max_chars) + 1)]
+
+        index = AutocompleteIndex(repo.get_occupation_labels_for_autocomplete(db))
+        memory_mb = index.memory_bytes()["total"] / 1e6
+
+        # Warm both plans and caches
+        for query in keystrokes[:20]:
+            legacy_search(db, query)
+            search_occupations(db, query)
+
+        timings = {"legacy ILIKE": [], "indexed ranked": [], "in-memory autocomplete": []}
+        by_length = {"indexed 1-2 chars": [], "indexed 3-5 chars": [], "indexed 6+ chars": []}
+        hits = 0
+        for query in keystrokes:
+            timings["legacy ILIKE"].append(time_call(lambda: legacy_search(db, query)))
+            elapsed = time_call(lambda: search_occupations(db, query))
+            timings["indexed ranked"].append(elapsed)
+            timings["in-memory autocomplete"].append(time_call(lambda: index.search(query)))
+            bucket = "1-2" if len(query) <= 2 else "3-5" if len(query) <= 5 else "6+"
+            by_length[f"indexed {bucket} chars"].append(elapsed)
+
+        for label in sample:
+            if any(r["label"] == label for r in search_occupations(db, label)):
+                hits += 1
+
+        print(f"{len(labels)} occupations, {len(keystrokes)} keystrokes from {len(sample)} labels, "
+              f"pg_trgm={'yes' if repo.has_trigram_support(db) else 'no'}")
+        print_table({name: summarize(samples) for name, samples in {**timings, **by_length}.items()})
+        print(f"autocomplete index: {len(index.keys)} keys, built in {index.build_ms} ms, ~{memory_mb:.1f} MB")
+        print(f"full label found in results: {hits}/{len(sample)}")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
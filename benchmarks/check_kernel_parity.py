@@ -0,0 +1,127 @@
+# benchmarks/check_kernel_parity.py
+"""
+Parity check for the vectorized scoring kernel (app/scoring/kernel.py).
+
+For every occupation, Steps 2-3 are computed twice from the same Step 1 items: with the
+original per-skill Python loop (kept below as the reference) and with apply_kernel over the
+whole batch. normalized_contrib, vulnerability, vuln_factor and the risk score must be
+bit-identical. Randomized edge cases (ties, zeros, negatives, single skills) are checked too.
+
+Usage (against a database with the ESCO import loaded):
+    python -m benchmarks.check_kernel_parity --batch-size 500
+"""
+import argparse
+import copy
+import random
+import sys
+import time
+
+from app.core.database import SessionLocal
+from app.scoring import repository as repo
+from app.scoring.service import (
+    EPS,
+    SimpleDbDrivenScorer,
+    apply_kernel,
+    compute_risk_from_contribs,
+    vuln_factor_from_label,
+    vulnerability_label_normalized,
+)
+
+
+def reference_steps(items):
+    """Steps 2-3 exactly as score_by_occupation_id computed them before the kernel."""
+    raw_contribs = [item["raw_contrib"] for item in items]
+    safe_contribs = []
+    min_contrib = min(raw_contribs)
+    max_contrib = max(raw_contribs)
+    range_contrib = max_contrib - min_contrib + EPS
+    for item in items:
+        normalized = (item["raw_contrib"] - min_contrib) / range_contrib
+        item["normalized_contrib"] = normalized
+        item["vulnerability"] = vulnerability_label_normalized(normalized)
+        item["vuln_factor"] = vuln_factor_from_label(item["vulnerability"])
+        safe_contribs.append((1.0 - item["vuln_factor"]) * item["raw_contrib"])
+    return compute_risk_from_contribs(raw_contribs, safe_contribs)
+
+
+def compare(batch, label):
+    """Run both implementations on a batch of item lists; return the number of mismatches."""
+    expected_items = copy.deepcopy(batch)
+    t0 = time.perf_counter()
+    expected_risk = [reference_steps(items) for items in expected_items]
+    t1 = time.perf_counter()
+    actual_risk = apply_kernel(batch)
+    t2 = time.perf_counter()
+
+    mismatches = 0
+    for exp_items, act_items, exp, act in zip(expected_items, batch, expected_risk, actual_risk):
+        if exp.hex() != act.hex():
+            mismatches += 1
+            print(f"[{label}] risk mismatch: {exp!r} != {act!r}")
+            continue
+        for e, a in zip(exp_items, act_items):
+            if (e["normalized_contrib"].hex() != a["normalized_contrib"].hex()
+                    or e["vulnerability"] != a["vulnerability"]
+                    or e["vuln_factor"] != a["vuln_factor"]):
+                mismatches += 1
+                print(f"[{label}] skill {e['skill_id']} mismatch: {e} != {a}")
+                break
+    return mismatches, (t1 - t0) * 1000, (t2 - t1) * 1000
+
+
+def synthetic_batches(n, seed=7):
+    rng = random.Random(seed)
+    weights = [0.0, 5.0, 50.0, -10.0, 1e-12, 37.5]
+    batch = []
+    for _ in range(n):
+        size = rng.choice([1, 1, 2, 3, 10, 60])
+        items = []
+        for i in range(size):
+            weight = rng.choice(weights) if rng.random() < 0.3 else rng.uniform(-20, 150)
+            importance = rng.choice([1.0, 0.5, 2.0]) if rng.random() < 0.5 else rng.uniform(0, 3)
+            items.append({"skill_id": i, "weight": weight, "importance": importance,
+                          "raw_contrib": weight * importance})
+        batch.append(items)
+    return batch
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--synthetic", type=int, default=20000, help="random edge-case occupations")
+    args = parser.parse_args()
+
+    scorer = SimpleDbDrivenScorer()
+    total = 0
+    mismatches = 0
+    loop_ms = kernel_ms = 0.0
+    with SessionLocal() as db:
+        buckets = scorer._load_bucket_keywords(db)
+        ids = repo.get_all_occupation_ids(db)
+        for start in range(0, len(ids), args.batch_size):
+            batch_ids = ids[start:start + args.batch_size]
+            skills_by_occ = repo.get_skills_for_occupations(db, batch_ids)
+            automation_by_occ = repo.get_skill_automation_scores_for_occupations(db, batch_ids)
+            unscored = {s["skill_id"] for o, skills in skills_by_occ.items() for s in skills
+                        if s["skill_id"] not in automation_by_occ.get(o, {})}
+            skill_bucket_map = repo.get_skill_bucket_matches(db, sorted(unscored))
+            batch = [
+                scorer._skill_items(db, skills_by_occ[o], automation_by_occ.get(o, {}), skill_bucket_map, buckets)[0]
+                for o in batch_ids if skills_by_occ.get(o)
+            ]
+            bad, loop, kernel = compare(batch, "db")
+            total += len(batch)
+            mismatches += bad
+            loop_ms += loop
+            kernel_ms += kernel
+
+    bad, loop, kernel = compare(synthetic_batches(args.synthetic), "synthetic")
+    print(f"occupations checked: {total} (+{args.synthetic} synthetic)")
+    print(f"python loop: {loop_ms:.1f} ms, kernel: {kernel_ms:.1f} ms (db set)")
+    print(f"python loop: {loop:.1f} ms, kernel: {kernel:.1f} ms (synthetic set)")
+    print(f"mismatches: {mismatches + bad}")
+    sys.exit(1 if mismatches + bad else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+# benchmarks/load_scoring_async.py
+"""
+Load test: GET /scoring/occupation/{id} served the old way (sync route on the psycopg2
+SessionLocal, i.e. FastAPI's threadpool) vs. the async way (asyncpg AsyncSession,
+SimpleDbDrivenScorer.get_score_async), with many concurrent keep-alive clients.
+
+Each variant runs in its own uvicorn process with a minimal app holding just that route, so
+the Redis response cache is out of the picture and every request reaches Postgres.
+--db-delay-ms adds a pg_sleep per request to model a remote database's round trip; on a
+local socket both variants are CPU bound and the difference mostly shows in tail latency.
+
+Usage (against a database with occupation_risk_scores materialized):
+    python -m benchmarks.load_scoring_async --clients 500 --seconds 20
+    python -m benchmarks.load_scoring_async --clients 500 --seconds 20 --db-delay-ms 5
+"""
+import argparse
+import asyncio
+import os
+import random
+import subprocess
+import sys
+import time
+from typing import Dict, List
+
+from benchmarks._timing import print_table, summarize
+
+VARIANTS = ("threadpool", "async")
+
+
+def build_app(variant: str, delay_s: float):
+    """Minimal app exposing /scoring/occupation/{id} the given way."""
+    from fastapi import Depends, FastAPI
+    from sqlalchemy import text
+    from sqlalchemy.ext.asyncio import AsyncSession
+    from sqlalchemy.orm import Session
+
+    from app.core.database import get_async_db, get_db
+    from app.scoring.service import SimpleDbDrivenScorer
+
+    app = FastAPI()
+    scorer = SimpleDbDrivenScorer()
+    delay = text("SELECT pg_sleep(:s)")
+
+    if variant == "threadpool":
+        @app.get("/scoring/occupation/{occupation_id}")
+        def score(occupation_id: int, db: Session = Depends(get_db)):
+            if delay_s:
+                db.execute(delay, {"s": delay_s})
+            return scorer.get_score(db, occupation_id)
+    else:
+        @app.get("/scoring/occupation/{occupation_id}")
+        async def score(occupation_id: int, db: AsyncSession = Depends(get_async_db)):
+            if delay_s:
+                await db.execute(delay, {"s": delay_s})
+            return await scorer.get_score_async(db, occupation_id)
+
+    return app
+
+
+def serve(variant: str, port: int, delay_s: float) -> None:
+    import uvicorn
+
+    uvicorn.run(build_app(variant, delay_s), host="127.0.0.1", port=port, log_level="warning",
+                backlog=4096, timeout_keep_alive=120)
+
+
+async def _request(reader: asyncio.StreamReader, writer: asyncio.StreamWriter, path: str) -> int:
+    writer.write(f"GET {path} HTTP/1.1\r\nHost: bench\r\n\r\n".encode())
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        name, _, value = line.partition(b":")
+        if name.strip().lower() == b"content-length":
+            length = int(value)
+    await reader.readexactly(length)
+    return status
+
+
+async def _client(port: int, ids: List[int], deadline: float, samples: List[float], errors: List[int]) -> None:
+    rng = random.Random()
+    try:
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    except OSError:
+        errors.append(0)
+        return
+    try:
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            status = await _request(reader, writer, f"/scoring/occupation/{rng.choice(ids)}")
+            if status == 200:
+                samples.append((time.perf_counter() - started) * 1000.0)
+            else:
+                errors.append(status)
+    except (OSError, asyncio.IncompleteReadError, IndexError, ValueError):
+        errors.append(0)
+    finally:
+        writer.close()
+
+
+async def _wait_ready(port: int, timeout: float = 60.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            _, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.close()
+            return
+        except OSError:
+            await asyncio.sleep(0.2)
+    raise RuntimeError(f"server on port {port} did not start")
+
+
+async def load(port: int, ids: List[int], clients: int, seconds: float) -> Dict[str, float]:
+    await _wait_ready(port)
+    # Warm-up: bucket cache, connection pools
+    await asyncio.gather(*[_client(port, ids, time.perf_counter() + 1.0, [], []) for _ in range(20)])
+
+    samples: List[float] = []
+    errors: List[int] = []
+    started = time.perf_counter()
+    deadline = started + seconds
+    await asyncio.gather(*[_client(port, ids, deadline, samples, errors) for _ in range(clients)])
+    elapsed = time.perf_counter() - started
+    stats = summarize(samples)
+    stats["rps"] = round(len(samples) / elapsed, 1)
+    stats["errors"] = len(errors)
+    return stats
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=500)
+    parser.add_argument("--seconds", type=float, default=20.0)
+    parser.add_argument("--db-delay-ms", type=float, default=0.0)
+    parser.add_argument("--port", type=int, default=8711)
+    parser.add_argument("--variants", default=",".join(VARIANTS))
+    parser.add_argument("--serve", choices=VARIANTS, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    delay_s = args.db_delay_ms / 1000.0
+
+    if args.serve:
+        serve(args.serve, args.port, delay_s)
+        return
+
+    from app.core.database import SessionLocal
+    from app.scoring import repository as repo
+
+    with SessionLocal() as db:
+        ids = repo.get_all_occupation_ids(db)
+    print(f"{len(ids)} occupations, {args.clients} clients x {args.seconds}s, db delay {args.db_delay_ms} ms")
+
+    rows: Dict[str, Dict[str, float]] = {}
+    for variant in args.variants.split(","):
+        server = subprocess.Popen(
+            [sys.executable, "-m", "benchmarks.load_scoring_async", "--serve", variant,
+             "--port", str(args.port), "--db-delay-ms", str(args.db_delay_ms)],
+            env=os.environ.copy(),
+        )
+        try:
+            rows[variant] = asyncio.run(load(args.port, ids, args.clients, args.seconds))
+        finally:
+            server.terminate()
+            server.wait()
+    print_table(rows)
+
+
+if __name__ == "__main__":
+    main()